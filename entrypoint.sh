@@ -1,21 +1,48 @@
 #!/bin/bash
 set -e
 
-# Wait for database to be ready (if using external DB in future)
-# For SQLite, this is not needed but good for future PostgreSQL migration
+# Wait for database to be ready (PostgreSQL may still be starting up)
+# For SQLite, this is not needed
+if [ "$DATABASE_ENGINE" = "postgres" ]; then
+    echo "Waiting for PostgreSQL at ${POSTGRES_HOST:-localhost}..."
+    until uv run python -c "import os, psycopg; psycopg.connect(host=os.environ.get('POSTGRES_HOST', 'localhost'), port=os.environ.get('POSTGRES_PORT', '5432'), dbname=os.environ.get('POSTGRES_DB', 'journal'), user=os.environ.get('POSTGRES_USER', 'journal'), password=os.environ.get('POSTGRES_PASSWORD', ''), connect_timeout=3).close()" 2>/dev/null; do
+        sleep 1
+    done
+fi
 
 # Run database migrations
 echo "Running database migrations..."
 uv run python manage.py migrate --noinput
 
+# Create the fragment cache table (only used when FRAGMENT_CACHE_BACKEND=db)
+uv run python manage.py createcachetable
+
 # Collect static files (for production)
 echo "Collecting static files..."
-uv run python manage.py collectstatic --noinput --clear || true
+uv run python manage.py collectstatic --noinput --clear
 
 # Create superuser if it doesn't exist (optional, for initial setup)
 # Uncomment and set environment variables if needed
 # echo "Creating superuser..."
 # uv run python manage.py shell -c "from django.contrib.auth import get_user_model; User = get_user_model(); User.objects.filter(username='admin').exists() or User.objects.create_superuser('admin', 'admin@example.com', 'admin')"
 
+# Purge expired sessions, idempotency keys and events now and then every
+# SESSION_PURGE_INTERVAL seconds (default daily; 0 disables) so their tables
+# stay small
+purge_expired() {
+    uv run python manage.py clearsessions || echo "clearsessions failed"
+    uv run python manage.py clear_idempotency_keys || echo "clear_idempotency_keys failed"
+    uv run python manage.py clear_journal_events || echo "clear_journal_events failed"
+}
+SESSION_PURGE_INTERVAL=${SESSION_PURGE_INTERVAL:-86400}
+if [ "$SESSION_PURGE_INTERVAL" -gt 0 ]; then
+    purge_expired
+    (
+        while sleep "$SESSION_PURGE_INTERVAL"; do
+            purge_expired
+        done
+    ) &
+fi
+
 echo "Starting application..."
 exec "$@"
@@ -0,0 +1,70 @@
+"""
+Gunicorn configuration for serving journal_project in production.
+
+Used by the Docker image (see Dockerfile). Every value can be overridden with
+an environment variable so the same file fits a Raspberry Pi or a larger home
+server.
+
+For more information on these settings, see
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import multiprocessing
+import os
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# SERVER_MODE=asgi runs the ASGI application in uvicorn workers: each worker
+# is one event loop, and the HTMX endpoints switch to their async views (see
+# journal/async_views.py), so requests waiting on the database don't each
+# hold a thread. The default runs the WSGI application in threaded workers.
+server_mode = os.environ.get("SERVER_MODE", "wsgi")
+if server_mode == "asgi":
+    wsgi_app = "journal_project.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "journal_project.wsgi:application"
+    worker_class = "gthread"
+
+# Worker processes. SQLite lets only one connection write at a time, so more
+# processes than cores just queue on the database lock; cap the pool and rely
+# on threads (or the event loop under ASGI) inside each worker for concurrent
+# reads.
+workers = env_int(
+    "GUNICORN_WORKERS",
+    min(multiprocessing.cpu_count() + 1, env_int("GUNICORN_MAX_WORKERS", 4)),
+)
+# Threads per gthread worker; ignored by uvicorn workers
+threads = env_int("GUNICORN_THREADS", 4)
+
+# Worker recycling: restart each worker after a bounded number of requests
+# (with jitter so they don't all restart together) to cap memory growth.
+max_requests = env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+# Graceful reload: `kill -HUP <master>` (or `docker-compose kill -s HUP journal`)
+# starts new workers and lets old ones finish in-flight requests within
+# graceful_timeout seconds.
+timeout = env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+
+# Keep-alive: hold idle connections open a little longer than the default 2s
+# so HTMX requests from the same page reuse them. Keep this below the idle
+# timeout of any reverse proxy in front of the app.
+keepalive = env_int("GUNICORN_KEEPALIVE", 5)
+
+# Heartbeat files on tmpfs avoid worker timeouts on slow container disks.
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Trust X-Forwarded-* from the reverse proxy (comma-separated IPs or "*").
+forwarded_allow_ips = os.environ.get("GUNICORN_FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
@@ -1,20 +1,230 @@
+from django import forms
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.utils import get_last_value_from_parameters
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.db.models.functions import Substr
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
 
-from journal.models import JournalEntry
+from journal import search
+from journal.models import JournalDay, JournalEntry
+
+# Characters of content shown in the changelist
+PREVIEW_LENGTH = 50
+
+# Tables estimated to hold fewer rows than this are counted exactly
+ESTIMATED_COUNT_THRESHOLD = 10_000
+
+
+def estimate_rows(queryset):
+    """Cheaply estimate how many rows the table behind ``queryset`` holds.
+
+    PostgreSQL's planner statistics when the table has been analyzed,
+    otherwise the highest primary key (an upper bound, read from the primary
+    key index) on any database.
+    """
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] > 0:
+            return row[0]
+    highest = model._default_manager.using(queryset.db).aggregate(Max("pk"))
+    return highest["pk__max"] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the size of an unfiltered table.
+
+    Counting millions of rows scans the whole table on every changelist
+    page. Unfiltered listings of large tables show an estimate instead;
+    filtered ones, and small tables, are counted exactly.
+
+    The estimate can offer pages past the real end (the highest id counts
+    deleted rows too); asking for one counts exactly and gives the real last
+    page instead.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimate_rows(self.object_list)
+            if estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+    def page(self, number):
+        page = super().page(number)
+        if page.number > 1 and not page.object_list:
+            self.count = super().count
+            self.__dict__.pop("num_pages", None)
+            page = super().page(self.num_pages)
+        return page
+
+
+class AutocompleteFilter(admin.FieldListFilter):
+    """Filter on a foreign key picked in an autocomplete box.
+
+    The default related filter lists every related object on each page; this
+    one searches them through the admin's autocomplete view as the user types,
+    so the related model's admin needs ``search_fields``.
+    """
+
+    template = "admin/journal/autocomplete_filter.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.lookup_kwarg = f"{field_path}__{field.target_field.name}__exact"
+        self.lookup_val = get_last_value_from_parameters(params, self.lookup_kwarg)
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.form_field = field.formfield(
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+
+    def expected_parameters(self):
+        return [self.lookup_kwarg]
+
+    def get_facet_counts(self, pk_attname, filtered_qs):
+        return {}
+
+    def choices(self, changelist):
+        query_string = changelist.get_query_string(remove=[self.lookup_kwarg])
+        yield {
+            "selected": self.lookup_val is None,
+            "query_string": query_string,
+            "display": _("All"),
+        }
+        # Picking an object reloads the page with it added to query_string
+        yield {
+            "selected": self.lookup_val is not None,
+            "widget": self.form_field.widget.render(
+                self.lookup_kwarg,
+                self.lookup_val,
+                attrs={
+                    "id": f"filter_{self.lookup_kwarg}",
+                    "data-filter-lookup": self.lookup_kwarg,
+                    "data-filter-query": query_string,
+                },
+            ),
+        }
+
+
+class JournalEntryChangeList(ChangeList):
+    """Entries changelist that reads only the start of each entry's content."""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        return (
+            super()
+            .get_queryset(request, exclude_parameters)
+            .defer("content")
+            .annotate(content_start=Substr("content", 1, PREVIEW_LENGTH + 1))
+        )
+
+    def get_results(self, request):
+        super().get_results(request)
+        if self.paginator.count != self.result_count:
+            # The estimated count overshot and the last page was shown instead
+            self.result_count = self.paginator.count
+            self.page_num = self.paginator.num_pages
+
+    def hierarchy_days(self):
+        """Day rollup rows behind the date hierarchy, or None to use entries.
+
+        In high-volume mode the drill-down reads the indexed JournalDay rollup
+        (narrowed to the user filter) instead of running DISTINCT over every
+        entry's timestamp. It ignores search terms.
+        """
+        if not settings.ADMIN_HIGH_VOLUME:
+            return None
+        days = JournalDay.objects.all()
+        user_id = self.params.get("user__id__exact")
+        if user_id:
+            days = days.filter(user_id=user_id)
+        return days
 
 
 @admin.register(JournalEntry)
 class JournalEntryAdmin(admin.ModelAdmin):
-    """Admin interface for JournalEntry model."""
+    """Admin interface for JournalEntry model.
+
+    Set ``ADMIN_HIGH_VOLUME`` for tables with millions of entries: the user
+    filter becomes an autocomplete box, unfiltered pages show an estimated
+    count, the date hierarchy reads the day rollup and search goes through
+    the full-text index (see ``journal.search``).
+    """
 
     list_display = ["user", "timestamp", "content_preview"]
+    # Join the user for its column instead of loading it once per row
+    list_select_related = ["user"]
     list_filter = ["user", "timestamp"]
     search_fields = ["content", "user__username"]
     date_hierarchy = "timestamp"
     readonly_fields = ["timestamp", "updated_at"]
+    autocomplete_fields = ["user"]
+
+    @property
+    def show_full_result_count(self):
+        # Skips counting the whole table next to every filtered count
+        return not settings.ADMIN_HIGH_VOLUME
+
+    @property
+    def show_facets(self):
+        if settings.ADMIN_HIGH_VOLUME:
+            return admin.ShowFacets.NEVER
+        return admin.ShowFacets.ALLOW
+
+    @property
+    def media(self):
+        media = super().media
+        if settings.ADMIN_HIGH_VOLUME:
+            field = JournalEntry._meta.get_field("user")
+            media += AutocompleteSelect(field, self.admin_site).media
+            media += forms.Media(
+                js=["admin/js/jquery.init.js", "js/admin_autocomplete_filter.js"]
+            )
+        return media
+
+    def get_list_filter(self, request):
+        if settings.ADMIN_HIGH_VOLUME:
+            return [("user", AutocompleteFilter), "timestamp"]
+        return super().get_list_filter(request)
+
+    def get_paginator(self, request, queryset, per_page, *args, **kwargs):
+        if settings.ADMIN_HIGH_VOLUME:
+            return EstimatedCountPaginator(queryset, per_page, *args, **kwargs)
+        return super().get_paginator(request, queryset, per_page, *args, **kwargs)
+
+    def get_changelist(self, request, **kwargs):
+        return JournalEntryChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        if not (settings.ADMIN_HIGH_VOLUME and search_term):
+            return super().get_search_results(request, queryset, search_term)
+        # A username matches exactly, so it can use the users' unique index
+        return queryset.filter(
+            search.matches(search_term) | Q(user__username=search_term.strip())
+        ), False
 
     def content_preview(self, obj):
         """Show first 50 characters of content."""
-        return obj.content[:50] + "..." if len(obj.content) > 50 else obj.content
+        # Changelist rows carry content_start instead of the full content
+        content = getattr(obj, "content_start", None)
+        if content is None:
+            content = obj.content
+        return (
+            content[:PREVIEW_LENGTH] + "..."
+            if len(content) > PREVIEW_LENGTH
+            else content
+        )
 
     content_preview.short_description = "Content Preview"
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class JournalConfig(AppConfig):
     name = "journal"
+
+    def ready(self):
+        if settings.METRICS_ENABLED:
+            from .metrics import install_query_timer
+
+            connection_created.connect(install_query_timer)
@@ -0,0 +1,256 @@
+"""Async versions of the HTMX endpoints, used when serving over ASGI.
+
+With ``SERVER_MODE=asgi`` (see gunicorn.conf.py) these replace their
+counterparts in :mod:`journal.views`, so a request waiting on the database
+parks a coroutine instead of holding a worker thread. They behave exactly
+like the sync views: reads use the async ORM, the user comes from
+``request.auser()``, and writes that must commit together with their rollups
+run in one transaction through ``sync_to_async``, since transactions are not
+available from async code.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, render
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_http_methods
+from django_htmx.http import reswap, retarget
+
+from . import events, export, fragment_cache, preferences
+from .forms import JournalEntryForm
+from .models import JournalDay, JournalEntry, UserProfile
+from .views import (
+    ENTRY_LIST_TARGETS,
+    IDEMPOTENCY_KEY_REUSED,
+    MAX_IDEMPOTENCY_KEY_LENGTH,
+    IdempotencyKeyReused,
+    _create_entry_once,
+    _day_changed,
+    _delete_entry,
+    _entries_context,
+    _entries_keys,
+    _entry_batcher,
+    _export_response,
+    _not_modified,
+    _set_validators,
+    _shown_count,
+)
+
+# How soon a page reconnects after its event stream drops, in milliseconds
+EVENTS_RETRY_MS = 5000
+
+
+async def _entries_on(user, day):
+    """Load the user's entries for ``day`` before rendering them."""
+    return [
+        entry async for entry in JournalEntry.objects.filter(user=user).on_date(day)
+    ]
+
+
+async def _list_in_step(request, user, day, change):
+    """Async version of :func:`journal.views._list_in_step`."""
+    shown = _shown_count(request, day)
+    if shown is None:
+        return False
+    count = await JournalDay.objects.aentry_count(user.id, day)
+    return count == shown + change
+
+
+@login_required
+@require_http_methods(["POST"])
+async def create_entry_view(request):
+    """Handle creation of new journal entries (HTMX endpoint)."""
+    form = JournalEntryForm(request.POST)
+    if not form.is_valid():
+        return HttpResponse("Invalid form", status=400)
+
+    key = request.headers.get("Idempotency-Key") or request.POST.get("idempotency_key")
+    if key is not None and len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        return HttpResponse("Invalid idempotency key", status=400)
+
+    user = await request.auser()
+    write = (
+        _entry_batcher.asubmit
+        if settings.ENTRY_WRITE_BATCHING
+        else sync_to_async(_create_entry_once)
+    )
+    try:
+        entry, created = await write(
+            user,
+            form.cleaned_data["content"],
+            key,
+            request.headers.get("X-Journal-Page", ""),
+        )
+    except IdempotencyKeyReused:
+        return HttpResponse(IDEMPOTENCY_KEY_REUSED, status=422)
+    entry_date = timezone.localdate(entry.timestamp)
+    if created:
+        await fragment_cache.ainvalidate(*_entries_keys(user.id, entry_date))
+
+    if await _list_in_step(request, user, entry_date, change=1):
+        response = render(
+            request, "journal/partials/entry_added.html", {"entry": entry}
+        )
+        reswap(response, "none")
+    else:
+        response = render(
+            request,
+            "journal/partials/entries.html",
+            {
+                "entries": await _entries_on(user, entry_date),
+                "selected_date": entry_date,
+                "entry_saved": True,
+            },
+        )
+    if not created:
+        response["Idempotent-Replayed"] = "true"
+    return _day_changed(response, entry_date, has_entries=True)
+
+
+@login_required
+async def get_entries_by_date(request):
+    """Get journal entries for a specific date (HTMX endpoint)."""
+    date_str = request.GET.get("date")
+
+    if not date_str:
+        return JsonResponse({"error": "Date parameter is required"}, status=400)
+
+    try:
+        selected_date = timezone.datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return JsonResponse({"error": "Invalid date format"}, status=400)
+
+    target_id = request.GET.get("target", ENTRY_LIST_TARGETS[0])
+    if target_id not in ENTRY_LIST_TARGETS:
+        return JsonResponse({"error": "Invalid target"}, status=400)
+
+    user = await request.auser()
+    key = fragment_cache.entries_key(user.id, selected_date, target_id)
+    journal_day = await JournalDay.objects.afor_day(user.id, selected_date)
+    version = journal_day.version if journal_day else "0"
+    last_modified = journal_day.updated_at if journal_day else None
+    etag = fragment_cache.etag(key, version)
+
+    response = _not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    async def render_entries():
+        entries = await _entries_on(user, selected_date)
+        return render_to_string(
+            "journal/partials/entries.html",
+            _entries_context(entries, selected_date, target_id),
+            request,
+        )
+
+    html = await fragment_cache.aget_or_render(key, version, render_entries)
+    return _set_validators(HttpResponse(html), etag, last_modified)
+
+
+@login_required
+@require_http_methods(["POST"])
+async def delete_entry_view(request, entry_id):
+    """Delete a specific journal entry."""
+    target_id = request.GET.get("target", "entries-list")
+
+    user = await request.auser()
+    entry = await aget_object_or_404(JournalEntry, id=entry_id, user=user)
+    entry_date = timezone.localdate(entry.timestamp)
+    await sync_to_async(_delete_entry)(entry, request.headers.get("X-Journal-Page", ""))
+    await fragment_cache.ainvalidate(*_entries_keys(user.id, entry_date))
+
+    if await _list_in_step(request, user, entry_date, change=-1):
+        return _day_changed(HttpResponse(), entry_date, has_entries=True)
+
+    entries = await _entries_on(user, entry_date)
+    context = {
+        "entries": entries,
+        "selected_date": entry_date,
+    }
+    if target_id == "past-entries-container":
+        context["target_id"] = target_id
+
+    response = render(request, "journal/partials/entries.html", context)
+    if request.htmx and "shown" in request.POST:
+        retarget(response, f"#{target_id}")
+        reswap(response, "innerHTML")
+    return _day_changed(response, entry_date, has_entries=bool(entries))
+
+
+@login_required
+async def export_view(request):
+    """Async version of :func:`journal.views.export_view`.
+
+    Streams through :func:`journal.export.astream_export`, so the export is
+    sent as it is read instead of being collected in memory first.
+    """
+    export_format = request.GET.get("format", "jsonl")
+    if export_format not in export.FORMATS:
+        return JsonResponse({"error": "Invalid export format"}, status=400)
+
+    user = await request.auser()
+    return _export_response(
+        user, export_format, export.astream_export(user.id, export_format)
+    )
+
+
+async def _event_stream(user_id, page_id):
+    """Yield the user's events as they arrive, with keepalives while idle."""
+    subscription = events.subscribe(user_id, page_id)
+    try:
+        yield f"retry: {EVENTS_RETRY_MS}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), settings.EVENTS_KEEPALIVE
+                )
+            except TimeoutError:
+                yield ": keepalive\n\n"
+            else:
+                yield events.format_event(event)
+    finally:
+        # Runs when the client disconnects and Django cancels the stream
+        events.unsubscribe(subscription)
+
+
+@login_required
+async def events_view(request):
+    """Stream "day changed" events to an open journal page (SSE endpoint).
+
+    The page passes its id as ``page`` and sends it with its own writes, so
+    it isn't told about changes it made itself. Under WSGI every open stream
+    would hold a worker thread, so there the endpoint answers 204, which
+    tells EventSource not to reconnect.
+    """
+    if settings.SERVER_MODE != "asgi":
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    response = StreamingHttpResponse(
+        _event_stream(user.id, request.GET.get("page", "")),
+        content_type="text/event-stream",
+    )
+    patch_cache_control(response, no_cache=True)
+    # Ask nginx and similar proxies not to buffer the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+@require_http_methods(["POST"])
+async def update_theme(request):
+    """Update user theme preference."""
+    theme = request.POST.get("theme")
+    if theme in dict(UserProfile.THEME_CHOICES):
+        user = await request.auser()
+        updated = await UserProfile.objects.filter(user=user).aupdate(theme=theme)
+        if not updated:
+            await UserProfile.objects.acreate(user=user, theme=theme)
+        await preferences.aremember(request, theme=theme)
+    return HttpResponse(status=204)
@@ -0,0 +1,126 @@
+"""Authentication backend that caches users between requests.
+
+AuthenticationMiddleware loads ``request.user`` from the database on every
+request. :class:`CachedModelBackend` keeps recently seen users in a small
+in-process cache for ``USER_CACHE_TTL`` seconds instead. Saving or deleting a
+user (password changes and ``last_login`` updates included) or their profile
+drops the cached copy in that process and writes a new stamp for the user to
+the ``USER_CACHE_ALIAS`` cache, shared by every worker. A cached copy is only
+used while the user's stamp is the one it was cached with, so other workers
+reload the user on their next request. Async views (``request.auser()``)
+share the same cache.
+"""
+
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import transaction
+
+# Most users kept per process; the least recently used are dropped first
+MAX_CACHED_USERS = 1000
+
+_lock = threading.Lock()
+_users = OrderedDict()
+
+
+def _stamp_key(user_id):
+    return f"user-stamp:{user_id}"
+
+
+def _stamp(user_id):
+    """The user's current stamp in the shared cache, or None if unchanged."""
+    return caches[settings.USER_CACHE_ALIAS].get(_stamp_key(user_id))
+
+
+async def _astamp(user_id):
+    return await caches[settings.USER_CACHE_ALIAS].aget(_stamp_key(user_id))
+
+
+def _new_stamp(user_id):
+    """Make every process's cached copy of the user stale."""
+    caches[settings.USER_CACHE_ALIAS].set(
+        _stamp_key(user_id), uuid.uuid4().hex, timeout=None
+    )
+
+
+def _forget_locally(user_id):
+    with _lock:
+        _users.pop(user_id, None)
+
+
+def forget_user(user_id):
+    """Drop ``user_id`` from every process's user cache.
+
+    Inside a transaction this is done again once it commits, so no process
+    keeps a copy it read before the change was visible.
+    """
+
+    def forget():
+        _forget_locally(user_id)
+        _new_stamp(user_id)
+
+    forget()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(forget)
+
+
+def clear():
+    """Empty this process's user cache."""
+    with _lock:
+        _users.clear()
+
+
+def _cached_user(user_id, stamp):
+    """Return a copy of the cached user, or None if absent, expired or stale."""
+    with _lock:
+        cached = _users.get(user_id)
+        if cached is not None and cached[0] > time.monotonic() and cached[1] == stamp:
+            _users.move_to_end(user_id)
+            # A copy, so nothing a request sets on its user leaks into others
+            return copy.copy(cached[2])
+    return None
+
+
+def _cache_user(user_id, user, ttl, stamp):
+    with _lock:
+        _users[user_id] = (time.monotonic() + ttl, stamp, copy.copy(user))
+        _users.move_to_end(user_id)
+        while len(_users) > MAX_CACHED_USERS:
+            _users.popitem(last=False)
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose ``get_user`` is served from the user cache."""
+
+    def get_user(self, user_id):
+        ttl = settings.USER_CACHE_TTL
+        if ttl <= 0:
+            return super().get_user(user_id)
+
+        # Read before the user, so a change made in between reloads it next time
+        stamp = _stamp(user_id)
+        user = _cached_user(user_id, stamp)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                _cache_user(user_id, user, ttl, stamp)
+        return user
+
+    async def aget_user(self, user_id):
+        ttl = settings.USER_CACHE_TTL
+        if ttl <= 0:
+            return await super().aget_user(user_id)
+
+        stamp = await _astamp(user_id)
+        user = _cached_user(user_id, stamp)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                _cache_user(user_id, user, ttl, stamp)
+        return user
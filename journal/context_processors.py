@@ -0,0 +1,8 @@
+from django.utils.functional import SimpleLazyObject
+
+from .preferences import get_preferences
+
+
+def preferences(request):
+    """Expose the user's preferences to templates, loaded only if used."""
+    return {"preferences": SimpleLazyObject(lambda: get_preferences(request))}
@@ -0,0 +1,22 @@
+import datetime
+
+from django.utils import timezone
+
+
+def day_bounds(day):
+    """Return the half-open [start, end) datetime range covering a local day."""
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min), tz)
+    end = timezone.make_aware(
+        datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time.min),
+        tz,
+    )
+    return start, end
+
+
+def same_day_in_year(day, year):
+    """Return ``day`` moved to ``year``, or None if it doesn't exist (Feb 29)."""
+    try:
+        return day.replace(year=year)
+    except ValueError:
+        return None
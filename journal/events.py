@@ -0,0 +1,202 @@
+"""Live "day changed" events for open journal pages.
+
+Adding or deleting an entry publishes an event from inside the transaction
+that writes it; the SSE endpoint (``journal.async_views.events_view``)
+streams a user's events to each of their open pages. Connected pages are
+held by a per-process :class:`Broker` as one asyncio queue each, so an open
+page costs a coroutine and a queue, not a thread.
+
+How events reach the broker depends on ``EVENTS_BACKEND``:
+
+``local``
+    Handed to the broker when the transaction commits. Only pages connected
+    to the same worker process see them.
+``db``
+    Written to the JournalEvent table in the writer's transaction. Each
+    process runs one poller while it has pages connected, so events reach
+    pages on every worker within ``EVENTS_POLL_INTERVAL`` seconds. Expired
+    events are deleted by ``manage.py clear_journal_events``.
+"""
+
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import JournalEvent
+
+# Events held for a page that isn't reading them; the oldest are dropped,
+# later events for the same day supersede them anyway
+MAX_QUEUED_EVENTS = 100
+
+# Longest page id accepted as an event's origin
+MAX_ORIGIN_LENGTH = 64
+
+EVENT_FIELDS = ("date", "has_entries", "origin")
+
+# How long the db backend keeps looking for an event after it was created.
+# Ids are handed out before commit (on PostgreSQL), so an event can become
+# visible after ones with higher ids.
+LATE_COMMIT_WINDOW = timedelta(seconds=10)
+
+
+class Subscription:
+    """One connected page's queue of events, read from its event loop."""
+
+    def __init__(self, user_id, origin=""):
+        self.user_id = user_id
+        self.origin = origin
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=MAX_QUEUED_EVENTS)
+
+    def push(self, event):
+        """Queue ``event``; safe to call from any thread."""
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Broker:
+    """Fans events out to the pages connected to this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, user_id, origin=""):
+        subscription = Subscription(user_id, origin)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def has_subscribers(self):
+        with self._lock:
+            return bool(self._subscriptions)
+
+    def deliver(self, user_id, event):
+        """Send ``event`` to the user's pages, except the one that caused it."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            if event["origin"] and event["origin"] == subscription.origin:
+                continue
+            try:
+                subscription.push(event)
+            except RuntimeError:
+                # Its event loop has shut down
+                self.unsubscribe(subscription)
+
+
+broker = Broker()
+
+
+class LocalBackend:
+    """Deliver events to this process's pages once the write commits."""
+
+    def publish(self, user_id, event):
+        transaction.on_commit(lambda: broker.deliver(user_id, event))
+
+    def listen(self):
+        pass
+
+
+class DatabaseBackend:
+    """Relay events between processes through the JournalEvent table."""
+
+    def __init__(self):
+        self._poller = None
+
+    def publish(self, user_id, event):
+        JournalEvent.objects.create(user_id=user_id, **event)
+
+    def listen(self):
+        """Make sure this process polls for events while pages are connected."""
+        loop = asyncio.get_running_loop()
+        poller = self._poller
+        if poller is None or poller.done() or poller.get_loop() is not loop:
+            self._poller = loop.create_task(self._poll())
+
+    async def _poll(self):
+        started = timezone.now()
+        # Creation times of the events already delivered, by id
+        delivered = {}
+        while broker.has_subscribers():
+            await asyncio.sleep(settings.EVENTS_POLL_INTERVAL)
+            # Scan the whole window each time rather than only ids above the
+            # last one seen, which would skip events committed late
+            since = max(started, timezone.now() - LATE_COMMIT_WINDOW)
+            recent = JournalEvent.objects.filter(created_at__gte=since).order_by("id")
+            fields = ("id", "user_id", "created_at", *EVENT_FIELDS)
+            async for row in recent.values(*fields):
+                event_id = row.pop("id")
+                created_at = row.pop("created_at")
+                if event_id not in delivered:
+                    delivered[event_id] = created_at
+                    broker.deliver(row.pop("user_id"), row)
+            delivered = {
+                event_id: created_at
+                for event_id, created_at in delivered.items()
+                if created_at >= since
+            }
+
+
+BACKENDS = {
+    "local": LocalBackend,
+    "db": DatabaseBackend,
+}
+
+_backends = {}
+
+
+def get_backend():
+    """Return the configured backend, one instance per process."""
+    name = settings.EVENTS_BACKEND
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
+
+
+def day_changed(user_id, day, has_entries, origin=""):
+    """Publish that ``day`` gained or lost entries; call inside the write."""
+    event = {
+        "date": day,
+        "has_entries": has_entries,
+        "origin": (origin or "")[:MAX_ORIGIN_LENGTH],
+    }
+    get_backend().publish(user_id, event)
+
+
+def subscribe(user_id, origin=""):
+    """Start receiving the user's events in the current event loop."""
+    subscription = broker.subscribe(user_id, (origin or "")[:MAX_ORIGIN_LENGTH])
+    get_backend().listen()
+    return subscription
+
+
+def unsubscribe(subscription):
+    broker.unsubscribe(subscription)
+
+
+def format_event(event):
+    """Render ``event`` as a server-sent event."""
+    data = {"date": event["date"].isoformat(), "has_entries": event["has_entries"]}
+    return f"event: day-changed\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,147 @@
+"""Streaming export of a user's journal.
+
+Both formats are generators of byte chunks that read entries with
+``QuerySet.iterator()``, so an export holds one chunk of rows and one output
+buffer in memory however large the journal is. They back both the export
+endpoint (as a ``StreamingHttpResponse``) and ``manage.py export_journal``;
+:func:`astream_export` wraps them for responses served over ASGI.
+"""
+
+import io
+import json
+import zipfile
+from itertools import groupby
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from .models import JournalEntry
+
+# Rows fetched from the database per round trip
+EXPORT_CHUNK_SIZE = 2000
+
+# Output is flushed to the client in chunks of roughly this many bytes
+STREAM_BUFFER_SIZE = 64 * 1024
+
+FORMATS = {
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "zip": ("application/zip", "zip"),
+}
+
+
+def export_entries(user_id):
+    """Iterate over a user's entries, oldest first, without caching them."""
+    return (
+        JournalEntry.objects.filter(user_id=user_id)
+        .order_by("timestamp", "id")
+        .only("id", "content", "timestamp", "updated_at")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def export_filename(user, export_format):
+    """Download filename for ``user``'s export in ``export_format``."""
+    extension = FORMATS[export_format][1]
+    return f"journal-{user.username}-{timezone.localdate().isoformat()}.{extension}"
+
+
+def stream_export(user_id, export_format):
+    """Byte chunks of a user's journal in ``export_format`` ("jsonl" or "zip")."""
+    if export_format == "zip":
+        return stream_markdown_zip(user_id)
+    return stream_jsonl(user_id)
+
+
+async def astream_export(user_id, export_format):
+    """Async version of :func:`stream_export`.
+
+    Under ASGI, Django reads a sync iterator into a list before sending any of
+    it, so the whole export would sit in memory. This pulls one chunk at a
+    time, with its database reads, through ``sync_to_async``.
+    """
+    chunks = stream_export(user_id, export_format)
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        # Ends the row iterator's cursor if the client disconnected
+        await sync_to_async(chunks.close)()
+
+
+def stream_jsonl(user_id):
+    """One JSON object per line for each entry."""
+    buffer = io.BytesIO()
+    for entry in export_entries(user_id):
+        record = {
+            "id": entry.id,
+            "timestamp": entry.timestamp.isoformat(),
+            "updated_at": entry.updated_at.isoformat(),
+            "content": entry.content,
+        }
+        buffer.write(json.dumps(record, ensure_ascii=False).encode())
+        buffer.write(b"\n")
+        if buffer.tell() >= STREAM_BUFFER_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class _ZipOutput(io.RawIOBase):
+    """Write-only, unseekable sink that ZipFile writes into.
+
+    Because it can't seek, ZipFile writes each member's sizes in a trailing
+    data descriptor instead of going back to patch the header, so finished
+    bytes can be handed to the client straight away.
+    """
+
+    def __init__(self):
+        self._buffer = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self._buffer.write(data)
+
+    def size(self):
+        return self._buffer.tell()
+
+    def drain(self):
+        """Return and forget everything written so far."""
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+
+def _day_markdown(day, entries):
+    yield f"# {day.strftime('%B')} {day.day}, {day.year}\n".encode()
+    for entry in entries:
+        time = timezone.localtime(entry.timestamp).strftime("%I:%M %p").lstrip("0")
+        yield f"\n## {time}\n\n{entry.content.rstrip()}\n".encode()
+
+
+def stream_markdown_zip(user_id):
+    """A ZIP archive with one Markdown file per day, e.g. ``2025/2025-01-31.md``."""
+    output = _ZipOutput()
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        entries_by_day = groupby(
+            export_entries(user_id),
+            key=lambda entry: timezone.localdate(entry.timestamp),
+        )
+        for day, entries in entries_by_day:
+            info = zipfile.ZipInfo(
+                f"{day.year}/{day.isoformat()}.md",
+                date_time=(day.year, day.month, day.day, 0, 0, 0),
+            )
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, "w") as member:
+                for chunk in _day_markdown(day, entries):
+                    member.write(chunk)
+                    if output.size() >= STREAM_BUFFER_SIZE:
+                        yield output.drain()
+    # Closing the archive wrote the central directory
+    yield output.drain()
@@ -0,0 +1,86 @@
+"""Versioned cache for rendered HTML fragments.
+
+Each fragment is stored together with the version it was rendered for, so a
+lookup only hits when the caller's current version matches. Writers bump the
+version (see ``JournalDay.version``) and call :func:`invalidate`; workers that
+still hold an older copy in a process-local backend simply miss and re-render.
+"""
+
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import quote_etag
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def _cache():
+    return caches[settings.FRAGMENT_CACHE_ALIAS]
+
+
+def _count(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def entries_key(user_id, day, target_id):
+    """Cache key for a user's entries.html fragment on ``day`` for ``target_id``."""
+    return f"entries:{user_id}:{day.isoformat()}:{target_id}"
+
+
+def get_or_render(key, version, render):
+    """Return the cached fragment for ``key`` at ``version``, rendering on a miss."""
+    cache = _cache()
+    cached = cache.get(key)
+    if cached is not None and cached[0] == version:
+        _count("hits")
+        return cached[1]
+
+    _count("misses")
+    html = render()
+    cache.set(key, (version, html))
+    return html
+
+
+async def aget_or_render(key, version, render):
+    """Async version of :func:`get_or_render`; ``render`` is a coroutine function."""
+    cache = _cache()
+    cached = await cache.aget(key)
+    if cached is not None and cached[0] == version:
+        _count("hits")
+        return cached[1]
+
+    _count("misses")
+    html = await render()
+    await cache.aset(key, (version, html))
+    return html
+
+
+def etag(key, version):
+    """Return an ETag identifying the fragment stored under ``key`` at ``version``."""
+    return quote_etag(f"{key}:{version}:{_cache().version}")
+
+
+def invalidate(*keys):
+    """Drop the cached fragments for ``keys``."""
+    _cache().delete_many(keys)
+
+
+async def ainvalidate(*keys):
+    """Async version of :func:`invalidate`."""
+    await _cache().adelete_many(keys)
+
+
+def stats():
+    """Return this process's hit and miss counters."""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    lookups = hits + misses
+    return {
+        "backend": settings.FRAGMENT_CACHE_BACKEND,
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / lookups if lookups else 0.0,
+    }
@@ -0,0 +1,235 @@
+"""Bulk import of journal backups.
+
+Parsers read JSONL, CSV or Markdown (one file, or a ZIP of Markdown days as
+written by :mod:`journal.export`) one line at a time and yield
+:class:`ImportedEntry` records. :func:`import_entries` writes them in batches:
+each batch is one transaction with a single ``bulk_create`` and a single
+calendar rollup update, instead of a save and its signals per row.
+
+Entries keep their original timestamps. A record is skipped as a duplicate
+when the user already has an entry with the same content written in the same
+second, so importing the same backup twice adds nothing the second time.
+"""
+
+import csv
+import io
+import json
+import time
+import zipfile
+from collections import Counter, namedtuple
+from datetime import datetime
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import JournalDay, JournalEntry, bump_entries_version, hash_content
+
+# Records written per transaction
+IMPORT_BATCH_SIZE = 1000
+
+# Accepted formats and the file extensions they're detected from
+FORMATS = {
+    "jsonl": (".jsonl", ".ndjson"),
+    "csv": (".csv",),
+    "markdown": (".md", ".markdown"),
+    "zip": (".zip",),
+}
+
+# Day and entry headings in Markdown, e.g. "# January 31, 2025" / "## 9:15 AM"
+MARKDOWN_DAY_FORMATS = ["%B %d, %Y", "%Y-%m-%d"]
+MARKDOWN_TIME_FORMATS = ["%I:%M %p", "%H:%M"]
+
+ImportedEntry = namedtuple("ImportedEntry", ["timestamp", "content"])
+
+
+class ImportFormatError(ValueError):
+    """The input couldn't be parsed in the expected format."""
+
+
+def detect_format(filename):
+    """Guess the import format from a file name, or return None."""
+    name = filename.lower()
+    for import_format, extensions in FORMATS.items():
+        if name.endswith(extensions):
+            return import_format
+    return None
+
+
+def _parse_timestamp(value):
+    if not isinstance(value, str):
+        raise TypeError("timestamp must be an ISO 8601 string")
+    timestamp = datetime.fromisoformat(value)
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    return timestamp
+
+
+def _entry(timestamp, content):
+    if not isinstance(content, str) or not content.strip():
+        raise ValueError("content must be a non-empty string")
+    return ImportedEntry(_parse_timestamp(timestamp), content)
+
+
+def parse_jsonl(lines):
+    """Records from JSON lines with "timestamp" and "content" keys."""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            yield _entry(record["timestamp"], record["content"])
+        except (ValueError, KeyError, TypeError) as error:
+            raise ImportFormatError(f"Line {number}: {error}") from error
+
+
+def parse_csv(lines):
+    """Records from CSV with "timestamp" and "content" columns."""
+    reader = csv.DictReader(lines)
+    if not {"timestamp", "content"} <= set(reader.fieldnames or ()):
+        raise ImportFormatError("CSV needs 'timestamp' and 'content' columns")
+    for row in reader:
+        try:
+            yield _entry(row["timestamp"], row["content"])
+        except (ValueError, TypeError) as error:
+            raise ImportFormatError(f"Line {reader.line_num}: {error}") from error
+
+
+def _parse_heading(text, formats):
+    for heading_format in formats:
+        try:
+            return datetime.strptime(text.strip(), heading_format)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_markdown(lines):
+    """Records from Markdown days.
+
+    A ``# <date>`` heading starts a day and each ``## <time>`` heading under
+    it starts an entry; text before the first time heading is an entry at
+    midnight. Other headings are kept as entry content.
+    """
+    day = entry_time = None
+    body = []
+
+    def finish_entry():
+        content = "\n".join(body).strip()
+        if day is not None and content:
+            timestamp = datetime.combine(day, entry_time)
+            yield ImportedEntry(timezone.make_aware(timestamp), content)
+        body.clear()
+
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.startswith("# "):
+            heading = _parse_heading(line[2:], MARKDOWN_DAY_FORMATS)
+            if heading is not None:
+                yield from finish_entry()
+                day, entry_time = heading.date(), datetime.min.time()
+                continue
+        elif line.startswith("## ") and day is not None:
+            heading = _parse_heading(line[3:], MARKDOWN_TIME_FORMATS)
+            if heading is not None:
+                yield from finish_entry()
+                entry_time = heading.time()
+                continue
+        body.append(line)
+    yield from finish_entry()
+
+
+def parse_zip(file):
+    """Records from every Markdown file in a ZIP archive, in name order."""
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile as error:
+        raise ImportFormatError("Not a valid ZIP archive") from error
+    with archive:
+        names = sorted(
+            name for name in archive.namelist() if detect_format(name) == "markdown"
+        )
+        for name in names:
+            with archive.open(name) as member:
+                yield from parse_markdown(io.TextIOWrapper(member, encoding="utf-8"))
+
+
+def read_records(file, import_format):
+    """Stream records out of a binary file in ``import_format``."""
+    try:
+        if import_format == "zip":
+            yield from parse_zip(file)
+            return
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        parsers = {"jsonl": parse_jsonl, "csv": parse_csv, "markdown": parse_markdown}
+        yield from parsers[import_format](text)
+    except (UnicodeDecodeError, csv.Error) as error:
+        raise ImportFormatError(str(error)) from error
+
+
+def _to_second(timestamp):
+    return timestamp.replace(microsecond=0)
+
+
+def _import_batch(user_id, batch):
+    """Write one batch in a transaction; returns the number of new entries."""
+    with transaction.atomic():
+        new_entries = {}
+        for record in batch:
+            content_hash = hash_content(record.content)
+            key = (content_hash, _to_second(record.timestamp))
+            new_entries.setdefault(key, (content_hash, record))
+
+        # Unordered, so the lookup uses the (user, content_hash) index
+        existing = (
+            JournalEntry.objects.filter(
+                user_id=user_id,
+                content_hash__in={content_hash for content_hash, _ in new_entries},
+            )
+            .order_by()
+            .values_list("content_hash", "timestamp")
+        )
+        for content_hash, timestamp in existing:
+            new_entries.pop((content_hash, _to_second(timestamp)), None)
+
+        entries = JournalEntry.objects.bulk_create(
+            JournalEntry(
+                user_id=user_id,
+                content=record.content,
+                content_hash=content_hash,
+                timestamp=record.timestamp,
+            )
+            for content_hash, record in new_entries.values()
+        )
+        JournalDay.objects.record_entries(
+            user_id, Counter(timezone.localdate(entry.timestamp) for entry in entries)
+        )
+    return len(entries)
+
+
+def import_entries(user_id, records, batch_size=IMPORT_BATCH_SIZE):
+    """Import ``records`` into ``user_id``'s journal in batches.
+
+    Batches commit as they go, so on a parse error the batches before it stay
+    imported; running the import again skips them as duplicates. Returns
+    counts of records read, imported and skipped, with the elapsed time and
+    throughput.
+    """
+    started = time.perf_counter()
+    read = imported = 0
+    records = iter(records)
+    try:
+        while batch := list(islice(records, batch_size)):
+            read += len(batch)
+            imported += _import_batch(user_id, batch)
+    finally:
+        if imported:
+            bump_entries_version(user_id)
+    elapsed = time.perf_counter() - started
+    return {
+        "read": read,
+        "imported": imported,
+        "duplicates": read - imported,
+        "seconds": elapsed,
+        "rows_per_sec": read / elapsed if elapsed else 0.0,
+    }
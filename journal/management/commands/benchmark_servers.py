@@ -0,0 +1,267 @@
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from journal.models import JournalDay, JournalEntry, hash_content
+
+SERVER_MODES = ["wsgi", "asgi"]
+
+# Seconds to wait for a server to start accepting connections
+STARTUP_TIMEOUT = 30
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec and latency of the WSGI and ASGI servers under "
+        "many concurrent calendar clicks (entries-by-date requests)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=200,
+            help="Clients clicking through the calendar at once",
+        )
+        parser.add_argument(
+            "--requests", type=int, default=4000, help="Requests sent per server mode"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=2, help="Gunicorn worker processes"
+        )
+        parser.add_argument(
+            "--days", type=int, default=90, help="Days with entries to click through"
+        )
+        parser.add_argument(
+            "--modes",
+            nargs="+",
+            choices=SERVER_MODES,
+            default=SERVER_MODES,
+            help="Server modes to compare",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON results")
+        # Internal: run the benchmark in this process against a scratch database
+        parser.add_argument("--run", action="store_true")
+
+    def handle(self, *args, **options):
+        args = (
+            options["modes"],
+            options["concurrency"],
+            options["requests"],
+            options["workers"],
+            options["days"],
+        )
+        if options["run"]:
+            self.stdout.write(json.dumps(self.run(*args)))
+            return
+
+        results = self.spawn(*args)
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'mode':<5} {'clients':>7} {'requests':>8} {'errors':>6} "
+            f"{'req/s':>8} {'p50 ms':>7} {'p99 ms':>7}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['mode']:<5} {result['concurrency']:>7} "
+                f"{result['requests']:>8} {result['errors']:>6} "
+                f"{result['requests_per_sec']:>8.1f} {result['p50_ms']:>7.1f} "
+                f"{result['p99_ms']:>7.1f}"
+            )
+
+    def spawn(self, *args):
+        """Run the benchmark in a child process with a scratch data directory."""
+        modes, concurrency, requests, workers, days = args
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = {**os.environ, "DATA_DIR": data_dir}
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(settings.BASE_DIR / "manage.py"),
+                    "benchmark_servers",
+                    "--run",
+                    "--modes",
+                    *modes,
+                    f"--concurrency={concurrency}",
+                    f"--requests={requests}",
+                    f"--workers={workers}",
+                    f"--days={days}",
+                ],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        if completed.returncode:
+            raise CommandError(completed.stderr.strip())
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def run(self, modes, concurrency, requests, workers, days):
+        """Seed a journal, then load each server mode with the same clicks."""
+        call_command("migrate", verbosity=0)
+        user = User.objects.create_user(username="benchmark")
+        dates = self.seed(user, days)
+
+        client = Client()
+        client.force_login(user)
+        session = client.cookies[settings.SESSION_COOKIE_NAME].value
+        connection.close()
+
+        return [
+            self.run_mode(mode, session, dates, concurrency, requests, workers)
+            for mode in modes
+        ]
+
+    def seed(self, user, days):
+        """Write a few entries on each of the last ``days`` days."""
+        today = timezone.localdate()
+        dates = [today - timedelta(days=offset) for offset in range(days)]
+        entries = []
+        for day in dates:
+            for index in range(3):
+                content = f"Benchmark entry {index} for {day}"
+                timestamp = datetime(day.year, day.month, day.day, 9 + index)
+                entries.append(
+                    JournalEntry(
+                        user=user,
+                        content=content,
+                        content_hash=hash_content(content),
+                        timestamp=timezone.make_aware(timestamp),
+                    )
+                )
+        JournalEntry.objects.bulk_create(entries)
+        JournalDay.objects.record_entries(user.id, {day: 3 for day in dates})
+        return [day.isoformat() for day in dates]
+
+    def run_mode(self, mode, session, dates, concurrency, requests, workers):
+        port = free_port()
+        env = {
+            **os.environ,
+            "SERVER_MODE": mode,
+            "DJANGO_DEBUG": "False",
+            "DJANGO_ALLOWED_HOSTS": "127.0.0.1",
+            "GUNICORN_BIND": f"127.0.0.1:{port}",
+            "GUNICORN_WORKERS": str(workers),
+            "GUNICORN_MAX_REQUESTS": "0",
+            "GUNICORN_ACCESS_LOG": os.devnull,
+            "GUNICORN_LOG_LEVEL": "warning",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"],
+            cwd=settings.BASE_DIR,
+            env=env,
+        )
+        try:
+            self.wait_until_listening(port, server)
+            result = self.load(port, session, dates, concurrency, requests)
+        finally:
+            server.terminate()
+            server.wait()
+        return {"mode": mode, "workers": workers, **result}
+
+    def wait_until_listening(self, port, server):
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"Server exited with status {server.returncode}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise CommandError(f"Server did not start within {STARTUP_TIMEOUT}s")
+
+    def load(self, port, session, dates, concurrency, requests):
+        """Send ``requests`` clicks from ``concurrency`` keep-alive clients.
+
+        Each client picks random days, as someone clicking around the
+        calendar would, and sends no validators so every click is answered
+        with the day's entries.
+        """
+        path = reverse("get_entries")
+        headers = {
+            "Cookie": f"{settings.SESSION_COOKIE_NAME}={session}",
+            "HX-Request": "true",
+        }
+        per_client = [requests // concurrency] * concurrency
+        for index in range(requests % concurrency):
+            per_client[index] += 1
+
+        latencies = []
+        errors = 0
+        lock = threading.Lock()
+        barrier = threading.Barrier(concurrency)
+
+        def clicker(count):
+            nonlocal errors
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            timings, failed = [], 0
+            barrier.wait()
+            for _ in range(count):
+                query = urlencode({"date": random.choice(dates)})
+                started = time.perf_counter()
+                try:
+                    conn.request("GET", f"{path}?{query}", headers=headers)
+                    response = conn.getresponse()
+                    response.read()
+                    ok = response.status == 200
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    ok = False
+                timings.append(time.perf_counter() - started)
+                failed += not ok
+            conn.close()
+            with lock:
+                latencies.extend(timings)
+                errors += failed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(clicker, per_client))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            "concurrency": concurrency,
+            "requests": requests,
+            "errors": errors,
+            "seconds": elapsed,
+            "requests_per_sec": requests / elapsed,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+        }
@@ -0,0 +1,346 @@
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import get_resolver, reverse
+from django.utils import timezone
+
+from journal.management.commands.benchmark_servers import percentile
+from journal.models import JournalDay, JournalEntry
+from journal.query_budgets import VIEW_BUDGETS, count_queries
+
+HTMX = {"HX-Request": "true"}
+
+
+def journal_url_names():
+    """Names of every URL in journal/urls.py."""
+    return [
+        pattern.name
+        for pattern in get_resolver("journal.urls").url_patterns
+        if pattern.name
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every journal URL through the Django test client against a "
+        "seeded journal, reporting throughput, p50/p95/p99 latency and query "
+        "counts against each view's query budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=200, help="Timed requests per view"
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=10, help="Untimed requests per view first"
+        )
+        parser.add_argument(
+            "--users", type=int, default=20, help="Users to seed (see seed_journal)"
+        )
+        parser.add_argument(
+            "--years", type=float, default=3, help="Years of entries to seed"
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+        parser.add_argument(
+            "--views",
+            nargs="+",
+            choices=sorted(VIEW_BUDGETS),
+            help="Only benchmark these views (default: all)",
+        )
+        parser.add_argument(
+            "--output", help="Also save the results as JSON to this file"
+        )
+        parser.add_argument(
+            "--compare", help="Show changes against results saved with --output"
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON results")
+        # Internal: run the benchmark in this process against a scratch database
+        parser.add_argument("--run", action="store_true")
+
+    def handle(self, *args, **options):
+        missing = set(journal_url_names()) - set(VIEW_BUDGETS)
+        if missing:
+            raise CommandError(f"No query budget for: {', '.join(sorted(missing))}")
+
+        args = (
+            options["views"] or list(VIEW_BUDGETS),
+            options["requests"],
+            options["warmup"],
+            options["users"],
+            options["years"],
+            options["seed"],
+        )
+        if options["run"]:
+            self.stdout.write(json.dumps(self.run(*args)))
+            return
+
+        report = self.spawn(*args)
+        report["commit"] = current_commit()
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            baseline = None
+            if options["compare"]:
+                with open(options["compare"]) as compare:
+                    baseline = {
+                        result["view"]: result for result in json.load(compare)["views"]
+                    }
+            self.print_table(report, baseline)
+
+        over = [
+            result["view"] for result in report["views"] if not result["within_budget"]
+        ]
+        if over:
+            raise CommandError(f"Over query budget: {', '.join(over)}")
+
+    def print_table(self, report, baseline):
+        dataset = report["dataset"]
+        self.stdout.write(
+            f"{dataset['users']} users, {dataset['entries']} entries; benchmark "
+            f"user has {dataset['user_entries']} entries"
+        )
+        header = (
+            f"{'view':<21} {'req/s':>8} {'p50 ms':>7} {'p95 ms':>7} "
+            f"{'p99 ms':>7} {'queries':>7} {'budget':>6}"
+        )
+        if baseline is not None:
+            header += f" {'p95 change':>10}"
+        self.stdout.write(header)
+        for result in report["views"]:
+            line = (
+                f"{result['view']:<21} {result['requests_per_sec']:>8.1f} "
+                f"{result['p50_ms']:>7.2f} {result['p95_ms']:>7.2f} "
+                f"{result['p99_ms']:>7.2f} {result['queries']:>7} "
+                f"{result['query_budget']:>6}"
+            )
+            previous = (baseline or {}).get(result["view"])
+            if previous and previous["p95_ms"]:
+                change = result["p95_ms"] / previous["p95_ms"] - 1
+                line += f" {change:>+10.1%}"
+            if not result["within_budget"]:
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+    def spawn(self, *args):
+        """Run the benchmark in a child process with a scratch data directory."""
+        views, requests, warmup, users, years, seed = args
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = {**os.environ, "DATA_DIR": data_dir, "REQUEST_LOG": "False"}
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(settings.BASE_DIR / "manage.py"),
+                    "benchmark_views",
+                    "--run",
+                    "--views",
+                    *views,
+                    f"--requests={requests}",
+                    f"--warmup={warmup}",
+                    f"--users={users}",
+                    f"--years={years}",
+                    f"--seed={seed}",
+                ],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        if completed.returncode:
+            raise CommandError(completed.stderr.strip())
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def run(self, views, requests, warmup, users, years, seed):
+        """Seed a journal, then time each view as its most prolific user."""
+        call_command("migrate", verbosity=0)
+        call_command(
+            "seed_journal",
+            users=users,
+            years=years,
+            seed=seed,
+            stdout=io.StringIO(),
+        )
+        user = (
+            User.objects.annotate(entries=Count("journal_entries"))
+            .order_by("-entries")
+            .first()
+        )
+        # Staff, so the counters endpoints answer too
+        user.is_staff = True
+        user.save()
+        random.seed(seed)
+
+        # As deployed: no per-query debug logging
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=["testserver"]):
+            results = [
+                self.run_view(Scenarios(user), view, requests, warmup) for view in views
+            ]
+        return {
+            "dataset": {
+                "users": users,
+                "years": years,
+                "seed": seed,
+                "entries": JournalEntry.objects.count(),
+                "user_entries": user.entries,
+            },
+            "views": results,
+        }
+
+    def run_view(self, scenarios, view, requests, warmup):
+        """Time ``requests`` requests to ``view`` after ``warmup`` untimed ones."""
+        send = getattr(scenarios, view)
+        # Requests that need something set up first, outside the timing
+        prepare = getattr(scenarios, f"prepare_{view}", dict)
+        for _ in range(warmup):
+            send(**prepare())
+
+        latencies = []
+        most_queries = 0
+        for _ in range(requests):
+            arguments = prepare()
+            with count_queries() as queries:
+                started = time.perf_counter()
+                response = send(**arguments)
+                latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise CommandError(f"{view} answered {response.status_code}")
+            most_queries = max(most_queries, len(queries))
+
+        elapsed = sum(latencies)
+        latencies.sort()
+        budget = VIEW_BUDGETS[view]
+        return {
+            "view": view,
+            "requests": requests,
+            "seconds": elapsed,
+            "requests_per_sec": requests / elapsed,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "queries": most_queries,
+            "query_budget": budget,
+            "within_budget": most_queries <= budget,
+        }
+
+
+class Scenarios:
+    """One representative request per journal URL, made as ``user``.
+
+    Each method sends its view's request; ``prepare_<view>`` methods return
+    the arguments for the next one, set up outside the timed request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.client = Client()
+        self.client.force_login(user)
+        self.anonymous = Client()
+        self.today = timezone.localdate()
+        self.days = list(
+            JournalDay.objects.filter(user=user).values_list("date", flat=True)
+        )
+        self.theme = "light"
+
+    def journal(self):
+        return self.client.get(reverse("journal"))
+
+    def create_entry(self):
+        return self.client.post(
+            reverse("create_entry"), {"content": "Benchmark entry"}, headers=HTMX
+        )
+
+    def get_entries(self):
+        day = random.choice(self.days)
+        return self.client.get(
+            reverse("get_entries"), {"date": day.isoformat()}, headers=HTMX
+        )
+
+    def calendar_dates(self):
+        month = self.today - timedelta(days=random.randrange(365))
+        return self.client.get(
+            reverse("calendar_dates"), {"month": month.strftime("%Y-%m"), "months": 3}
+        )
+
+    def search_entries(self):
+        query = random.choice(("coffee", "walk", "rain garden"))
+        return self.client.get(reverse("search_entries"), {"q": query})
+
+    def timeline_entries(self):
+        return self.client.get(reverse("timeline_entries"), headers=HTMX)
+
+    def export_journal(self):
+        response = self.client.get(reverse("export_journal"), {"format": "jsonl"})
+        # Streamed, so the export only runs as its content is read
+        b"".join(response.streaming_content)
+        return response
+
+    def import_journal(self):
+        # The same backup every time, so all but the first import are skipped
+        # as duplicates
+        backup = io.BytesIO(
+            b'{"timestamp": "2020-01-01T09:00:00+00:00", "content": "Imported"}\n'
+        )
+        backup.name = "backup.jsonl"
+        return self.client.post(reverse("import_journal"), {"file": backup})
+
+    def prepare_delete_entry(self):
+        entry = JournalEntry.objects.create(user=self.user, content="To delete")
+        return {"entry": entry}
+
+    def delete_entry(self, entry):
+        return self.client.post(reverse("delete_entry", args=[entry.id]), headers=HTMX)
+
+    def update_theme(self):
+        self.theme = "dark" if self.theme == "light" else "light"
+        return self.client.post(reverse("update_theme"), {"theme": self.theme})
+
+    def journal_events(self):
+        return self.client.get(reverse("journal_events"))
+
+    def fragment_cache_stats(self):
+        return self.client.get(reverse("fragment_cache_stats"))
+
+    def metrics(self):
+        return self.client.get(reverse("metrics"))
+
+    def register(self):
+        return self.anonymous.get(reverse("register"))
+
+    def login(self):
+        return self.anonymous.get(reverse("login"))
+
+    def prepare_logout(self):
+        client = Client()
+        client.force_login(self.user)
+        return {"client": client}
+
+    def logout(self, client):
+        return client.post(reverse("logout"))
+
+
+def current_commit():
+    """The checked-out git commit, to tell saved results apart."""
+    completed = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=settings.BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return completed.stdout.strip() or None
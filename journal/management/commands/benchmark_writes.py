@@ -0,0 +1,182 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+
+from journal.management.commands.benchmark_servers import percentile
+from journal.models import JournalEntry
+from journal.views import _save_entry
+
+# Database profiles to compare, as environment overrides for a fresh process
+PROFILES = {
+    "baseline": {"SQLITE_TUNING": "False"},
+    "tuned": {"SQLITE_TUNING": "True"},
+    # Tuned, with entries committed in groups (journal.write_batching)
+    "batched": {"SQLITE_TUNING": "True", "ENTRY_WRITE_BATCHING": "True"},
+}
+
+
+class Command(BaseCommand):
+    help = "Measure journal entry write throughput under concurrent writers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--writers", type=int, default=8, help="Concurrent writer threads"
+        )
+        parser.add_argument(
+            "--writes", type=int, default=200, help="Entries written per writer"
+        )
+        parser.add_argument(
+            "--profiles",
+            nargs="+",
+            choices=sorted(PROFILES),
+            default=["baseline", "tuned", "batched"],
+            help="Database profiles to compare",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Most entries per batch with the batched profile "
+            "(default: ENTRY_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--batch-interval",
+            type=float,
+            help="Milliseconds a batch waits for more entries with the batched "
+            "profile (default: ENTRY_BATCH_INTERVAL_MS)",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON results")
+        # Internal: run one profile in this process against a scratch database
+        parser.add_argument("--run-profile", choices=sorted(PROFILES))
+
+    def handle(self, *args, **options):
+        if options["run_profile"]:
+            result = self.run_profile(
+                options["run_profile"], options["writers"], options["writes"]
+            )
+            self.stdout.write(json.dumps(result))
+            return
+
+        batching = {
+            name: str(options[option])
+            for name, option in [
+                ("ENTRY_BATCH_SIZE", "batch_size"),
+                ("ENTRY_BATCH_INTERVAL_MS", "batch_interval"),
+            ]
+            if options[option] is not None
+        }
+        results = [
+            self.spawn_profile(profile, options["writers"], options["writes"], batching)
+            for profile in options["profiles"]
+        ]
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'profile':<10} {'writers':>7} {'committed':>9} {'errors':>6} "
+            f"{'seconds':>8} {'writes/s':>9} {'p50 ms':>7} {'p99 ms':>7}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['profile']:<10} {result['writers']:>7} "
+                f"{result['committed']:>9} {result['errors']:>6} "
+                f"{result['seconds']:>8.2f} {result['writes_per_sec']:>9.1f} "
+                f"{result['p50_ms']:>7.1f} {result['p99_ms']:>7.1f}"
+            )
+
+    def spawn_profile(self, profile, writers, writes, batching=None):
+        """Run a profile in a child process so its settings take effect.
+
+        ``batching`` holds environment overrides for the batch settings.
+        """
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = {
+                **os.environ,
+                **(batching or {}),
+                **PROFILES[profile],
+                "DATA_DIR": data_dir,
+            }
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(settings.BASE_DIR / "manage.py"),
+                    "benchmark_writes",
+                    f"--run-profile={profile}",
+                    f"--writers={writers}",
+                    f"--writes={writes}",
+                ],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def run_profile(self, profile, writers, writes):
+        """Write entries from concurrent threads, as create_entry_view does.
+
+        Each write is one request's: its own transaction, or a place in a
+        shared batch under the batched profile. Runs in a child process
+        against a scratch database; failed writes ("database is locked") are
+        counted rather than retried.
+        """
+        call_command("migrate", verbosity=0)
+        user = User.objects.create_user(username="benchmark")
+        connection.close()
+
+        committed = []
+        errors = []
+        latencies = []
+        start_barrier = threading.Barrier(writers)
+
+        def writer(index):
+            ok = failed = 0
+            timings = []
+            start_barrier.wait()
+            for i in range(writes):
+                started = time.perf_counter()
+                try:
+                    _save_entry(user, f"Writer {index} entry {i}", None)
+                    ok += 1
+                except OperationalError:
+                    failed += 1
+                timings.append((time.perf_counter() - started) * 1000)
+            committed.append(ok)
+            errors.append(failed)
+            latencies.extend(timings)
+            connection.close()
+
+        threads = [
+            threading.Thread(target=writer, args=(index,)) for index in range(writers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if JournalEntry.objects.filter(user=user).count() != sum(committed):
+            raise CommandError("Committed writes are missing from the database")
+
+        latencies.sort()
+        return {
+            "profile": profile,
+            "writers": writers,
+            "committed": sum(committed),
+            "errors": sum(errors),
+            "seconds": elapsed,
+            "writes_per_sec": sum(committed) / elapsed,
+            "p50_ms": percentile(latencies, 0.5),
+            "p99_ms": percentile(latencies, 0.99),
+        }
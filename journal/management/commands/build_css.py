@@ -0,0 +1,50 @@
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+INPUT_CSS = settings.BASE_DIR / "assets" / "tailwind.css"
+OUTPUT_CSS = settings.BASE_DIR / "static" / "css" / "app.css"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile assets/tailwind.css into a minified static/css/app.css holding "
+        "only the Tailwind classes used by the templates and forms."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Rebuild whenever a template or the input CSS changes",
+        )
+
+    def handle(self, *args, **options):
+        command = [
+            settings.TAILWINDCSS_BIN,
+            "--input",
+            str(INPUT_CSS),
+            "--output",
+            str(OUTPUT_CSS),
+            "--minify",
+        ]
+        if options["watch"]:
+            command.append("--watch")
+
+        try:
+            result = subprocess.run(command, cwd=settings.BASE_DIR, check=False)
+        except FileNotFoundError as error:
+            raise CommandError(
+                f"Tailwind CLI '{settings.TAILWINDCSS_BIN}' not found. Install the "
+                "dev dependencies (uv sync) or set TAILWINDCSS_BIN."
+            ) from error
+        if result.returncode:
+            raise CommandError(f"Tailwind CLI exited with status {result.returncode}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {OUTPUT_CSS.relative_to(settings.BASE_DIR)} "
+                f"({OUTPUT_CSS.stat().st_size} bytes)"
+            )
+        )
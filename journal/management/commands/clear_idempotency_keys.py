@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from journal.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete entry submission keys older than IDEMPOTENCY_KEY_TTL."
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.expired().delete()
+        self.stdout.write(f"Deleted {deleted} expired idempotency keys")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from journal.models import JournalEvent
+
+
+class Command(BaseCommand):
+    help = "Delete live update events older than EVENTS_RETENTION."
+
+    def handle(self, *args, **options):
+        deleted, _ = JournalEvent.objects.expired().delete()
+        self.stdout.write(f"Deleted {deleted} expired events")
@@ -0,0 +1,48 @@
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from journal import export
+
+
+class Command(BaseCommand):
+    help = "Export a user's journal as JSONL or a ZIP of per-day Markdown files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User whose journal to export")
+        parser.add_argument(
+            "--format",
+            choices=sorted(export.FORMATS),
+            default="jsonl",
+            help="Export format",
+        )
+        parser.add_argument(
+            "--output",
+            "-o",
+            help="File to write (default: standard output)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist")
+
+        chunks = export.stream_export(user.id, options["format"])
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                written = self.write_chunks(chunks, output)
+            self.stdout.write(
+                self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}")
+            )
+        else:
+            self.write_chunks(chunks, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+
+    def write_chunks(self, chunks, output):
+        written = 0
+        for chunk in chunks:
+            output.write(chunk)
+            written += len(chunk)
+        return written
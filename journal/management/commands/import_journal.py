@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from journal import importer
+
+
+class Command(BaseCommand):
+    help = "Import a journal backup (JSONL, CSV, Markdown or a ZIP of Markdown)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="User to import the entries for")
+        parser.add_argument("path", help="Backup file to import")
+        parser.add_argument(
+            "--format",
+            choices=sorted(importer.FORMATS),
+            help="Input format (default: detected from the file extension)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=importer.IMPORT_BATCH_SIZE,
+            help="Entries written per transaction",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist")
+
+        import_format = options["format"] or importer.detect_format(options["path"])
+        if import_format is None:
+            raise CommandError("Can't detect the format; pass --format")
+
+        try:
+            with open(options["path"], "rb") as backup:
+                result = importer.import_entries(
+                    user.id,
+                    importer.read_records(backup, import_format),
+                    batch_size=options["batch_size"],
+                )
+        except OSError as error:
+            raise CommandError(str(error))
+        except importer.ImportFormatError as error:
+            raise CommandError(f"Import stopped: {error}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['imported']} of {result['read']} entries "
+                f"({result['duplicates']} duplicates skipped) in "
+                f"{result['seconds']:.2f}s ({result['rows_per_sec']:.0f} rows/s)"
+            )
+        )
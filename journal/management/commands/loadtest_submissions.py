@@ -0,0 +1,147 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from journal.models import JournalEntry
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent duplicate entry submissions (same idempotency key) "
+        "and check that each submission is written exactly once."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--submissions", type=int, default=100, help="Distinct entries submitted"
+        )
+        parser.add_argument(
+            "--duplicates",
+            type=int,
+            default=4,
+            help="Concurrent copies of each submission",
+        )
+        parser.add_argument(
+            "--without-keys",
+            action="store_true",
+            help="Omit idempotency keys, to see the duplicates they prevent",
+        )
+        parser.add_argument("--json", action="store_true", help="Print JSON results")
+        # Internal: run the load test in this process against a scratch database
+        parser.add_argument("--run", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["run"]:
+            result = self.run(
+                options["submissions"], options["duplicates"], options["without_keys"]
+            )
+            self.stdout.write(json.dumps(result))
+            return
+
+        result = self.spawn(
+            options["submissions"], options["duplicates"], options["without_keys"]
+        )
+        if options["json"]:
+            self.stdout.write(json.dumps(result, indent=2))
+        else:
+            for name, value in result.items():
+                if isinstance(value, float):
+                    value = f"{value:.2f}"
+                self.stdout.write(f"{name:<20} {value}")
+        if result["duplicates_written"] and not options["without_keys"]:
+            raise CommandError(
+                f"{result['duplicates_written']} duplicate entries were written"
+            )
+
+    def spawn(self, submissions, duplicates, without_keys):
+        """Run the load test in a child process with a scratch data directory."""
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = {
+                **os.environ,
+                "DATA_DIR": data_dir,
+                "DJANGO_ALLOWED_HOSTS": "localhost",
+            }
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    str(settings.BASE_DIR / "manage.py"),
+                    "loadtest_submissions",
+                    "--run",
+                    f"--submissions={submissions}",
+                    f"--duplicates={duplicates}",
+                    *(["--without-keys"] if without_keys else []),
+                ],
+                env=env,
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def run(self, submissions, duplicates, without_keys):
+        """POST every submission from ``duplicates`` threads at the same moment.
+
+        Each thread is a separate logged-in client; a barrier releases all
+        copies of a submission together so they race on the same key.
+        """
+        call_command("migrate", verbosity=0)
+        user = User.objects.create_user(username="loadtest")
+        connection.close()
+
+        url = reverse("create_entry")
+        keys = [uuid.uuid4().hex for _ in range(submissions)]
+        barrier = threading.Barrier(duplicates)
+        lock = threading.Lock()
+        counts = {"created": 0, "replayed": 0, "errors": 0}
+
+        def submitter():
+            client = Client(HTTP_HOST="localhost", raise_request_exception=False)
+            client.force_login(user)
+            for index, key in enumerate(keys):
+                barrier.wait()
+                data = {"content": f"Submission {index}"}
+                if not without_keys:
+                    data["idempotency_key"] = key
+                response = client.post(url, data, HTTP_HX_REQUEST="true")
+                if response.status_code != 200:
+                    outcome = "errors"
+                elif response.has_header("Idempotent-Replayed"):
+                    outcome = "replayed"
+                else:
+                    outcome = "created"
+                with lock:
+                    counts[outcome] += 1
+            connection.close()
+
+        threads = [threading.Thread(target=submitter) for _ in range(duplicates)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        written = JournalEntry.objects.filter(user=user).count()
+        requests = submissions * duplicates
+        return {
+            "submissions": submissions,
+            "requests": requests,
+            "entries_written": written,
+            "duplicates_written": written - submissions,
+            **counts,
+            "seconds": elapsed,
+            "requests_per_sec": requests / elapsed,
+        }
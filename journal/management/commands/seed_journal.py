@@ -0,0 +1,120 @@
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from journal import importer
+
+# Words the synthetic entries are made of; common enough that searches for
+# any of them match a realistic share of entries. Split from one string,
+# which is easier to read and extend than a list of 90 quoted words.
+WORDS = (  # noqa: SIM905
+    "today morning evening walk coffee work meeting friend family dinner "
+    "lunch book read wrote garden rain sun cold warm tired happy calm busy "
+    "project idea plan weekend trip train city park river dog cat music "
+    "movie call message letter home kitchen bread tea run bike swim doctor "
+    "school class lesson teacher child parent sister brother birthday gift "
+    "market shop money rent travel airport hotel beach mountain forest snow "
+    "spring summer autumn winter night sleep dream worry hope grateful slow "
+    "quiet loud late early again finally still maybe tomorrow yesterday week"
+).split()
+
+# Entry length in words: log-normal, so most entries are a short paragraph
+# and a few run to pages
+WORDS_MEDIAN = 40
+WORDS_SIGMA = 0.9
+MAX_WORDS = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic users and years of journal entries for load tests "
+        "and benchmarks. The same --seed always produces the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20, help="Users to create")
+        parser.add_argument(
+            "--years", type=float, default=3, help="Years of history to generate"
+        )
+        parser.add_argument(
+            "--max-entries-per-day",
+            type=int,
+            default=6,
+            help="Most entries a user writes on one day",
+        )
+        parser.add_argument(
+            "--prefix", default="seed", help="Usernames are <prefix>0, <prefix>1, ..."
+        )
+        parser.add_argument(
+            "--password",
+            help="Password for every seeded user (default: unusable password)",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        usernames = [f"{prefix}{index}" for index in range(options["users"])]
+        existing = User.objects.filter(username__in=usernames).values_list(
+            "username", flat=True
+        )
+        if existing:
+            raise CommandError(
+                f"User '{existing[0]}' already exists; pass another --prefix"
+            )
+
+        started = time.perf_counter()
+        rng = random.Random(options["seed"])
+        days = int(options["years"] * 365)
+        total = 0
+        for username in usernames:
+            user = User.objects.create_user(
+                username=username, password=options["password"]
+            )
+            records = generate_entries(rng, days, options["max_entries_per_day"])
+            total += importer.import_entries(user.id, records)["imported"]
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(usernames)} users with {total} entries in {elapsed:.1f}s"
+            )
+        )
+
+
+def generate_entries(rng, days, max_per_day):
+    """Yield one user's entries, oldest first, over the ``days`` before today.
+
+    Users differ the way real ones do: activity follows a Pareto
+    distribution (a few users write almost daily, most only now and then),
+    accounts start at different times, and entry lengths are log-normal.
+    """
+    activity = min(1.0, 0.15 * rng.paretovariate(1.2))
+    history = rng.randint(max(1, days // 10), max(1, days))
+    today = timezone.localdate()
+    for offset in range(history, 0, -1):
+        if rng.random() >= activity:
+            continue
+        day = today - timedelta(days=offset)
+        count = min(max_per_day, 1 + int(rng.expovariate(1.5)))
+        hours = sorted(rng.uniform(6, 24) for _ in range(count))
+        for hour in hours:
+            timestamp = datetime(day.year, day.month, day.day) + timedelta(hours=hour)
+            yield importer.ImportedEntry(
+                timezone.make_aware(timestamp), generate_content(rng)
+            )
+
+
+def generate_content(rng):
+    """Sentences of random words with a log-normally distributed length."""
+    length = rng.lognormvariate(0, WORDS_SIGMA) * WORDS_MEDIAN
+    words = rng.choices(WORDS, k=max(1, min(MAX_WORDS, int(length))))
+    sentences = []
+    while words:
+        size = rng.randint(5, 15)
+        sentence, words = words[:size], words[size:]
+        sentences.append(" ".join(sentence).capitalize() + ".")
+    return " ".join(sentences)
@@ -0,0 +1,246 @@
+"""Per-request performance metrics.
+
+:class:`journal.middleware.MetricsMiddleware` times every request and, while
+it runs, the request's database queries (through a wrapper installed on each
+new connection) and its template renders (through :class:`TimedDjangoTemplates`).
+Each request gets a ``Server-Timing`` header and one JSON line on the
+``journal.requests`` logger, and its timings are added to per-view histograms
+that ``/metrics/`` reports in the Prometheus text format.
+
+The work per request is a few ``perf_counter()`` calls and one locked update
+of fixed-size bucket counts, so it stays on in production. Like the fragment
+cache counters, the histograms are per worker process: each scrape reports
+the worker that answered it.
+"""
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.template.exceptions import TemplateDoesNotExist
+
+from . import fragment_cache
+
+logger = logging.getLogger("journal.requests")
+
+# Upper bounds of the histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# View label for requests that didn't resolve to a named URL
+UNRESOLVED = "unresolved"
+
+_timings = ContextVar("journal_request_timings", default=None)
+
+
+class RequestTimings:
+    """Time spent by one request, filled in as it runs."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total = 0.0
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Value of the request's ``Server-Timing`` header."""
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries", '
+            f"tpl;dur={self.template_time * 1000:.1f}, "
+            f"total;dur={self.total * 1000:.1f}"
+        )
+
+
+def start_request():
+    """Start timing the current request; returns a token for :func:`end_request`."""
+    timings = RequestTimings()
+    return timings, _timings.set(timings)
+
+
+def end_request(token):
+    _timings.reset(token)
+
+
+def time_queries(execute, sql, params, many, context):
+    """Database execute wrapper adding each query to the current request."""
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_queries += 1
+        timings.db_time += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """``connection_created`` receiver adding :func:`time_queries`."""
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
+
+
+class TimedTemplate(Template):
+    """Template that adds its render time to the current request."""
+
+    def render(self, context=None, request=None):
+        timings = _timings.get()
+        # Templates rendered while another one renders are already counted
+        if timings is None or timings.rendering:
+            return super().render(context, request)
+        timings.rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_time += time.perf_counter() - started
+            timings.rendering = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing each render for the metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observed values."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """Yield (le, cumulative count) pairs, ending with ``+Inf``."""
+        cumulative = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += count
+            yield bound, cumulative
+
+
+# name: (help, buckets, attribute of RequestTimings)
+METRICS = {
+    "journal_request_duration_seconds": (
+        "Time from the request reaching the application to its response",
+        DURATION_BUCKETS,
+        "total",
+    ),
+    "journal_request_db_seconds": (
+        "Time spent in database queries per request",
+        DURATION_BUCKETS,
+        "db_time",
+    ),
+    "journal_request_db_queries": (
+        "Database queries per request",
+        QUERY_COUNT_BUCKETS,
+        "db_queries",
+    ),
+    "journal_request_template_seconds": (
+        "Time spent rendering templates per request",
+        DURATION_BUCKETS,
+        "template_time",
+    ),
+}
+
+_lock = threading.Lock()
+# (metric name, view name) -> Histogram
+_histograms = {}
+
+
+def record(request, response, timings):
+    """Add a finished request to the histograms and the request log."""
+    match = request.resolver_match
+    view = match.view_name if match and match.url_name else UNRESOLVED
+    with _lock:
+        for name, (_, buckets, attribute) in METRICS.items():
+            histogram = _histograms.get((name, view))
+            if histogram is None:
+                histogram = _histograms[name, view] = Histogram(buckets)
+            histogram.observe(getattr(timings, attribute))
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            json.dumps(
+                {
+                    "view": view,
+                    "method": request.method,
+                    "status": response.status_code,
+                    "duration_ms": round(timings.total * 1000, 2),
+                    "db_queries": timings.db_queries,
+                    "db_ms": round(timings.db_time * 1000, 2),
+                    "template_ms": round(timings.template_time * 1000, 2),
+                }
+            )
+        )
+
+
+def clear():
+    """Forget this process's histograms."""
+    with _lock:
+        _histograms.clear()
+
+
+def _labels(**labels):
+    """Format Prometheus labels, escaping backslashes and quotes in values."""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def render_prometheus():
+    """Return this process's metrics in the Prometheus text format."""
+    with _lock:
+        snapshot = {
+            key: (list(histogram.samples()), histogram.sum, histogram.count)
+            for key, histogram in sorted(_histograms.items())
+        }
+
+    lines = []
+    for name, (help_text, _, _) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, view), (samples, total, count) in snapshot.items():
+            if metric != name:
+                continue
+            for bound, cumulative in samples:
+                lines.append(
+                    f"{name}_bucket{_labels(view=view, le=bound)} {cumulative}"
+                )
+            lines.append(f"{name}_sum{_labels(view=view)} {total}")
+            lines.append(f"{name}_count{_labels(view=view)} {count}")
+
+    cache = fragment_cache.stats()
+    for outcome, help_text in (
+        ("hits", "Fragment cache lookups served from the cache"),
+        ("misses", "Fragment cache lookups that rendered the fragment"),
+    ):
+        name = f"journal_fragment_cache_{outcome}_total"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_labels(backend=cache['backend'])} {cache[outcome]}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,196 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.core.exceptions import MiddlewareNotUsed
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from journal import metrics
+from journal.routers import reset_read_alias, use_read_alias
+
+# Cookie holding the time until which the client's reads stay on the primary
+PRIMARY_PIN_COOKIE = "journal_primary_until"
+
+# Backend recorded in sessions logged in before the user cache existed
+LEGACY_AUTH_BACKEND = "django.contrib.auth.backends.ModelBackend"
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that also runs natively under ASGI.
+
+    WhiteNoise's middleware is sync only, so under ASGI Django would run it,
+    and through it every request, in a thread. Looking up a static file never
+    touches the database, so it is done inline in either mode.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response, settings=settings):
+        super().__init__(get_response, settings=settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class MetricsMiddleware:
+    """Time each request's queries, template renders and total duration.
+
+    Adds a ``Server-Timing`` header to the response and records the request
+    in the metrics (see :mod:`journal.metrics`). Disabled by setting
+    ``METRICS_ENABLED`` to False.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, timings)
+
+    def finish(self, request, response, timings):
+        timings.finish()
+        response["Server-Timing"] = timings.server_timing()
+        metrics.record(request, response, timings)
+        return response
+
+
+class LegacySessionMiddleware:
+    """Move sessions logged in through ModelBackend to CachedModelBackend.
+
+    A session records the backend that logged it in, and Django logs it out
+    once that backend is no longer configured. Rewriting the recorded path
+    keeps older sessions logged in without listing ModelBackend too, which
+    would check every failed login's password twice. Safe to remove once
+    sessions from before the user cache have expired.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if request.session.get(BACKEND_SESSION_KEY) == LEGACY_AUTH_BACKEND:
+            request.session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if await request.session.aget(BACKEND_SESSION_KEY) == LEGACY_AUTH_BACKEND:
+            await request.session.aset(
+                BACKEND_SESSION_KEY, settings.AUTHENTICATION_BACKENDS[0]
+            )
+        return await self.get_response(request)
+
+
+class ReadReplicaMiddleware:
+    """Route read-heavy views to the read replica, with read-your-writes.
+
+    GET/HEAD requests for a view listed in ``REPLICA_READ_VIEWS`` read from
+    the replica. Any other method pins the client to the primary for
+    ``REPLICA_STICKY_SECONDS`` so the next page load sees the write even if
+    the replica lags behind.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django would run a sync process_view in a thread, setting the
+            # alias in a copy of the request's context that it can't be
+            # reset from
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.finish(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.finish(request, await self.get_response(request))
+
+    def finish(self, request, response):
+        token = getattr(request, "_read_alias_token", None)
+        if token is not None:
+            reset_read_alias(token)
+
+        if settings.DATABASE_READ_REPLICA and request.method not in ("GET", "HEAD"):
+            pinned_until = int(time.time()) + settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                str(pinned_until),
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.route(request)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.route(request)
+
+    def route(self, request):
+        if self.use_replica(request):
+            request._read_alias_token = use_read_alias(settings.DATABASE_READ_REPLICA)
+
+    def use_replica(self, request):
+        if not settings.DATABASE_READ_REPLICA:
+            return False
+        if request.method not in ("GET", "HEAD"):
+            return False
+        if request.resolver_match.url_name not in settings.REPLICA_READ_VIEWS:
+            return False
+        try:
+            pinned_until = int(request.COOKIES.get(PRIMARY_PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        return pinned_until < time.time()
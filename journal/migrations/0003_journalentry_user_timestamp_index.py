@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-17 06:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("journal", "0002_userprofile_alter_journalentry_options_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="journalentry",
+            index=models.Index(
+                fields=["user", "timestamp"], name="journal_jou_user_id_e6652d_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 6.0 on 2026-10-17 06:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_journal_days(apps, schema_editor):
+    JournalEntry = apps.get_model("journal", "JournalEntry")
+    JournalDay = apps.get_model("journal", "JournalDay")
+    rows = (
+        JournalEntry.objects.annotate(day=TruncDate("timestamp"))
+        .values("user_id", "day")
+        .annotate(entry_count=Count("id"))
+        .order_by()
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=2000):
+        batch.append(
+            JournalDay(
+                user_id=row["user_id"], date=row["day"], entry_count=row["entry_count"]
+            )
+        )
+        if len(batch) >= 2000:
+            JournalDay.objects.bulk_create(batch)
+            batch = []
+    JournalDay.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("journal", "0003_journalentry_user_timestamp_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JournalDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("entry_count", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="journal_days",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "date"), name="journal_day_unique_user_date"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_journal_days, migrations.RunPython.noop),
+    ]
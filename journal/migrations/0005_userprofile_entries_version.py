@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-17 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("journal", "0004_journalday"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="entries_version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
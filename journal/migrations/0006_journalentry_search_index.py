@@ -0,0 +1,86 @@
+# Generated by Django 6.0 on 2026-10-17 09:12
+
+from django.db import migrations
+
+# SQLite: an FTS5 index over entry content, using the entries table (through a
+# view that adds a per-user token) as external content so the text isn't
+# stored twice. Triggers keep the index in step with every write.
+SQLITE_FORWARD = [
+    """
+    CREATE VIEW journal_entry_search_source AS
+    SELECT id, content, 'u' || user_id AS user_key FROM journal_journalentry
+    """,
+    """
+    CREATE VIRTUAL TABLE journal_entry_search USING fts5(
+        content,
+        user_key,
+        content='journal_entry_search_source',
+        content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER journal_entry_search_insert
+    AFTER INSERT ON journal_journalentry BEGIN
+        INSERT INTO journal_entry_search (rowid, content, user_key)
+        VALUES (new.id, new.content, 'u' || new.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER journal_entry_search_delete
+    AFTER DELETE ON journal_journalentry BEGIN
+        INSERT INTO journal_entry_search (journal_entry_search, rowid, content, user_key)
+        VALUES ('delete', old.id, old.content, 'u' || old.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER journal_entry_search_update
+    AFTER UPDATE OF content, user_id ON journal_journalentry BEGIN
+        INSERT INTO journal_entry_search (journal_entry_search, rowid, content, user_key)
+        VALUES ('delete', old.id, old.content, 'u' || old.user_id);
+        INSERT INTO journal_entry_search (rowid, content, user_key)
+        VALUES (new.id, new.content, 'u' || new.user_id);
+    END
+    """,
+    "INSERT INTO journal_entry_search (journal_entry_search) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS journal_entry_search_update",
+    "DROP TRIGGER IF EXISTS journal_entry_search_delete",
+    "DROP TRIGGER IF EXISTS journal_entry_search_insert",
+    "DROP TABLE IF EXISTS journal_entry_search",
+    "DROP VIEW IF EXISTS journal_entry_search_source",
+]
+
+# PostgreSQL: a GIN index over the same expression journal.search queries with
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX journal_entry_search_idx ON journal_journalentry
+    USING GIN (to_tsvector('english'::regconfig, content))
+    """,
+]
+
+POSTGRES_REVERSE = ["DROP INDEX IF EXISTS journal_entry_search_idx"]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        vendor_statements = statements.get(schema_editor.connection.vendor, [])
+        for statement in vendor_statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("journal", "0005_userprofile_entries_version"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            run_for_vendor({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 6.0 on 2026-10-17 07:16
+
+import hashlib
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+# Adding a column makes SQLite rebuild journal_journalentry. The rebuild
+# fails while the search source view from 0006 references the table, and it
+# drops the table's search triggers, so both are set aside around it.
+SQLITE_SEARCH_DROP = [
+    "DROP TRIGGER IF EXISTS journal_entry_search_update",
+    "DROP TRIGGER IF EXISTS journal_entry_search_delete",
+    "DROP TRIGGER IF EXISTS journal_entry_search_insert",
+    "DROP VIEW IF EXISTS journal_entry_search_source",
+]
+
+SQLITE_SEARCH_CREATE = [
+    """
+    CREATE VIEW journal_entry_search_source AS
+    SELECT id, content, 'u' || user_id AS user_key FROM journal_journalentry
+    """,
+    """
+    CREATE TRIGGER journal_entry_search_insert
+    AFTER INSERT ON journal_journalentry BEGIN
+        INSERT INTO journal_entry_search (rowid, content, user_key)
+        VALUES (new.id, new.content, 'u' || new.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER journal_entry_search_delete
+    AFTER DELETE ON journal_journalentry BEGIN
+        INSERT INTO journal_entry_search (journal_entry_search, rowid, content, user_key)
+        VALUES ('delete', old.id, old.content, 'u' || old.user_id);
+    END
+    """,
+    """
+    CREATE TRIGGER journal_entry_search_update
+    AFTER UPDATE OF content, user_id ON journal_journalentry BEGIN
+        INSERT INTO journal_entry_search (journal_entry_search, rowid, content, user_key)
+        VALUES ('delete', old.id, old.content, 'u' || old.user_id);
+        INSERT INTO journal_entry_search (rowid, content, user_key)
+        VALUES (new.id, new.content, 'u' || new.user_id);
+    END
+    """,
+]
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == "sqlite":
+            for statement in statements:
+                schema_editor.execute(statement)
+
+    return run
+
+
+def backfill_content_hashes(apps, schema_editor):
+    JournalEntry = apps.get_model("journal", "JournalEntry")
+    batch = []
+    entries = JournalEntry.objects.only("id", "content").iterator(chunk_size=2000)
+    for entry in entries:
+        entry.content_hash = hashlib.sha256(entry.content.encode()).hexdigest()
+        batch.append(entry)
+        if len(batch) >= 2000:
+            JournalEntry.objects.bulk_update(batch, ["content_hash"])
+            batch = []
+    JournalEntry.objects.bulk_update(batch, ["content_hash"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("journal", "0006_journalentry_search_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(SQLITE_SEARCH_DROP), run_on_sqlite(SQLITE_SEARCH_CREATE)
+        ),
+        migrations.AddField(
+            model_name="journalentry",
+            name="content_hash",
+            field=models.CharField(default="", editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(
+            run_on_sqlite(SQLITE_SEARCH_CREATE), run_on_sqlite(SQLITE_SEARCH_DROP)
+        ),
+        migrations.RunPython(backfill_content_hashes, migrations.RunPython.noop),
+        # auto_now_add -> default=timezone.now is the same column; skip the
+        # table rebuild SQLite would otherwise do
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="journalentry",
+                    name="timestamp",
+                    field=models.DateTimeField(
+                        default=django.utils.timezone.now, editable=False
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="journalentry",
+            index=models.Index(
+                fields=["user", "content_hash"], name="journal_jou_user_id_11ce3c_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-17 10:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("journal", "0009_journalevent"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="journalday",
+            index=models.Index(fields=["date"], name="journal_jou_date_c1a08f_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="journalentry",
+            index=models.Index(
+                fields=["timestamp"], name="journal_jou_timesta_4cbb77_idx"
+            ),
+        ),
+    ]
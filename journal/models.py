@@ -1,7 +1,95 @@
-from django.db import models
+import hashlib
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from django.utils import timezone
+
+from journal.backends import forget_user
+from journal.dates import day_bounds, same_day_in_year
+
+
+class JournalEntryQuerySet(models.QuerySet):
+    """QuerySet helpers for journal entries."""
+
+    def on_date(self, day):
+        """Filter to entries written on a local day.
+
+        Uses a half-open timestamp range so the (user, timestamp) index can
+        answer the lookup instead of evaluating a date function per row.
+        """
+        start, end = day_bounds(day)
+        return self.filter(timestamp__gte=start, timestamp__lt=end)
+
+    def random_entry(self):
+        """Pick one entry uniformly at random without loading the whole set.
+
+        Counts the matching rows, resolves the primary key at a random offset,
+        and then loads only that row. Returns None if nothing matches.
+        """
+        total = self.count()
+        if not total:
+            return None
+        offset = random.randrange(total)
+        pk = self.order_by("-timestamp").values_list("pk", flat=True)[offset]
+        return (
+            JournalEntry.objects.only("id", "user_id", "content", "timestamp")
+            .filter(pk=pk)
+            .first()
+        )
+
+    def on_this_day(self, day):
+        """Filter to entries written on the same month/day in earlier years."""
+        first = self.order_by("timestamp").values_list("timestamp", flat=True).first()
+        if first is None:
+            return self.none()
+
+        ranges = models.Q()
+        for year in range(timezone.localtime(first).year, day.year):
+            past_day = same_day_in_year(day, year)
+            if past_day is not None:
+                start, end = day_bounds(past_day)
+                ranges |= models.Q(timestamp__gte=start, timestamp__lt=end)
+        if not ranges:
+            return self.none()
+        return self.filter(ranges)
+
+    def before(self, timestamp, pk=None):
+        """Entries strictly before a (timestamp, pk) position, newest first.
+
+        Keyset pagination for the timeline: each page continues from the last
+        row shown, so the (user, timestamp) index seeks straight to it however
+        deep the page is. Without ``pk`` everything at ``timestamp`` is
+        excluded too.
+        """
+        if pk is None:
+            position = models.Q(timestamp__lt=timestamp)
+        else:
+            # The redundant timestamp <= bound gives the index a range to seek
+            position = models.Q(timestamp__lte=timestamp) & (
+                models.Q(timestamp__lt=timestamp) | models.Q(pk__lt=pk)
+            )
+        return self.filter(position).order_by("-timestamp", "-pk")
+
+    def pick_memory(self, today, mode="random"):
+        """Pick a past entry to resurface on the journal page.
+
+        ``mode`` is either ``"random"`` (any entry before today) or
+        ``"on_this_day"`` (an entry from today's date in an earlier year).
+        """
+        if mode == "on_this_day":
+            return self.on_this_day(today).random_entry()
+        start, _ = day_bounds(today)
+        return self.filter(timestamp__lt=start).random_entry()
+
+
+def hash_content(content):
+    """Fingerprint of an entry's text, used to spot duplicates on import."""
+    return hashlib.sha256(content.encode()).hexdigest()
 
 
 class JournalEntry(models.Model):
@@ -11,14 +99,157 @@ class JournalEntry(models.Model):
         User, on_delete=models.CASCADE, related_name="journal_entries"
     )
     content = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    content_hash = models.CharField(max_length=64, editable=False)
+    # A default rather than auto_now_add so imports can keep original times
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = JournalEntryQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.user.username} - {self.timestamp}"
 
+    def save(self, *args, **kwargs):
+        self.content_hash = hash_content(self.content)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["user", "timestamp"]),
+            models.Index(fields=["user", "content_hash"]),
+            # Ordering and date drill-down across every user, in the admin
+            models.Index(fields=["timestamp"]),
+        ]
+
+
+class JournalDayQuerySet(models.QuerySet):
+    """QuerySet helpers for the per-user calendar rollup."""
+
+    def in_months(self, first_month, months=1):
+        """Filter to days within ``months`` calendar months from ``first_month``.
+
+        Raises ValueError if the window ends after the year 9999.
+        """
+        year, month = divmod(first_month.month - 1 + months, 12)
+        end = first_month.replace(year=first_month.year + year, month=month + 1, day=1)
+        return self.filter(date__gte=first_month.replace(day=1), date__lt=end)
+
+    def for_day(self, user_id, day):
+        """Return the rollup row for ``day``, or None if it has no entries."""
+        return (
+            self.filter(user_id=user_id, date=day)
+            .only("entry_count", "updated_at")
+            .first()
+        )
+
+    async def afor_day(self, user_id, day):
+        """Async version of :meth:`for_day`."""
+        return (
+            await self.filter(user_id=user_id, date=day)
+            .only("entry_count", "updated_at")
+            .afirst()
+        )
+
+    def entry_count(self, user_id, day):
+        """Return how many entries ``day`` has, or None if it has none."""
+        return (
+            self.filter(user_id=user_id, date=day)
+            .values_list("entry_count", flat=True)
+            .first()
+        )
+
+    async def aentry_count(self, user_id, day):
+        """Async version of :meth:`entry_count`."""
+        return (
+            await self.filter(user_id=user_id, date=day)
+            .values_list("entry_count", flat=True)
+            .afirst()
+        )
+
+    def record_entry(self, user_id, day):
+        """Count a new entry written on ``day``."""
+        bumped = self.filter(user_id=user_id, date=day).update(
+            entry_count=models.F("entry_count") + 1, updated_at=timezone.now()
+        )
+        if bumped:
+            return
+        try:
+            with transaction.atomic():
+                self.create(user_id=user_id, date=day, entry_count=1)
+        except IntegrityError:
+            # Another request created the row first; count on top of it.
+            self.record_entry(user_id, day)
+
+    def record_entries(self, user_id, day_counts):
+        """Count many new entries at once, given a mapping of day -> count.
+
+        Used by bulk imports, which skip the per-entry signals: one query
+        finds the existing days, then they are bumped and the rest created in
+        bulk.
+        """
+        if not day_counts:
+            return
+        now = timezone.now()
+        existing = self.filter(user_id=user_id, date__in=day_counts).only("date")
+        days = list(existing)
+        for day in days:
+            day.entry_count = models.F("entry_count") + day_counts[day.date]
+            day.updated_at = now
+        self.bulk_update(days, ["entry_count", "updated_at"])
+
+        seen = {day.date for day in days}
+        self.bulk_create(
+            JournalDay(user_id=user_id, date=date, entry_count=count)
+            for date, count in day_counts.items()
+            if date not in seen
+        )
+
+    def remove_entry(self, user_id, day):
+        """Uncount an entry deleted from ``day``, dropping the day when empty."""
+        decremented = self.filter(user_id=user_id, date=day, entry_count__gt=1).update(
+            entry_count=models.F("entry_count") - 1, updated_at=timezone.now()
+        )
+        if not decremented:
+            self.filter(user_id=user_id, date=day).delete()
+
+
+class JournalDay(models.Model):
+    """Per-user rollup of the days that have journal entries.
+
+    Kept in step with JournalEntry by signals so the calendar never has to
+    aggregate over a user's whole history.
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="journal_days"
+    )
+    date = models.DateField()
+    entry_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = JournalDayQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date} ({self.entry_count})"
+
+    @property
+    def version(self):
+        """Token identifying the current contents of this day."""
+        return f"{self.entry_count}-{self.updated_at.timestamp():.6f}"
+
+    class Meta:
+        ordering = ["date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "date"], name="journal_day_unique_user_date"
+            ),
+        ]
+        # The admin's date hierarchy reads days across every user
+        indexes = [models.Index(fields=["date"])]
 
 
 class UserProfile(models.Model):
@@ -31,19 +262,126 @@ class UserProfile(models.Model):
     ]
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
     theme = models.CharField(max_length=10, choices=THEME_CHOICES, default="system")
+    # Bumped whenever the user's entries change; used as a page validator
+    entries_version = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.user.username}'s profile"
 
 
+class IdempotencyKeyQuerySet(models.QuerySet):
+    """QuerySet helpers for entry submission keys."""
+
+    def expired(self):
+        """Filter to keys older than ``IDEMPOTENCY_KEY_TTL`` seconds."""
+        ttl = timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+        return self.filter(created_at__lt=timezone.now() - ttl)
+
+
+class IdempotencyKey(models.Model):
+    """Client-generated key identifying one entry submission.
+
+    Retried and double-submitted POSTs carry the same key. The unique
+    (user, key) constraint lets only one of them write; the others are
+    answered with the entry it created, as long as they sent the same
+    content (``content_hash``, empty for keys saved before it was kept).
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    key = models.CharField(max_length=64)
+    entry = models.ForeignKey(JournalEntry, on_delete=models.CASCADE, related_name="+")
+    content_hash = models.CharField(max_length=64, blank=True, default="")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = IdempotencyKeyQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.user_id} - {self.key}"
+
+    @property
+    def is_expired(self):
+        ttl = timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+        return self.created_at < timezone.now() - ttl
+
+    def matches(self, content):
+        """Whether ``content`` is what was first submitted with this key."""
+        return not self.content_hash or self.content_hash == hash_content(content)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="journal_idempotency_unique_user_key"
+            ),
+        ]
+        indexes = [models.Index(fields=["created_at"])]
+
+
+class JournalEventQuerySet(models.QuerySet):
+    """QuerySet helpers for live update events."""
+
+    def expired(self):
+        """Filter to events older than ``EVENTS_RETENTION`` seconds."""
+        retention = timedelta(seconds=settings.EVENTS_RETENTION)
+        return self.filter(created_at__lt=timezone.now() - retention)
+
+
+class JournalEvent(models.Model):
+    """A day's entries changed; relayed to the user's open pages.
+
+    Only used by the ``db`` events backend (see ``journal.events``), which
+    lets every worker process pick up changes made in the others.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    date = models.DateField()
+    has_entries = models.BooleanField()
+    # The page that made the change, which already shows it
+    origin = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    objects = JournalEventQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.user_id} - {self.date}"
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at"])]
+
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
 
 
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    # Check if profile exists (for existing users who might not have one yet)
-    if hasattr(instance, "profile"):
-        instance.profile.save()
+@receiver([post_save, post_delete], sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def forget_cached_profile_user(sender, instance, **kwargs):
+    forget_user(instance.user_id)
+
+
+def bump_entries_version(user_id):
+    UserProfile.objects.filter(user_id=user_id).update(
+        entries_version=models.F("entries_version") + 1
+    )
+
+
+@receiver(post_save, sender=JournalEntry)
+def count_journal_day(sender, instance, created, **kwargs):
+    if created:
+        JournalDay.objects.record_entry(
+            instance.user_id, timezone.localdate(instance.timestamp)
+        )
+        bump_entries_version(instance.user_id)
+
+
+@receiver(post_delete, sender=JournalEntry)
+def uncount_journal_day(sender, instance, **kwargs):
+    JournalDay.objects.remove_entry(
+        instance.user_id, timezone.localdate(instance.timestamp)
+    )
+    bump_entries_version(instance.user_id)
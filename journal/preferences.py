@@ -0,0 +1,47 @@
+"""Per-user display preferences, cached in the session.
+
+Every page needs the user's theme, so it is read from UserProfile once and
+kept in the session, which the auth middleware has already loaded. Views that
+change a preference update the session copy in the same request. The journal
+page reads the profile anyway and refreshes the copy from it, so changes made
+on another device show up on the next full page load.
+"""
+
+from .models import UserProfile
+
+SESSION_KEY = "journal_preferences"
+
+DEFAULT_PREFERENCES = {"theme": "system"}
+
+
+def get_preferences(request):
+    """Return the current user's preferences, loading them at most once."""
+    if not request.user.is_authenticated:
+        return dict(DEFAULT_PREFERENCES)
+
+    preferences = request.session.get(SESSION_KEY)
+    if preferences is None:
+        stored = (
+            UserProfile.objects.filter(user=request.user)
+            .values(*DEFAULT_PREFERENCES)
+            .first()
+        )
+        preferences = {**DEFAULT_PREFERENCES, **(stored or {})}
+        request.session[SESSION_KEY] = preferences
+    return preferences
+
+
+def remember(request, **changes):
+    """Update the session copy after preferences were saved or re-read."""
+    cached = request.session.get(SESSION_KEY)
+    preferences = {**DEFAULT_PREFERENCES, **(cached or {}), **changes}
+    if cached != preferences:
+        request.session[SESSION_KEY] = preferences
+
+
+async def aremember(request, **changes):
+    """Async version of :func:`remember`."""
+    cached = await request.session.aget(SESSION_KEY)
+    preferences = {**DEFAULT_PREFERENCES, **(cached or {}), **changes}
+    if cached != preferences:
+        await request.session.aset(SESSION_KEY, preferences)
@@ -0,0 +1,57 @@
+"""Query budgets: the most database queries a request may run.
+
+A view that starts querying once per row (an N+1 lookup, a lazy foreign key
+in a template or a ``list_display`` column) keeps working on small test data
+and only gets slow once someone has years of entries. Budgets catch that:
+``benchmark_views`` holds every journal URL to :data:`VIEW_BUDGETS` against a
+seeded journal, and the test suite (``tests/query_budgets.py``) holds views
+and admin changelists to their budgets with 10 and 1,000 rows, failing if the
+count changes with the number of rows.
+
+Budgets count every query a request runs once per-process caches (the user
+cache, cached sessions) are warm, including the session lookup.
+"""
+
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+# Journal URL name -> budget
+VIEW_BUDGETS = {
+    "journal": 7,
+    "create_entry": 8,
+    "get_entries": 3,
+    "calendar_dates": 2,
+    "search_entries": 2,
+    "timeline_entries": 2,
+    "export_journal": 2,
+    "import_journal": 3,
+    "delete_entry": 10,
+    "update_theme": 4,
+    "journal_events": 1,
+    "fragment_cache_stats": 1,
+    "metrics": 1,
+    "register": 0,
+    "login": 0,
+    "logout": 4,
+}
+
+# Admin URL name -> budget
+ADMIN_BUDGETS = {
+    "admin:journal_journalentry_changelist": 8,
+}
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL of every query run inside the block, on any database."""
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(record))
+        yield queries
@@ -0,0 +1,39 @@
+"""Database routing between the primary and an optional read replica.
+
+Reads go to the primary unless the current request has been marked as safe to
+serve from the replica (see ``journal.middleware.ReadReplicaMiddleware``).
+Writes and migrations always go to the primary.
+"""
+
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS
+
+_read_alias = ContextVar("journal_read_alias", default=None)
+
+
+def use_read_alias(alias):
+    """Route reads in the current context to ``alias``; returns a reset token."""
+    return _read_alias.set(alias)
+
+
+def reset_read_alias(token):
+    """Undo a previous :func:`use_read_alias`."""
+    _read_alias.reset(token)
+
+
+class ReadReplicaRouter:
+    """Send reads to the replica when the request allows it."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica mirrors the primary, so objects from either may relate
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,170 @@
+"""Full-text search over a user's journal entries.
+
+Backed by the index created in migration 0006: an FTS5 table on SQLite and a
+GIN index over ``to_tsvector('english', content)`` on PostgreSQL. Both paths
+return entries ranked by relevance with a highlighted snippet, and only ever
+read the searching user's rows (on SQLite the user is part of the MATCH
+expression, so other users' postings are skipped inside the index).
+
+On SQLite, a migration that rebuilds journal_journalentry has to drop the
+search source view and triggers first and recreate them after (see 0007).
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+from .models import JournalEntry
+
+PAGE_SIZE = 20
+
+# Longest query accepted, to keep MATCH expressions small
+MAX_QUERY_LENGTH = 200
+
+# Snippet highlight markers, swapped for <mark> once the snippet is escaped.
+# Private-use code points, so they never clash with anything a user typed.
+MARK_START = "\ue000"
+MARK_END = "\ue001"
+
+# Number of tokens around the matches in a SQLite snippet
+SNIPPET_TOKENS = 24
+
+_TERM_RE = re.compile(r"\w+")
+
+# PostgreSQL: must match the indexed expression in migration 0006 to use the
+# GIN index
+PG_DOCUMENT = "to_tsvector('english'::regconfig, content)"
+PG_TSQUERY = "websearch_to_tsquery('english'::regconfig, %s)"
+
+
+def search_terms(query):
+    """Split a free-text query into the words to search for."""
+    return _TERM_RE.findall(query[:MAX_QUERY_LENGTH])
+
+
+def fts_match_expression(user_id, terms):
+    """FTS5 MATCH expression for all ``terms`` within ``user_id``'s entries.
+
+    Every term is quoted, so FTS5 operators typed by the user are searched
+    for literally; the last term also matches as a prefix to support
+    search-as-you-type. A ``user_id`` of None matches every user's entries.
+    """
+    phrases = [f'"{term}"' for term in terms]
+    phrases[-1] += "*"
+    expression = f"content : ({' '.join(phrases)})"
+    if user_id is None:
+        return expression
+    return f'user_key : "u{user_id}" AND {expression}'
+
+
+def matches(query):
+    """A Q object filtering JournalEntry rows to those matching ``query``.
+
+    Lets other querysets (the admin's) filter through the full-text index
+    instead of scanning ``content`` with LIKE. Matches across all users and
+    carries no ranking; a query without words matches nothing.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return Q(pk__in=[])
+    if connection.vendor == "postgresql":
+        return Q(
+            RawSQL(
+                f"{PG_DOCUMENT} @@ {PG_TSQUERY}",
+                [" ".join(terms)],
+                output_field=BooleanField(),
+            )
+        )
+    return Q(
+        pk__in=RawSQL(
+            "SELECT rowid FROM journal_entry_search "
+            "WHERE journal_entry_search MATCH %s",
+            [fts_match_expression(None, terms)],
+        )
+    )
+
+
+def highlight(snippet):
+    """Escape a snippet and turn its match markers into <mark> tags."""
+    return (
+        escape(snippet)
+        .replace(MARK_START, '<mark class="search-hit">')
+        .replace(MARK_END, "</mark>")
+    )
+
+
+def search_entries(user_id, query, page=1, page_size=PAGE_SIZE):
+    """Search ``user_id``'s entries for ``query``.
+
+    Returns ``(entries, has_next)`` for the 1-based ``page``: entries are
+    ordered best match first and carry a ``snippet`` attribute holding safe
+    HTML. Pages are fetched one row past ``page_size`` instead of counting
+    every match.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+
+    offset = (page - 1) * page_size
+    if connection.vendor == "postgresql":
+        rows = _search_postgres(user_id, " ".join(terms), offset, page_size + 1)
+    else:
+        rows = _search_sqlite(user_id, terms, offset, page_size + 1)
+
+    entries = list(rows)
+    for entry in entries:
+        entry.snippet = highlight(entry.snippet)
+    return entries[:page_size], len(entries) > page_size
+
+
+def _search_sqlite(user_id, terms, offset, limit):
+    # bm25() weights: content counts, user_key (the same for every row) doesn't
+    return JournalEntry.objects.raw(
+        """
+        SELECT e.id, e.user_id, e.timestamp,
+               snippet(journal_entry_search, 0, %s, %s, '…', %s) AS snippet
+        FROM journal_entry_search
+        JOIN journal_journalentry e ON e.id = journal_entry_search.rowid
+        WHERE journal_entry_search MATCH %s
+        ORDER BY bm25(journal_entry_search, 1.0, 0.0), e.timestamp DESC
+        LIMIT %s OFFSET %s
+        """,
+        [
+            MARK_START,
+            MARK_END,
+            SNIPPET_TOKENS,
+            fts_match_expression(user_id, terms),
+            limit,
+            offset,
+        ],
+    )
+
+
+def _search_postgres(user_id, query, offset, limit):
+    document = PG_DOCUMENT
+    tsquery = PG_TSQUERY
+    options = (
+        f"StartSel={MARK_START}, StopSel={MARK_END}, "
+        "MaxFragments=2, MaxWords=24, MinWords=8, FragmentDelimiter=…"
+    )
+    return (
+        JournalEntry.objects.filter(user_id=user_id)
+        .filter(
+            RawSQL(f"{document} @@ {tsquery}", [query], output_field=BooleanField())
+        )
+        .annotate(
+            rank=RawSQL(
+                f"ts_rank_cd({document}, {tsquery})", [query], output_field=FloatField()
+            ),
+            snippet=RawSQL(
+                f"ts_headline('english'::regconfig, content, {tsquery}, %s)",
+                [query, options],
+                output_field=TextField(),
+            ),
+        )
+        .only("id", "user_id", "timestamp")
+        .order_by("-rank", "-timestamp")[offset : offset + limit]
+    )
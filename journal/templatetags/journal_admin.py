@@ -0,0 +1,119 @@
+import datetime
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.db.models import Max, Min
+from django.utils import formats
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+register = template.Library()
+
+
+def rollup_dates(days, kind, exact):
+    """First dates of the ``kind`` periods ("year", "month", "day") in ``days``.
+
+    ``exact`` lists only periods holding a day, which scans the rollup rows
+    in range; use it once they are narrowed to one user. Otherwise every
+    period between the first and last day is listed, found with two index
+    seeks however many users wrote that month.
+    """
+    if exact:
+        return list(days.dates("date", kind))
+    bounds = days.aggregate(first=Min("date"), last=Max("date"))
+    first, last = bounds["first"], bounds["last"]
+    if first is None:
+        return []
+    if kind == "day":
+        return [
+            first + datetime.timedelta(days=offset)
+            for offset in range((last - first).days + 1)
+        ]
+    if kind == "month":
+        return [
+            datetime.date(year, month, 1)
+            for year in range(first.year, last.year + 1)
+            for month in range(1, 13)
+            if (first.year, first.month) <= (year, month) <= (last.year, last.month)
+        ]
+    return [datetime.date(year, 1, 1) for year in range(first.year, last.year + 1)]
+
+
+@register.inclusion_tag("admin/date_hierarchy.html")
+def journal_date_hierarchy(cl):
+    """Date drill-down for the entries changelist.
+
+    Builds the same links as Django's ``date_hierarchy`` tag, but lists the
+    years, months and days from ``cl.hierarchy_days()`` when it gives a day
+    rollup queryset, so no level runs DISTINCT over every entry.
+    """
+    days = cl.hierarchy_days()
+    if days is None:
+        return date_hierarchy(cl)
+    # A user filter narrows the rollup to few enough rows to list exactly
+    exact = bool(days.query.where)
+
+    fields = {part: f"{cl.date_hierarchy}__{part}" for part in ("year", "month", "day")}
+    year, month, day = (cl.params.get(fields[part]) for part in fields)
+
+    def link(**lookups):
+        return cl.get_query_string(
+            {fields[part]: value for part, value in lookups.items()},
+            [f"{cl.date_hierarchy}__"],
+        )
+
+    if not (year or month or day):
+        # Start at the narrowest level holding every day, as Django does
+        date_range = days.aggregate(first=Min("date"), last=Max("date"))
+        first, last = date_range["first"], date_range["last"]
+        if first and first.year == last.year:
+            year = first.year
+            if first.month == last.month:
+                month = first.month
+
+    if year and month and day:
+        date = datetime.date(int(year), int(month), int(day))
+        return {
+            "show": True,
+            "back": {
+                "link": link(year=year, month=month),
+                "title": capfirst(formats.date_format(date, "YEAR_MONTH_FORMAT")),
+            },
+            "choices": [
+                {"title": capfirst(formats.date_format(date, "MONTH_DAY_FORMAT"))}
+            ],
+        }
+    if year and month:
+        in_month = days.in_months(datetime.date(int(year), int(month), 1))
+        return {
+            "show": True,
+            "back": {"link": link(year=year), "title": str(year)},
+            "choices": [
+                {
+                    "link": link(year=year, month=month, day=date.day),
+                    "title": capfirst(formats.date_format(date, "MONTH_DAY_FORMAT")),
+                }
+                for date in rollup_dates(in_month, "day", exact)
+            ],
+        }
+    if year:
+        in_year = days.in_months(datetime.date(int(year), 1, 1), months=12)
+        return {
+            "show": True,
+            "back": {"link": link(), "title": _("All dates")},
+            "choices": [
+                {
+                    "link": link(year=year, month=date.month),
+                    "title": capfirst(formats.date_format(date, "YEAR_MONTH_FORMAT")),
+                }
+                for date in rollup_dates(in_year, "month", exact)
+            ],
+        }
+    return {
+        "show": True,
+        "back": None,
+        "choices": [
+            {"link": link(year=str(date.year)), "title": str(date.year)}
+            for date in rollup_dates(days, "year", exact)
+        ],
+    }
@@ -1,18 +1,34 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import async_views, views
 from .forms import CustomLoginForm
 
+# Served over ASGI, the HTMX endpoints use their async versions
+htmx_views = async_views if settings.SERVER_MODE == "asgi" else views
+
 urlpatterns = [
     path("", views.journal_view, name="journal"),
-    path("api/entries/create/", views.create_entry_view, name="create_entry"),
-    path("api/entries/date/", views.get_entries_by_date, name="get_entries"),
+    path("api/entries/create/", htmx_views.create_entry_view, name="create_entry"),
+    path("api/entries/date/", htmx_views.get_entries_by_date, name="get_entries"),
+    path("api/calendar/", views.calendar_dates_view, name="calendar_dates"),
+    path("api/search/", views.search_view, name="search_entries"),
+    path("api/timeline/", views.timeline_view, name="timeline_entries"),
+    path("api/export/", htmx_views.export_view, name="export_journal"),
+    path("api/import/", views.import_view, name="import_journal"),
     path(
         "api/entries/<int:entry_id>/delete/",
-        views.delete_entry_view,
+        htmx_views.delete_entry_view,
         name="delete_entry",
     ),
-    path("api/theme/update/", views.update_theme, name="update_theme"),
+    path("api/theme/update/", htmx_views.update_theme, name="update_theme"),
+    path("api/events/", async_views.events_view, name="journal_events"),
+    path(
+        "api/cache/stats/",
+        views.fragment_cache_stats_view,
+        name="fragment_cache_stats",
+    ),
+    path("metrics/", views.metrics_view, name="metrics"),
     path("register/", views.register_view, name="register"),
     path(
         "login/",
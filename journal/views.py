@@ -1,39 +1,296 @@
+import functools
+import hashlib
+import secrets
+from datetime import UTC, datetime
+from pathlib import Path
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.utils import timezone
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
-import random
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import IntegrityError, transaction
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django_htmx.http import reswap, retarget, trigger_client_event
 
-from .models import JournalEntry, UserProfile
+from . import (
+    events,
+    export,
+    fragment_cache,
+    importer,
+    metrics,
+    preferences,
+    search,
+    write_batching,
+)
+from .dates import day_bounds
+from .models import IdempotencyKey, JournalDay, JournalEntry, UserProfile
 from .forms import JournalEntryForm, CustomRegisterForm
 
+# Upper bound on the month window the calendar can request at once
+MAX_CALENDAR_MONTHS = 12
+
+# Entries per timeline page
+TIMELINE_PAGE_SIZE = 20
+
+# Timeline cursors: the last entry's UTC timestamp and id, URL-safe as is
+CURSOR_TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S.%f"
+
+# Longest idempotency key accepted on entry submissions
+MAX_IDEMPOTENCY_KEY_LENGTH = 64
+
+
+# Answer to a key repeated with different content, which isn't saved
+IDEMPOTENCY_KEY_REUSED = "Idempotency key already used for other content"
+
+
+class IdempotencyKeyReused(Exception):
+    """An idempotency key was sent again with different content."""
+
+
+# Lists get_entries_by_date can render: the calendar's day viewer (default)
+# and today's list, refreshed by live updates from the user's other devices
+ENTRY_LIST_TARGETS = ("past-entries-container", "entries-list")
+
+
+def _not_modified(request, etag, last_modified=None):
+    """Return a 304 response if the client's cached copy is still current."""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        _set_validators(response, etag, last_modified)
+    return response
+
+
+def _set_validators(response, etag, last_modified=None):
+    """Attach validators and make clients revalidate before reusing a copy."""
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _encode_cursor(entry):
+    """Timeline cursor pointing just past ``entry``."""
+    timestamp = entry.timestamp.astimezone(UTC).strftime(CURSOR_TIMESTAMP_FORMAT)
+    return f"{timestamp}_{entry.pk}"
+
+
+def _decode_cursor(cursor):
+    """Parse a timeline cursor into (timestamp, pk); raises ValueError."""
+    timestamp, pk = cursor.split("_")
+    timestamp = datetime.strptime(timestamp, CURSOR_TIMESTAMP_FORMAT)
+    return timestamp.replace(tzinfo=UTC), int(pk)
+
+
+def _shown_count(request, day):
+    """How many entries the client's list for ``day`` shows, if it says so.
+
+    Incremental HTMX requests post how many entries their list shows (and,
+    when adding, which day it is for). Returns None for other requests and
+    for lists of another day or empty lists, which always get the full list.
+    """
+    if not request.htmx:
+        return None
+    try:
+        shown = int(request.POST["shown"])
+    except (KeyError, ValueError):
+        return None
+    if request.POST.get("list_date", day.isoformat()) != day.isoformat():
+        return None
+    return shown if shown > 0 else None
+
+
+def _list_in_step(request, day, change):
+    """Whether the client's entry list for ``day`` only lacks this change.
+
+    If the stored count moved by anything else, e.g. from another tab or past
+    midnight, or the day is now empty, the caller sends the full list instead.
+    """
+    shown = _shown_count(request, day)
+    if shown is None:
+        return False
+    count = JournalDay.objects.entry_count(request.user.id, day)
+    return count == shown + change
+
+
+def _create_entry_once(user, content, key, origin=""):
+    """Create an entry unless ``key`` was already used for one.
+
+    Returns ``(entry, created)``. The entry and its key commit together, so
+    of several concurrent submissions with the same key only the first
+    writes; the others hit the unique constraint, roll back, and get the
+    entry the first one created, or IdempotencyKeyReused if they sent other
+    content. ``origin`` identifies the page that sent it, which is left out
+    of the live update.
+    """
+    try:
+        # One write transaction for the entry, its key, rollups and event
+        with transaction.atomic():
+            entry = JournalEntry.objects.create(user=user, content=content)
+            if key:
+                IdempotencyKey.objects.create(
+                    user=user, key=key, entry=entry, content_hash=entry.content_hash
+                )
+            events.day_changed(
+                user.id, timezone.localdate(entry.timestamp), True, origin
+            )
+        return entry, True
+    except IntegrityError:
+        if not key:
+            raise
+
+    existing = (
+        IdempotencyKey.objects.filter(user=user, key=key)
+        .select_related("entry")
+        .first()
+    )
+    if existing is None or existing.is_expired:
+        # The key was purged or is stale, so this is a new submission
+        IdempotencyKey.objects.filter(user=user, key=key).delete()
+        return _create_entry_once(user, content, key, origin)
+    if not existing.matches(content):
+        raise IdempotencyKeyReused(key)
+    return existing.entry, False
+
+
+# Groups entry inserts from concurrent requests when ENTRY_WRITE_BATCHING is on
+_entry_batcher = write_batching.WriteBatcher(_create_entry_once)
+
+
+def _save_entry(user, content, key, origin=""):
+    """Create an entry as :func:`_create_entry_once`, batched if configured."""
+    if settings.ENTRY_WRITE_BATCHING:
+        return _entry_batcher.submit(user, content, key, origin)
+    return _create_entry_once(user, content, key, origin)
+
+
+def _delete_entry(entry, origin=""):
+    """Delete ``entry`` and uncount it from its day in one transaction."""
+    day = timezone.localdate(entry.timestamp)
+    with transaction.atomic():
+        entry.delete()
+        has_entries = JournalDay.objects.entry_count(entry.user_id, day) is not None
+        events.day_changed(entry.user_id, day, has_entries, origin)
+
+
+def _entries_context(entries, day, target_id):
+    """Template context for entries.html rendered into ``target_id``."""
+    context = {"entries": entries, "selected_date": day}
+    # Today's list is the template's default; other lists are read-only
+    if target_id != "entries-list":
+        context["target_id"] = target_id
+    return context
+
+
+def _entries_keys(user_id, day):
+    """Fragment cache keys of every list of the user's entries on ``day``."""
+    return [
+        fragment_cache.entries_key(user_id, day, target)
+        for target in ENTRY_LIST_TARGETS
+    ]
+
+
+def _day_changed(response, day, has_entries):
+    """Tell the page's calendar that ``day`` gained or lost entries."""
+    return trigger_client_event(
+        response,
+        "journal:day-changed",
+        {"date": day.isoformat(), "has_entries": has_entries},
+    )
+
+
+@functools.cache
+def _build_token():
+    """Fingerprint of the deployed build, computed once per process.
+
+    Covers ``BUILD_ID``, the fragment cache version, the app's templates and
+    the static files manifest, so a deploy changing any of them changes the
+    journal page's ETag.
+    """
+    digest = hashlib.sha256()
+    digest.update(settings.BUILD_ID.encode())
+    digest.update(
+        str(settings.CACHES[settings.FRAGMENT_CACHE_ALIAS].get("VERSION")).encode()
+    )
+    templates = Path(__file__).resolve().parent / "templates"
+    for path in sorted(templates.rglob("*.html")):
+        digest.update(path.read_bytes())
+    # Hashed file names of the current assets, when collected with a manifest
+    read_manifest = getattr(staticfiles_storage, "read_manifest", None)
+    if read_manifest is not None:
+        digest.update((read_manifest() or "").encode())
+    return digest.hexdigest()[:16]
+
+
+def _journal_etag(request, profile, today):
+    """ETag for the journal page.
+
+    The page depends on the user's entries (entries_version), the current
+    day, the theme, the CSRF token embedded in its forms and the deployed
+    build. A revalidated page keeps the memory it showed until one of those
+    changes.
+    """
+    get_token(request)  # Make sure the CSRF secret exists before hashing it
+    csrf_secret = request.META.get("CSRF_COOKIE", "")
+    parts = [
+        request.user.id,
+        profile.entries_version,
+        today,
+        profile.theme,
+        _build_token(),
+    ]
+    digest = hashlib.sha256(f"{parts}:{csrf_secret}".encode()).hexdigest()
+    return quote_etag(digest[:32])
+
 
 @login_required
 def journal_view(request):
     """Main journal view with entry form and calendar."""
-    form = JournalEntryForm()
     today = timezone.now().date()
-    entries = JournalEntry.objects.filter(user=request.user, timestamp__date=today)
+
+    profile = (
+        UserProfile.objects.filter(user=request.user)
+        .only("user_id", "theme", "entries_version")
+        .first()
+    )
+    etag = None
+    if profile is not None:
+        # Pick up preference changes made from another session
+        preferences.remember(request, theme=profile.theme)
+        etag = _journal_etag(request, profile, today)
+        response = _not_modified(request, etag)
+        if response is not None:
+            return response
+
+    form = JournalEntryForm()
+    entries = JournalEntry.objects.filter(user=request.user).on_date(today)
 
     # Get random entry from the past
-    random_entry = None
-    past_entries = JournalEntry.objects.filter(
-        user=request.user, timestamp__date__lt=today
+    random_entry = JournalEntry.objects.filter(user=request.user).pick_memory(
+        today, mode=settings.JOURNAL_MEMORY_MODE
     )
-    if past_entries.exists():
-        random_entry = random.choice(list(past_entries))
 
-    # Get dates with entries for the calendar indicator
+    # Get dates with entries for the calendar indicator (visible month only,
+    # the calendar fetches other months from calendar_dates_view)
     dates_with_entries = (
-        JournalEntry.objects.filter(user=request.user)
-        .values_list("timestamp__date", flat=True)
-        .distinct()
-        .order_by("timestamp__date")  # Ordered chronologically
+        JournalDay.objects.filter(user=request.user)
+        .in_months(today)
+        .values_list("date", flat=True)
     )
 
-    return render(
+    response = render(
         request,
         "journal/journal.html",
         {
@@ -43,33 +300,69 @@ def journal_view(request):
             "today": today,
             "random_entry": random_entry,
             "dates_with_entries": list(dates_with_entries),
+            # Changes from the user's other devices stream in over ASGI
+            "live_updates": settings.SERVER_MODE == "asgi",
         },
     )
+    if etag is not None:
+        _set_validators(response, etag)
+    return response
 
 
 @login_required
 @require_http_methods(["POST"])
 def create_entry_view(request):
-    """Handle creation of new journal entries (HTMX endpoint)."""
+    """Handle creation of new journal entries (HTMX endpoint).
+
+    Submissions may carry an idempotency key (the form's ``idempotency_key``
+    field or an ``Idempotency-Key`` header). Repeating a key, e.g. on a
+    retry or a double click, answers with the entry first created for it
+    instead of writing it again; repeating it with other content is refused
+    with 422.
+    """
     form = JournalEntryForm(request.POST)
 
     if form.is_valid():
-        entry = form.save(commit=False)
-        entry.user = request.user
-        entry.save()
-
-        # Return entries for today (new entries are always for today)
-        today = timezone.now().date()
-        entries = JournalEntry.objects.filter(user=request.user, timestamp__date=today)
-        return render(
-            request,
-            "journal/partials/entries.html",
-            {
-                "entries": entries,
-                "selected_date": today,
-                "entry_saved": True,  # Flag for JS to show success feedback
-            },
+        key = request.headers.get("Idempotency-Key") or request.POST.get(
+            "idempotency_key"
         )
+        if key is not None and len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            return HttpResponse("Invalid idempotency key", status=400)
+
+        try:
+            entry, created = _save_entry(
+                request.user,
+                form.cleaned_data["content"],
+                key,
+                request.headers.get("X-Journal-Page", ""),
+            )
+        except IdempotencyKeyReused:
+            return HttpResponse(IDEMPOTENCY_KEY_REUSED, status=422)
+        entry_date = timezone.localdate(entry.timestamp)
+        if created:
+            fragment_cache.invalidate(*_entries_keys(request.user.id, entry_date))
+
+        if _list_in_step(request, entry_date, change=1):
+            # Prepend just the new entry to the list the page already shows
+            response = render(
+                request, "journal/partials/entry_added.html", {"entry": entry}
+            )
+            reswap(response, "none")
+        else:
+            # Return entries for today (new entries are always for today)
+            entries = JournalEntry.objects.filter(user=request.user).on_date(entry_date)
+            response = render(
+                request,
+                "journal/partials/entries.html",
+                {
+                    "entries": entries,
+                    "selected_date": entry_date,
+                    "entry_saved": True,  # Flag for JS to show success feedback
+                },
+            )
+        if not created:
+            response["Idempotent-Replayed"] = "true"
+        return _day_changed(response, entry_date, has_entries=True)
 
     # Handle invalid form (though mostly client-side validation handles this)
     return HttpResponse("Invalid form", status=400)
@@ -88,17 +381,121 @@ def get_entries_by_date(request):
     except ValueError:
         return JsonResponse({"error": "Invalid date format"}, status=400)
 
-    entries = JournalEntry.objects.filter(
-        user=request.user, timestamp__date=selected_date
-    )
+    target_id = request.GET.get("target", ENTRY_LIST_TARGETS[0])
+    if target_id not in ENTRY_LIST_TARGETS:
+        return JsonResponse({"error": "Invalid target"}, status=400)
 
+    key = fragment_cache.entries_key(request.user.id, selected_date, target_id)
+    journal_day = JournalDay.objects.for_day(request.user.id, selected_date)
+    version = journal_day.version if journal_day else "0"
+    last_modified = journal_day.updated_at if journal_day else None
+    etag = fragment_cache.etag(key, version)
+
+    response = _not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+
+    def render_entries():
+        entries = JournalEntry.objects.filter(user=request.user).on_date(selected_date)
+        return render_to_string(
+            "journal/partials/entries.html",
+            _entries_context(entries, selected_date, target_id),
+            request,
+        )
+
+    html = fragment_cache.get_or_render(key, version, render_entries)
+    return _set_validators(HttpResponse(html), etag, last_modified)
+
+
+@login_required
+def calendar_dates_view(request):
+    """Get the dates with entries for a window of months (JSON endpoint)."""
+    month_str = request.GET.get("month")
+
+    if not month_str:
+        return JsonResponse({"error": "Month parameter is required"}, status=400)
+
+    try:
+        first_month = timezone.datetime.strptime(month_str, "%Y-%m").date()
+        months = int(request.GET.get("months", 1))
+    except ValueError:
+        return JsonResponse({"error": "Invalid month format"}, status=400)
+
+    if not 1 <= months <= MAX_CALENDAR_MONTHS:
+        return JsonResponse({"error": "Invalid number of months"}, status=400)
+
+    try:
+        days = JournalDay.objects.filter(user=request.user).in_months(
+            first_month, months
+        )
+    except ValueError:
+        # The window runs past the last representable date
+        return JsonResponse({"error": "Invalid month"}, status=400)
+
+    dates = days.values_list("date", flat=True)
+    return JsonResponse({"dates": [day.isoformat() for day in dates]})
+
+
+@login_required
+def search_view(request):
+    """Search the user's entries, best match first (HTMX endpoint)."""
+    query = request.GET.get("q", "").strip()
+
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        return JsonResponse({"error": "Invalid page"}, status=400)
+
+    if page < 1:
+        return JsonResponse({"error": "Invalid page"}, status=400)
+
+    entries, has_next = search.search_entries(request.user.id, query, page)
     return render(
         request,
-        "journal/partials/entries.html",
+        "journal/partials/search_results.html",
         {
+            "query": query,
             "entries": entries,
-            "selected_date": selected_date,
-            "target_id": "past-entries-container",
+            "page": page,
+            "next_page": page + 1 if has_next else None,
+        },
+    )
+
+
+@login_required
+def timeline_view(request):
+    """Page through the user's entries before today, newest first (HTMX endpoint).
+
+    Pages are keyed on the (timestamp, id) of the last entry shown rather
+    than an offset, so every page costs the same however far back it is.
+    """
+    cursor = request.GET.get("cursor")
+    entries = JournalEntry.objects.filter(user=request.user)
+
+    if cursor:
+        try:
+            timestamp, pk = _decode_cursor(cursor)
+        except ValueError:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+        entries = entries.before(timestamp, pk)
+    else:
+        start, _ = day_bounds(timezone.localdate())
+        entries = entries.before(start)
+
+    # One row past the page tells whether there is a next page
+    page = list(entries[: TIMELINE_PAGE_SIZE + 1])
+    next_cursor = None
+    if len(page) > TIMELINE_PAGE_SIZE:
+        page = page[:TIMELINE_PAGE_SIZE]
+        next_cursor = _encode_cursor(page[-1])
+
+    return render(
+        request,
+        "journal/partials/timeline.html",
+        {
+            "entries": page,
+            "next_cursor": next_cursor,
+            "first_page": not cursor,
         },
     )
 
@@ -107,16 +504,21 @@ def get_entries_by_date(request):
 @require_http_methods(["POST"])
 def delete_entry_view(request, entry_id):
     """Delete a specific journal entry."""
+    target_id = request.GET.get("target", "entries-list")
+
     entry = get_object_or_404(JournalEntry, id=entry_id, user=request.user)
 
     # Capture the date before deleting to return the correct list
-    entry_date = entry.timestamp.date()
-    target_id = request.GET.get("target", "entries-list")
+    entry_date = timezone.localdate(entry.timestamp)
+    _delete_entry(entry, request.headers.get("X-Journal-Page", ""))
+    fragment_cache.invalidate(*_entries_keys(request.user.id, entry_date))
 
-    entry.delete()
+    if _list_in_step(request, entry_date, change=-1):
+        # An empty response swapped over the entry removes just that node
+        return _day_changed(HttpResponse(), entry_date, has_entries=True)
 
     # Return the updated list for that date
-    entries = JournalEntry.objects.filter(user=request.user, timestamp__date=entry_date)
+    entries = list(JournalEntry.objects.filter(user=request.user).on_date(entry_date))
 
     context = {
         "entries": entries,
@@ -127,11 +529,87 @@ def delete_entry_view(request, entry_id):
     if target_id == "past-entries-container":
         context["target_id"] = target_id
 
-    return render(
+    response = render(
         request,
         "journal/partials/entries.html",
         context,
     )
+    if request.htmx and "shown" in request.POST:
+        # The button targets its own entry; replace the whole list instead
+        retarget(response, f"#{target_id}")
+        reswap(response, "innerHTML")
+    return _day_changed(response, entry_date, has_entries=bool(entries))
+
+
+def _export_response(user, export_format, chunks):
+    """Attachment response streaming ``chunks`` of ``user``'s export."""
+    content_type, _ = export.FORMATS[export_format]
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    filename = export.export_filename(user, export_format)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+@login_required
+def export_view(request):
+    """Download the user's whole journal as JSONL or a ZIP of Markdown days."""
+    export_format = request.GET.get("format", "jsonl")
+    if export_format not in export.FORMATS:
+        return JsonResponse({"error": "Invalid export format"}, status=400)
+
+    return _export_response(
+        request.user,
+        export_format,
+        export.stream_export(request.user.id, export_format),
+    )
+
+
+@login_required
+@require_http_methods(["POST"])
+def import_view(request):
+    """Import an uploaded backup into the user's journal (JSON endpoint)."""
+    upload = request.FILES.get("file")
+    if upload is None:
+        return JsonResponse({"error": "File is required"}, status=400)
+
+    import_format = request.POST.get("format") or importer.detect_format(upload.name)
+    if import_format not in importer.FORMATS:
+        return JsonResponse({"error": "Unsupported file format"}, status=400)
+
+    try:
+        result = importer.import_entries(
+            request.user.id, importer.read_records(upload, import_format)
+        )
+    except importer.ImportFormatError as error:
+        return JsonResponse({"error": str(error)}, status=400)
+    return JsonResponse(result)
+
+
+@staff_member_required
+def fragment_cache_stats_view(request):
+    """Report fragment cache hit and miss counters for this worker."""
+    return JsonResponse(fragment_cache.stats())
+
+
+def _metrics_allowed(request):
+    """Staff users, and scrapers sending the METRICS_TOKEN bearer token."""
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        sent = request.headers.get("Authorization", "")
+        if secrets.compare_digest(sent.encode(), expected.encode()):
+            return True
+    return request.user.is_active and request.user.is_staff
+
+
+def metrics_view(request):
+    """Report this worker's request metrics in the Prometheus text format."""
+    if not _metrics_allowed(request):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+    return HttpResponse(
+        metrics.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
 
 
 def register_view(request):
@@ -153,7 +631,8 @@ def update_theme(request):
     """Update user theme preference."""
     theme = request.POST.get("theme")
     if theme in dict(UserProfile.THEME_CHOICES):
-        profile, created = UserProfile.objects.get_or_create(user=request.user)
-        profile.theme = theme
-        profile.save()
+        updated = UserProfile.objects.filter(user=request.user).update(theme=theme)
+        if not updated:
+            UserProfile.objects.create(user=request.user, theme=theme)
+        preferences.remember(request, theme=theme)
     return HttpResponse(status=204)
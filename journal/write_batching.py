@@ -0,0 +1,123 @@
+"""Group commit: many requests' writes committed in one transaction.
+
+On SQLite every write transaction takes the database lock, so a burst of
+submissions (everyone journaling at 10pm) queues on it, each request paying
+for its own BEGIN and COMMIT. With ``ENTRY_WRITE_BATCHING`` on, requests
+creating entries hand the write to a per-process :class:`WriteBatcher` and
+wait. Its writer thread collects writes until ``ENTRY_BATCH_SIZE`` are
+pending or ``ENTRY_BATCH_INTERVAL_MS`` have passed since the first, then runs
+them all in one transaction, each in a savepoint of its own so a failing
+write (say, a duplicate idempotency key) only undoes itself.
+
+A request is answered only once its batch has committed, so it still gets
+its entry back and reads its own write; if the commit fails, every request
+in the batch gets the error. A request gives up with TimeoutError after
+:func:`wait_timeout`, though its write may still commit later. Batches only
+group writes made by one worker process's threads or coroutines.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+# Database lock wait assumed when the connection settings don't give one
+DEFAULT_LOCK_TIMEOUT = 10
+
+
+def wait_timeout():
+    """Seconds a request waits for its write before giving up.
+
+    Long enough for the batch ahead of it and its own to each wait out the
+    batch interval and the database's lock timeout.
+    """
+    options = settings.DATABASES["default"].get("OPTIONS", {})
+    lock_timeout = options.get("timeout", DEFAULT_LOCK_TIMEOUT)
+    return 2 * (settings.ENTRY_BATCH_INTERVAL_MS / 1000 + lock_timeout)
+
+
+class WriteBatcher:
+    """Runs ``write(*args)`` calls from many threads in shared transactions.
+
+    ``write`` is called on the batcher's writer thread, inside the batch's
+    transaction; transaction.on_commit callbacks it registers run on that
+    thread too, once the batch commits.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self._pending = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, *args):
+        """Run ``write(*args)`` in the next batch and return its result.
+
+        Blocks until the batch commits; raises whatever the write, or the
+        batch's commit, raised, or TimeoutError after :func:`wait_timeout`.
+        """
+        return self._enqueue(args).result(timeout=wait_timeout())
+
+    async def asubmit(self, *args):
+        """Async version of :meth:`submit`, waiting without holding a thread."""
+        future = asyncio.wrap_future(self._enqueue(args))
+        # Shielded so a timeout doesn't cancel the future the writer resolves
+        return await asyncio.wait_for(asyncio.shield(future), wait_timeout())
+
+    def _enqueue(self, args):
+        future = Future()
+        self._pending.put((future, args))
+        with self._lock:
+            # Started on first use, so it runs in the process serving requests
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="journal-write-batcher", daemon=True
+                )
+                self._thread.start()
+        return future
+
+    def _run(self):
+        while True:
+            self.flush(self._collect())
+
+    def _collect(self):
+        """Wait for a write, then gather more until the batch is full or due."""
+        batch = [self._pending.get()]
+        deadline = time.monotonic() + settings.ENTRY_BATCH_INTERVAL_MS / 1000
+        while len(batch) < settings.ENTRY_BATCH_SIZE:
+            try:
+                batch.append(
+                    self._pending.get(timeout=max(0, deadline - time.monotonic()))
+                )
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self, batch):
+        """Run a batch of ``(future, args)`` writes in one transaction."""
+        outcomes = []
+        try:
+            close_old_connections()
+            with transaction.atomic():
+                for future, args in batch:
+                    try:
+                        with transaction.atomic():
+                            outcomes.append((future, self.write(*args), None))
+                    # Whatever a write raises is re-raised in its own request
+                    except Exception as error:  # noqa: BLE001
+                        outcomes.append((future, None, error))
+        # Raised in every request of the batch, so none waits forever
+        except Exception as error:  # noqa: BLE001
+            for future, _ in batch:
+                future.set_exception(error)
+            return
+
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
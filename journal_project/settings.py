@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
+    "whitenoise.runserver_nostatic",
     "django.contrib.staticfiles",
     "django_htmx",
     "journal.apps.JournalConfig",
@@ -51,20 +52,27 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Serves static files before sessions, auth etc. run
+    "journal.middleware.StaticFilesMiddleware",
+    # Times everything below it, including session and user lookups
+    "journal.middleware.MetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
+    "journal.middleware.LegacySessionMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django_htmx.middleware.HtmxMiddleware",
+    "journal.middleware.ReadReplicaMiddleware",
 ]
 
 ROOT_URLCONF = "journal_project.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates, timing renders for the request metrics
+        "BACKEND": "journal.metrics.TimedDjangoTemplates",
         "DIRS": [],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -72,6 +80,7 @@ TEMPLATES = [
                 "django.template.context_processors.request",
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
+                "journal.context_processors.preferences",
             ],
         },
     },
@@ -79,6 +88,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "journal_project.wsgi.application"
 
+# "wsgi" (threaded gunicorn workers) or "asgi" (uvicorn workers, async views
+# for the HTMX endpoints); see gunicorn.conf.py
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
@@ -90,14 +103,178 @@ if DATA_DIR:
 else:
     DATABASE_PATH = BASE_DIR / "db.sqlite3"
 
-DATABASES = {
-    "default": {
+# DATABASE_ENGINE selects the backend: "sqlite" (default) or "postgres"
+DATABASE_ENGINE = os.environ.get("DATABASE_ENGINE", "sqlite")
+
+# SQLite tuning, applied to every new connection. WAL lets readers run while
+# a write is in progress, IMMEDIATE transactions take the write lock up front
+# (so concurrent writers wait on the busy timeout instead of failing with
+# "database is locked"), and synchronous=NORMAL is durable under WAL except
+# for power loss. Set SQLITE_TUNING=False to fall back to SQLite's defaults.
+SQLITE_TUNING = os.environ.get("SQLITE_TUNING", "True") == "True"
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "20000"))
+
+
+def sqlite_database(path):
+    """Connection settings for the SQLite database file at ``path``."""
+    database = {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": DATABASE_PATH,
+        "NAME": path,
+    }
+    if SQLITE_TUNING:
+        database.update(
+            {
+                # Reuse connections across requests, checking them before reuse.
+                # Under ASGI each request's sync work runs in a fresh thread,
+                # so a kept connection would never be reused.
+                "CONN_MAX_AGE": int(
+                    os.environ.get(
+                        "DATABASE_CONN_MAX_AGE", "0" if SERVER_MODE == "asgi" else "600"
+                    )
+                ),
+                "CONN_HEALTH_CHECKS": True,
+                "OPTIONS": {
+                    "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+                    "transaction_mode": "IMMEDIATE",
+                    "init_command": (
+                        "PRAGMA journal_mode=WAL;"
+                        "PRAGMA synchronous=NORMAL;"
+                        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS};"
+                        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE};"
+                        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB};"
+                        "PRAGMA temp_store=MEMORY;"
+                    ),
+                },
+            }
+        )
+    return database
+
+
+def postgres_database(host):
+    """Connection settings for the PostgreSQL server at ``host``.
+
+    Uses psycopg's connection pool (install the "postgres" extra), so
+    CONN_MAX_AGE stays at 0.
+    """
+    return {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ.get("POSTGRES_DB", "journal"),
+        "USER": os.environ.get("POSTGRES_USER", "journal"),
+        "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+        "HOST": host,
+        "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "pool": {
+                "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", "2")),
+                "max_size": int(os.environ.get("POSTGRES_POOL_MAX_SIZE", "10")),
+                "timeout": 10,
+            },
+        },
+    }
+
+
+if DATABASE_ENGINE == "postgres":
+    DATABASES = {
+        "default": postgres_database(os.environ.get("POSTGRES_HOST", "localhost"))
     }
+    if os.environ.get("POSTGRES_REPLICA_HOST"):
+        DATABASES["replica"] = postgres_database(os.environ["POSTGRES_REPLICA_HOST"])
+else:
+    DATABASES = {"default": sqlite_database(DATABASE_PATH)}
+    if os.environ.get("DATABASE_REPLICA_PATH"):
+        DATABASES["replica"] = sqlite_database(
+            Path(os.environ["DATABASE_REPLICA_PATH"])
+        )
+
+# Read replica routing (see journal/routers.py). When a replica is configured,
+# GET requests to REPLICA_READ_VIEWS read from it; everything else, and every
+# request within REPLICA_STICKY_SECONDS of the same client's last write, uses
+# the primary so users always see their own writes.
+DATABASE_READ_REPLICA = "replica" if "replica" in DATABASES else None
+if DATABASE_READ_REPLICA:
+    DATABASES[DATABASE_READ_REPLICA]["TEST"] = {"MIRROR": "default"}
+DATABASE_ROUTERS = ["journal.routers.ReadReplicaRouter"]
+REPLICA_READ_VIEWS = [
+    "journal",
+    "get_entries",
+    "search_entries",
+    "timeline_entries",
+]
+REPLICA_STICKY_SECONDS = int(os.environ.get("DATABASE_REPLICA_STICKY_SECONDS", "10"))
+
+
+# Caches
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+
+# Rendered HTML fragments (see journal/fragment_cache.py). "locmem" is per
+# process; "file" and "db" are shared by every worker using the same data dir
+# or database ("db" needs `manage.py createcachetable`).
+FRAGMENT_CACHE_ALIAS = "fragments"
+FRAGMENT_CACHE_BACKEND = os.environ.get("FRAGMENT_CACHE_BACKEND", "locmem")
+FRAGMENT_CACHE_BACKENDS = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "journal-fragments",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": DATABASE_PATH.parent / "cache" / "fragments",
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "journal_fragment_cache",
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    FRAGMENT_CACHE_ALIAS: {
+        **FRAGMENT_CACHE_BACKENDS[FRAGMENT_CACHE_BACKEND],
+        "TIMEOUT": 60 * 60 * 24,
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+        # Bump when the cached templates change so stale HTML is never served
+        "VERSION": 1,
+    },
 }
 
 
+# Sessions and authentication
+# https://docs.djangoproject.com/en/6.0/topics/http/sessions/
+
+# "db" reads the session row on every request. "cached_db" serves reads from
+# the shared sessions cache below and only writes through to the database;
+# "signed_cookies" keeps the session in the cookie itself (no server reads,
+# but logging out can't revoke a copied cookie).
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "db")
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+
+# Shared by every worker, so a logout in one is seen by all of them
+SESSION_CACHE_ALIAS = "sessions"
+CACHES[SESSION_CACHE_ALIAS] = {
+    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+    "LOCATION": DATABASE_PATH.parent / "cache" / "sessions",
+}
+
+# request.user is cached per process for this many seconds (see
+# journal/backends.py); 0 loads it from the database on every request.
+# Sessions logged in through ModelBackend are moved over by
+# journal.middleware.LegacySessionMiddleware.
+AUTHENTICATION_BACKENDS = ["journal.backends.CachedModelBackend"]
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "60"))
+# Holds the per-user stamps that tell workers a cached user changed
+USER_CACHE_ALIAS = SESSION_CACHE_ALIAS
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -136,12 +313,93 @@ STATIC_URL = "static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Static files are served by WhiteNoise from the app process. Outside DEBUG,
+# collectstatic writes content-hashed names (e.g. app.3f2a9c1b2d4e.css) plus
+# gzip and Brotli variants; hashed files are sent with a far-future immutable
+# Cache-Control and "Vary: Accept-Encoding".
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage"
+            if DEBUG
+            else "whitenoise.storage.CompressedManifestStaticFilesStorage"
+        )
+    },
+}
+
+# Tailwind CLI used by `manage.py build_css` (installed with the dev
+# dependencies; the binary ships in the wheel, so no network is needed)
+TAILWINDCSS_BIN = os.environ.get("TAILWINDCSS_BIN", "tailwindcss")
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Request metrics (see journal/metrics.py): a Server-Timing header on every
+# response, per-view histograms at /metrics/ (staff, or a Prometheus scraper
+# sending "Authorization: Bearer <METRICS_TOKEN>") and, with REQUEST_LOG, one
+# JSON line per request on the "journal.requests" logger.
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "True") == "True"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+REQUEST_LOG = os.environ.get("REQUEST_LOG", "True") == "True"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "{message}", "style": "{"},
+    },
+    "handlers": {
+        "requests": {"class": "logging.StreamHandler", "formatter": "message"},
+    },
+    "loggers": {
+        "journal.requests": {
+            "handlers": ["requests"],
+            "level": "INFO" if REQUEST_LOG else "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
 # Authentication URLs
 LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "journal"
 LOGOUT_REDIRECT_URL = "login"
+
+# Identifies the deployed release (e.g. a git commit); part of the journal
+# page's ETag together with a hash of the templates and static files, so set
+# it when a release changes the page only through Python code.
+BUILD_ID = os.environ.get("BUILD_ID", "")
+
+# Journal
+# "random" resurfaces any past entry, "on_this_day" only entries written on
+# today's date in earlier years.
+JOURNAL_MEMORY_MODE = os.environ.get("JOURNAL_MEMORY_MODE", "random")
+
+# Live updates for open journal pages (server-sent events, ASGI only).
+# "local" relays changes to pages connected to the same worker process; "db"
+# goes through a table polled every EVENTS_POLL_INTERVAL seconds by each
+# worker, so it works with several workers.
+EVENTS_BACKEND = os.environ.get("EVENTS_BACKEND", "local")
+EVENTS_POLL_INTERVAL = float(os.environ.get("EVENTS_POLL_INTERVAL", "1"))
+# Events older than this many seconds are deleted by the "db" backend
+EVENTS_RETENTION = int(os.environ.get("EVENTS_RETENTION", "300"))
+# Comment lines sent to idle streams so proxies don't close them
+EVENTS_KEEPALIVE = int(os.environ.get("EVENTS_KEEPALIVE", "15"))
+
+# Group commit for new entries: requests hand their insert to a writer thread
+# that commits up to ENTRY_BATCH_SIZE of them in one transaction, at most
+# ENTRY_BATCH_INTERVAL_MS after the first was queued
+ENTRY_WRITE_BATCHING = os.environ.get("ENTRY_WRITE_BATCHING", "False") == "True"
+ENTRY_BATCH_SIZE = int(os.environ.get("ENTRY_BATCH_SIZE", "50"))
+ENTRY_BATCH_INTERVAL_MS = float(os.environ.get("ENTRY_BATCH_INTERVAL_MS", "2"))
+
+# Admin mode for very large entry tables: autocomplete user filter, estimated
+# counts, a date hierarchy read from the day rollup and full-text search
+ADMIN_HIGH_VOLUME = os.environ.get("ADMIN_HIGH_VOLUME", "False") == "True"
+
+# How long a submission's idempotency key is remembered; a retry within this
+# window returns the original entry instead of writing a duplicate
+IDEMPOTENCY_KEY_TTL = int(os.environ.get("IDEMPOTENCY_KEY_TTL", str(60 * 60 * 24)))
@@ -0,0 +1,14 @@
+// Reload the admin changelist when an autocomplete list filter is picked.
+'use strict';
+{
+    const $ = django.jQuery;
+    $(function() {
+        $('select[data-filter-lookup]').on('change', function() {
+            const params = new URLSearchParams(this.dataset.filterQuery);
+            if (this.value) {
+                params.set(this.dataset.filterLookup, this.value);
+            }
+            window.location.search = params.toString();
+        });
+    });
+}
@@ -0,0 +1,9 @@
+import pytest
+
+from tests.query_budgets import QueryBudget
+
+
+@pytest.fixture
+def query_budget():
+    """Hold requests to their query budgets (see tests/query_budgets.py)."""
+    return QueryBudget(pytest.fail)
@@ -0,0 +1,8 @@
+"""Factories shared by the test modules."""
+
+from journal.models import JournalEntry
+
+
+def create_entry(user, timestamp, content="Entry"):
+    """Create an entry for ``user`` written at ``timestamp``."""
+    return JournalEntry.objects.create(user=user, content=content, timestamp=timestamp)
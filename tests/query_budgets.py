@@ -0,0 +1,90 @@
+"""Test helpers holding requests to their query budgets.
+
+Use :class:`QueryBudgetMixin` in a TestCase, or the ``query_budget`` pytest
+fixture (see conftest.py); both give a :class:`QueryBudget`::
+
+    with self.query_budget.within("get_entries"):
+        self.client.get(url)
+
+    self.query_budget.scales(
+        "admin:journal_journalentry_changelist",
+        lambda: self.client.get(url),
+        add_rows=lambda count: ...,
+    )
+"""
+
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+from journal.query_budgets import ADMIN_BUDGETS, VIEW_BUDGETS, count_queries
+
+# Row counts a request is made at by QueryBudget.scales
+ROW_COUNTS = (10, 1000)
+
+
+def budget_for(name):
+    """The query budget for a journal or admin URL name."""
+    return {**VIEW_BUDGETS, **ADMIN_BUDGETS}[name]
+
+
+def _describe(queries):
+    return "\n".join(f"{number}. {sql}" for number, sql in enumerate(queries, 1))
+
+
+class QueryBudget:
+    """Assertions on the queries a request runs; ``fail`` reports a failure."""
+
+    def __init__(self, fail):
+        self.fail = fail
+
+    @contextmanager
+    def within(self, name):
+        """Fail if the block runs more queries than ``name``'s budget."""
+        budget = budget_for(name)
+        with count_queries() as queries:
+            yield queries
+        if len(queries) > budget:
+            self.fail(
+                f"{name} ran {len(queries)} queries, over its budget of "
+                f"{budget}:\n{_describe(queries)}"
+            )
+
+    def scales(self, name, request, add_rows, row_counts=ROW_COUNTS):
+        """Fail unless ``request()`` runs the same queries at every row count.
+
+        ``add_rows(count)`` adds ``count`` rows to what the request lists.
+        Cached fragments are dropped before each measurement so every run
+        renders its rows.
+        """
+        request()
+        counts = {}
+        total = 0
+        for row_count in row_counts:
+            add_rows(row_count - total)
+            total = row_count
+            caches[settings.FRAGMENT_CACHE_ALIAS].clear()
+            with self.within(name) as queries:
+                response = request()
+            if response.status_code != 200:
+                self.fail(f"{name} answered {response.status_code}")
+            counts[row_count] = queries
+
+        if len({len(queries) for queries in counts.values()}) > 1:
+            self.fail(
+                f"{name} queries grow with rows: "
+                + ", ".join(
+                    f"{len(queries)} with {row_count}"
+                    for row_count, queries in counts.items()
+                )
+                + f"\nWith {total} rows:\n{_describe(counts[total])}"
+            )
+
+
+class QueryBudgetMixin:
+    """Give a TestCase ``self.query_budget``."""
+
+    @property
+    def query_budget(self):
+        return QueryBudget(self.fail)
@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from journal import admin as journal_admin
+from journal import importer
+from journal.models import JournalEntry
+from journal.query_budgets import count_queries
+
+
+class AdminTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.admin = User.objects.create_superuser(
+            username="admin", password="adminpass123"
+        )
+        self.client.force_login(self.admin)
+        self.writer = User.objects.create_user(username="writer")
+        self.url = reverse("admin:journal_journalentry_changelist")
+
+    def changelist(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def listed(self, **params):
+        return [
+            entry.pk for entry in self.changelist(**params).context["cl"].result_list
+        ]
+
+
+class TestJournalEntryAdmin(AdminTestCase):
+    """Test the entries changelist in its default mode."""
+
+    def test_preview_reads_start_of_content(self):
+        """Test that rows show a truncated preview without loading content."""
+        JournalEntry.objects.create(user=self.writer, content="x" * 5000)
+        JournalEntry.objects.create(user=self.writer, content="Short")
+
+        response = self.changelist()
+        self.assertContains(response, "x" * 50 + "...")
+        self.assertNotContains(response, "x" * 51)
+        self.assertContains(response, "Short")
+        for entry in response.context["cl"].result_list:
+            self.assertIn("content", entry.get_deferred_fields())
+
+    def test_lists_user_choices(self):
+        """Test that the default user filter links to every user."""
+        User.objects.create_user(username="quietuser")
+        self.assertContains(self.changelist(), "quietuser")
+
+
+@override_settings(ADMIN_HIGH_VOLUME=True)
+class TestHighVolumeAdmin(AdminTestCase):
+    """Test the entries changelist in high-volume mode."""
+
+    def test_user_filter_autocompletes(self):
+        """Test that users are searched for rather than all listed."""
+        mine = JournalEntry.objects.create(user=self.writer, content="Mine")
+        User.objects.create_user(username="quietuser")
+
+        response = self.changelist()
+        self.assertNotContains(response, "quietuser")
+        self.assertContains(response, 'data-filter-lookup="user__id__exact"')
+        self.assertContains(response, "js/admin_autocomplete_filter.js")
+        self.assertEqual(self.listed(user__id__exact=self.writer.id), [mine.pk])
+
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "app_label": "journal",
+                "model_name": "journalentry",
+                "field_name": "user",
+                "term": "quiet",
+            },
+        )
+        self.assertEqual(
+            [result["text"] for result in response.json()["results"]], ["quietuser"]
+        )
+
+    def test_estimated_count(self):
+        """Test that unfiltered pages estimate the count and filtered ones don't."""
+        entries = [
+            JournalEntry.objects.create(user=self.writer, content=f"Entry {number}")
+            for number in range(3)
+        ]
+        entries[0].delete()
+
+        with mock.patch.object(journal_admin, "ESTIMATED_COUNT_THRESHOLD", 1):
+            with count_queries() as queries:
+                cl = self.changelist().context["cl"]
+            filtered = self.changelist(user__id__exact=self.writer.id).context["cl"]
+
+        # The highest id, which counts the deleted entry too
+        self.assertEqual(cl.result_count, entries[-1].pk)
+        self.assertFalse(any("COUNT(" in sql for sql in queries))
+        self.assertEqual(filtered.result_count, 2)
+
+        # Small tables are counted exactly
+        self.assertEqual(self.changelist().context["cl"].result_count, 2)
+
+    def test_estimated_pages_past_the_end(self):
+        """Test that a page only the estimate offers shows the last real one."""
+        entries = [
+            JournalEntry.objects.create(user=self.writer, content=f"Entry {number}")
+            for number in range(6)
+        ]
+        for entry in entries[1:5]:
+            entry.delete()
+
+        with (
+            mock.patch.object(journal_admin, "ESTIMATED_COUNT_THRESHOLD", 1),
+            mock.patch.object(journal_admin.JournalEntryAdmin, "list_per_page", 1),
+        ):
+            # Six pages estimated from the highest id, two real ones
+            self.assertEqual(self.changelist().context["cl"].paginator.num_pages, 6)
+            cl = self.changelist(p=5).context["cl"]
+
+        self.assertEqual([entry.pk for entry in cl.result_list], [entries[0].pk])
+        self.assertEqual(cl.page_num, 2)
+        self.assertEqual(cl.result_count, 2)
+        self.assertEqual(cl.paginator.num_pages, 2)
+
+    def test_search_uses_full_text_index(self):
+        """Test that search matches by stem or exact username, not substring."""
+        runs = JournalEntry.objects.create(user=self.writer, content="She runs daily")
+        JournalEntry.objects.create(user=self.admin, content="Rerunning tests")
+
+        self.assertEqual(self.listed(q="running"), [runs.pk])
+        self.assertEqual(self.listed(q="writer"), [runs.pk])
+        self.assertEqual(self.listed(q="writ"), [])
+        self.assertEqual(self.listed(q="!!"), [])
+
+    def test_date_hierarchy_reads_rollup(self):
+        """Test that the drill-down links come from the day rollup."""
+        tz = timezone.get_current_timezone()
+        importer.import_entries(
+            self.writer.id,
+            [
+                importer.ImportedEntry(datetime(2024, 3, 5, 9, tzinfo=tz), "First"),
+                importer.ImportedEntry(datetime(2025, 6, 1, 9, tzinfo=tz), "Later"),
+                importer.ImportedEntry(datetime(2025, 6, 3, 9, tzinfo=tz), "Last"),
+            ],
+        )
+
+        with count_queries() as queries:
+            response = self.changelist()
+        self.assertContains(response, "?timestamp__year=2024")
+        self.assertContains(response, "?timestamp__year=2025")
+        self.assertFalse(
+            any("DISTINCT" in sql and "journalentry" in sql for sql in queries)
+        )
+
+        # Unfiltered, every day between the first and last is listed
+        response = self.changelist(timestamp__year=2025, timestamp__month=6)
+        self.assertContains(response, "June 2")
+        self.assertEqual(len(response.context["cl"].result_list), 2)
+
+        # Filtered to a user, only days with entries are
+        response = self.changelist(
+            timestamp__year=2025, timestamp__month=6, user__id__exact=self.writer.id
+        )
+        self.assertContains(response, "June 1")
+        self.assertContains(response, "June 3")
+        self.assertNotContains(response, "June 2")
+
+    def test_skips_full_count(self):
+        """Test that filtered pages don't also count the whole table."""
+        yesterday = timezone.now() - timedelta(days=1)
+        JournalEntry.objects.create(
+            user=self.writer, content="Old", timestamp=yesterday
+        )
+        JournalEntry.objects.create(user=self.writer, content="New")
+
+        cl = self.changelist(q="new").context["cl"]
+        self.assertEqual(cl.result_count, 1)
+        self.assertIsNone(cl.full_result_count)
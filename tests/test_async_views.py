@@ -0,0 +1,288 @@
+import io
+import json
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import include, path, reverse
+from django.utils import timezone
+
+from journal import async_views, backends, export
+from journal.middleware import (
+    LegacySessionMiddleware,
+    MetricsMiddleware,
+    ReadReplicaMiddleware,
+    StaticFilesMiddleware,
+)
+from journal.models import IdempotencyKey, JournalEntry, UserProfile
+from journal.preferences import SESSION_KEY
+
+HTMX = {"headers": {"HX-Request": "true"}}
+
+# The project's URLs with the HTMX endpoints served as under SERVER_MODE=asgi
+urlpatterns = [
+    path("api/entries/create/", async_views.create_entry_view, name="create_entry"),
+    path("api/entries/date/", async_views.get_entries_by_date, name="get_entries"),
+    path(
+        "api/entries/<int:entry_id>/delete/",
+        async_views.delete_entry_view,
+        name="delete_entry",
+    ),
+    path("api/theme/update/", async_views.update_theme, name="update_theme"),
+    path("api/export/", async_views.export_view, name="export_journal"),
+    path("", include("journal_project.urls")),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestAsyncViews(TestCase):
+    """Test the async HTMX endpoints through the ASGI handler."""
+
+    def setUp(self):
+        backends.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.today = timezone.localdate()
+
+    async def login(self):
+        await self.async_client.aforce_login(self.user)
+
+    async def test_login_required(self):
+        """Test that anonymous requests are sent to the login page."""
+        response = await self.async_client.get(
+            reverse("get_entries"), {"date": "2025-01-01"}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(reverse("login"), response["Location"])
+
+    async def test_get_entries_by_date(self):
+        """Test that a day's entries render and revalidate with their ETag."""
+        await self.login()
+        await JournalEntry.objects.acreate(user=self.user, content="Async entry")
+
+        url = reverse("get_entries")
+        response = await self.async_client.get(url, {"date": self.today.isoformat()})
+        self.assertContains(response, "Async entry")
+        self.assertNotContains(response, 'id="entries-list-items"')
+
+        response = await self.async_client.get(
+            url,
+            {"date": self.today.isoformat()},
+            headers={"If-None-Match": response["ETag"]},
+        )
+        self.assertEqual(response.status_code, 304)
+
+    async def test_get_entries_invalid_date(self):
+        """Test that a malformed date is rejected."""
+        await self.login()
+        response = await self.async_client.get(reverse("get_entries"), {"date": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_create_entry(self):
+        """Test that a new entry is saved and the day's list returned."""
+        await self.login()
+        response = await self.async_client.post(
+            reverse("create_entry"), {"content": "Written asynchronously"}, **HTMX
+        )
+        self.assertContains(response, "Written asynchronously")
+        self.assertEqual(
+            json.loads(response["HX-Trigger"])["journal:day-changed"],
+            {"date": self.today.isoformat(), "has_entries": True},
+        )
+        self.assertEqual(await JournalEntry.objects.filter(user=self.user).acount(), 1)
+
+    async def test_create_entry_incremental(self):
+        """Test that a list in step only receives the new entry."""
+        await self.login()
+        await JournalEntry.objects.acreate(user=self.user, content="Earlier entry")
+
+        response = await self.async_client.post(
+            reverse("create_entry"),
+            {"content": "Fresh", "shown": 1, "list_date": self.today.isoformat()},
+            **HTMX,
+        )
+        self.assertContains(response, "hx-swap-oob")
+        self.assertNotContains(response, "Earlier entry")
+        self.assertEqual(response["HX-Reswap"], "none")
+
+    async def test_create_entry_replays_key(self):
+        """Test that repeating an idempotency key doesn't write twice."""
+        await self.login()
+        data = {"content": "Only once", "idempotency_key": "abc123"}
+        await self.async_client.post(reverse("create_entry"), data)
+        response = await self.async_client.post(reverse("create_entry"), data)
+
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+        self.assertEqual(await JournalEntry.objects.filter(user=self.user).acount(), 1)
+        self.assertEqual(await IdempotencyKey.objects.acount(), 1)
+
+        data["content"] = "Edited"
+        response = await self.async_client.post(reverse("create_entry"), data)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(await JournalEntry.objects.filter(user=self.user).acount(), 1)
+
+    async def test_create_entry_invalid(self):
+        """Test that empty entries and oversized keys are rejected."""
+        await self.login()
+        response = await self.async_client.post(reverse("create_entry"), {})
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.async_client.post(
+            reverse("create_entry"), {"content": "Hi", "idempotency_key": "k" * 65}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_delete_entry(self):
+        """Test that deleting returns the remaining entries for the day."""
+        await self.login()
+        keep = await JournalEntry.objects.acreate(user=self.user, content="Keep me")
+        gone = await JournalEntry.objects.acreate(user=self.user, content="Delete me")
+
+        response = await self.async_client.post(reverse("delete_entry", args=[gone.id]))
+        self.assertContains(response, "Keep me")
+        self.assertNotContains(response, "Delete me")
+        self.assertFalse(await JournalEntry.objects.filter(pk=gone.pk).aexists())
+        self.assertTrue(await JournalEntry.objects.filter(pk=keep.pk).aexists())
+
+    async def test_delete_entry_incremental(self):
+        """Test that a list in step gets an empty response to drop one node."""
+        await self.login()
+        await JournalEntry.objects.acreate(user=self.user, content="Keep me")
+        gone = await JournalEntry.objects.acreate(user=self.user, content="Delete me")
+
+        response = await self.async_client.post(
+            reverse("delete_entry", args=[gone.id]), {"shown": 2}, **HTMX
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+
+    async def test_delete_other_users_entry(self):
+        """Test that users can't delete each other's entries."""
+        other = await User.objects.acreate(username="other")
+        entry = await JournalEntry.objects.acreate(user=other, content="Not yours")
+        await self.login()
+
+        response = await self.async_client.post(
+            reverse("delete_entry", args=[entry.id])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(await JournalEntry.objects.filter(pk=entry.pk).aexists())
+
+    async def test_update_theme(self):
+        """Test that the theme is saved and the session copy refreshed."""
+        await self.login()
+        response = await self.async_client.post(
+            reverse("update_theme"), {"theme": "dark"}
+        )
+        self.assertEqual(response.status_code, 204)
+
+        profile = await UserProfile.objects.aget(user=self.user)
+        self.assertEqual(profile.theme, "dark")
+        session = await self.async_client.asession()
+        self.assertEqual(await session.aget(SESSION_KEY), {"theme": "dark"})
+
+    async def test_export_streams(self):
+        """Test that the export is sent a chunk at a time, not read up front."""
+        await self.login()
+        produced = []
+
+        def stream_jsonl(user_id):
+            for number in range(3):
+                produced.append(number)
+                yield f"{number}\n".encode()
+
+        with mock.patch.object(export, "stream_jsonl", stream_jsonl):
+            response = await self.async_client.get(reverse("export_journal"))
+            self.assertTrue(response.is_async)
+            chunks = aiter(response.streaming_content)
+            self.assertEqual(await anext(chunks), b"0\n")
+            self.assertEqual(produced, [0])
+            self.assertEqual([chunk async for chunk in chunks], [b"1\n", b"2\n"])
+
+    async def test_legacy_session(self):
+        """Test that sessions logged in through ModelBackend are moved over."""
+        await self.async_client.aforce_login(
+            self.user, backend="django.contrib.auth.backends.ModelBackend"
+        )
+        response = await self.async_client.get(
+            reverse("get_entries"), {"date": "2025-01-01"}
+        )
+        self.assertEqual(response.status_code, 200)
+        session = await self.async_client.asession()
+        self.assertEqual(
+            await session.aget("_auth_user_backend"),
+            "journal.backends.CachedModelBackend",
+        )
+
+    async def test_user_cache_shared(self):
+        """Test that request.auser() is served from the user cache."""
+        await self.login()
+        url = reverse("get_entries")
+        await self.async_client.get(url, {"date": "2025-01-01"})
+
+        with mock.patch.object(
+            backends.ModelBackend, "aget_user", side_effect=AssertionError
+        ):
+            response = await self.async_client.get(url, {"date": "2025-01-01"})
+        self.assertEqual(response.status_code, 200)
+
+
+class TestAsyncMiddleware(SimpleTestCase):
+    """Test that the project's middleware runs natively under ASGI."""
+
+    async def get_response(self, request):
+        return HttpResponse()
+
+    def test_async_capable(self):
+        """Test that async handlers keep the middleware async."""
+        for middleware in (
+            StaticFilesMiddleware,
+            MetricsMiddleware,
+            LegacySessionMiddleware,
+            ReadReplicaMiddleware,
+        ):
+            with self.subTest(middleware=middleware.__name__):
+                instance = middleware(self.get_response)
+                self.assertTrue(iscoroutinefunction(instance))
+        self.assertTrue(
+            iscoroutinefunction(ReadReplicaMiddleware(self.get_response).process_view)
+        )
+
+    async def test_metrics_timed(self):
+        """Test that async requests get their Server-Timing header."""
+        middleware = MetricsMiddleware(self.get_response)
+        response = await middleware(RequestFactory().get("/api/calendar/"))
+        self.assertIn("total;dur=", response["Server-Timing"])
+
+    async def test_static_files_pass_through(self):
+        """Test that non-static requests reach the rest of the chain."""
+        middleware = StaticFilesMiddleware(self.get_response)
+        response = await middleware(RequestFactory().get("/api/calendar/"))
+        self.assertEqual(response.status_code, 200)
+
+
+class TestServerBenchmark(TestCase):
+    """Test the WSGI/ASGI server benchmark command."""
+
+    def test_benchmark_servers(self):
+        """Test that both server modes answer every click."""
+        stdout = io.StringIO()
+        call_command(
+            "benchmark_servers",
+            "--concurrency=4",
+            "--requests=40",
+            "--workers=1",
+            "--days=5",
+            "--json",
+            stdout=stdout,
+        )
+        results = json.loads(stdout.getvalue())
+        self.assertEqual([result["mode"] for result in results], ["wsgi", "asgi"])
+        for result in results:
+            self.assertEqual(result["requests"], 40)
+            self.assertEqual(result["errors"], 0)
+            self.assertGreater(result["p99_ms"], 0)
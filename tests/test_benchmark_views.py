@@ -0,0 +1,105 @@
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from journal.management.commands.benchmark_views import journal_url_names
+from journal.models import JournalDay, JournalEntry
+from journal.query_budgets import VIEW_BUDGETS
+
+
+class TestSeedJournal(TestCase):
+    """Test the synthetic journal generator."""
+
+    def seed(self, **options):
+        call_command("seed_journal", stdout=io.StringIO(), **options)
+        return list(
+            JournalEntry.objects.order_by("user__username", "timestamp").values_list(
+                "user__username", "timestamp", "content"
+            )
+        )
+
+    def test_reproducible(self):
+        """Test that a seed always generates the same journal."""
+        first = self.seed(users=3, years=1, seed=7)
+        JournalEntry.objects.all().delete()
+        User.objects.all().delete()
+        self.assertEqual(self.seed(users=3, years=1, seed=7), first)
+        self.assertNotEqual(self.seed(users=3, years=1, seed=8, prefix="other"), [])
+
+    def test_realistic_shape(self):
+        """Test that users and entry sizes vary and rollups are kept."""
+        self.seed(users=10, years=2)
+        counts = [
+            JournalEntry.objects.filter(user=user).count()
+            for user in User.objects.all()
+        ]
+        self.assertEqual(len(counts), 10)
+        self.assertGreater(max(counts), 2 * min(counts))
+
+        lengths = sorted(
+            len(content)
+            for content in JournalEntry.objects.values_list("content", flat=True)
+        )
+        self.assertGreater(lengths[-1], 5 * lengths[len(lengths) // 2])
+        self.assertEqual(
+            sum(JournalDay.objects.values_list("entry_count", flat=True)),
+            JournalEntry.objects.count(),
+        )
+
+    def test_existing_users(self):
+        """Test that seeding never touches existing users."""
+        User.objects.create_user(username="seed0")
+        with self.assertRaises(CommandError):
+            self.seed(users=2)
+
+
+class TestBenchmarkViews(TestCase):
+    """Test the per-view benchmark suite."""
+
+    def test_every_url_budgeted(self):
+        """Test that each journal URL has a query budget to be held to."""
+        self.assertEqual(set(journal_url_names()), set(VIEW_BUDGETS))
+
+    def test_benchmark_views(self):
+        """Test that every view answers within its query budget."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            call_command(
+                "benchmark_views",
+                "--requests=3",
+                "--warmup=1",
+                "--users=3",
+                "--years=1",
+                f"--output={path}",
+                stdout=io.StringIO(),
+            )
+            with open(path) as results:
+                report = json.load(results)
+
+            stdout = io.StringIO()
+            call_command(
+                "benchmark_views",
+                "--requests=3",
+                "--warmup=1",
+                "--users=3",
+                "--years=1",
+                "--views",
+                "get_entries",
+                f"--compare={path}",
+                stdout=stdout,
+            )
+
+        self.assertEqual(
+            [result["view"] for result in report["views"]], list(VIEW_BUDGETS)
+        )
+        for result in report["views"]:
+            self.assertTrue(result["within_budget"], result)
+            self.assertGreater(result["p99_ms"], 0)
+        self.assertEqual(report["dataset"]["users"], 3)
+        self.assertIn("p95 change", stdout.getvalue())
@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from journal.models import JournalDay, JournalEntry
+
+
+class TestJournalDayRollup(TestCase):
+    """Test the per-user calendar rollup."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+
+    def test_create_counts_day(self):
+        """Test that creating entries counts them against their day."""
+        JournalEntry.objects.create(user=self.user, content="First")
+        JournalEntry.objects.create(user=self.user, content="Second")
+
+        day = JournalDay.objects.get(user=self.user)
+        self.assertEqual(day.date, timezone.localdate())
+        self.assertEqual(day.entry_count, 2)
+
+    def test_delete_uncounts_day(self):
+        """Test that deleting the last entry of a day removes the day."""
+        first = JournalEntry.objects.create(user=self.user, content="First")
+        second = JournalEntry.objects.create(user=self.user, content="Second")
+
+        first.delete()
+        self.assertEqual(JournalDay.objects.get(user=self.user).entry_count, 1)
+        second.delete()
+        self.assertFalse(JournalDay.objects.filter(user=self.user).exists())
+
+    def test_in_months(self):
+        """Test that month windows include whole months and cross years."""
+        for day in [date(2024, 11, 30), date(2024, 12, 1), date(2025, 1, 31)]:
+            JournalDay.objects.create(user=self.user, date=day, entry_count=1)
+        JournalDay.objects.create(user=self.user, date=date(2025, 2, 1), entry_count=1)
+
+        days = JournalDay.objects.in_months(date(2024, 12, 15), 2)
+        self.assertEqual(
+            list(days.values_list("date", flat=True)),
+            [date(2024, 12, 1), date(2025, 1, 31)],
+        )
+
+
+class TestCalendarDatesView(TestCase):
+    """Test the calendar month window endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def test_returns_dates_in_window(self):
+        """Test that only the user's dates inside the window are returned."""
+        other_user = User.objects.create_user(
+            username="otheruser", password="otherpass123"
+        )
+        for user, day in [
+            (self.user, date(2025, 4, 2)),
+            (self.user, date(2025, 5, 20)),
+            (self.user, date(2025, 7, 1)),
+            (other_user, date(2025, 4, 9)),
+        ]:
+            JournalDay.objects.create(user=user, date=day, entry_count=1)
+
+        response = self.client.get(
+            reverse("calendar_dates"), {"month": "2025-04", "months": 2}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"dates": ["2025-04-02", "2025-05-20"]})
+
+    def test_invalid_month(self):
+        """Test that malformed or oversized windows are rejected."""
+        for params in [
+            {},
+            {"month": "2025-13"},
+            {"month": "2025-01", "months": 99},
+            {"month": "9999-12", "months": 2},
+        ]:
+            response = self.client.get(reverse("calendar_dates"), params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_journal_view_query_count_is_flat(self):
+        """Test that the calendar doesn't scale with the number of entries."""
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("journal"))
+            return len(queries)
+
+        def create_past_entry(days):
+            entry = JournalEntry.objects.create(user=self.user, content="Entry")
+            JournalEntry.objects.filter(pk=entry.pk).update(
+                timestamp=timezone.now() - timedelta(days=days)
+            )
+
+        create_past_entry(1)
+        count_queries()  # First visit caches preferences in the session
+        baseline = count_queries()
+        for days in range(2, 50):
+            create_past_entry(days)
+        self.assertEqual(count_queries(), baseline)
@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from journal import views
+from journal.models import JournalEntry
+
+
+class TestEntriesConditionalGet(TestCase):
+    """Test ETag / Last-Modified revalidation of get_entries."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+        self.params = {"date": timezone.localdate().strftime("%Y-%m-%d")}
+
+    def get_entries(self, **headers):
+        return self.client.get(reverse("get_entries"), self.params, headers=headers)
+
+    def test_validators_present(self):
+        """Test that responses carry validators and require revalidation."""
+        JournalEntry.objects.create(user=self.user, content="Entry")
+        response = self.get_entries()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header("ETag"))
+        self.assertTrue(response.has_header("Last-Modified"))
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_unchanged_day_not_modified(self):
+        """Test that an unchanged day answers revalidation with 304."""
+        JournalEntry.objects.create(user=self.user, content="Entry")
+        etag = self.get_entries()["ETag"]
+
+        response = self.get_entries(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_changed_day_modified(self):
+        """Test that creating or deleting an entry changes the validator."""
+        etag = self.get_entries()["ETag"]
+        self.client.post(reverse("create_entry"), {"content": "New entry"})
+
+        response = self.get_entries(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "New entry")
+
+        entry = JournalEntry.objects.get(content="New entry")
+        etag = response["ETag"]
+        self.client.post(reverse("delete_entry", args=[entry.id]))
+        self.assertEqual(self.get_entries(if_none_match=etag).status_code, 200)
+
+
+class TestJournalConditionalGet(TestCase):
+    """Test ETag revalidation of the main journal page."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def get_journal(self, **headers):
+        return self.client.get(reverse("journal"), headers=headers)
+
+    def test_unchanged_page_not_modified(self):
+        """Test that revalidating an unchanged page returns 304."""
+        etag = self.get_journal()["ETag"]
+        self.assertEqual(self.get_journal(if_none_match=etag).status_code, 304)
+
+    def test_deploy_modifies_page(self):
+        """Test that a new build invalidates the page validator."""
+        etag = self.get_journal()["ETag"]
+        with mock.patch.object(views, "_build_token", return_value="next-build"):
+            self.assertEqual(self.get_journal(if_none_match=etag).status_code, 200)
+
+    def test_new_entry_modifies_page(self):
+        """Test that writing an entry invalidates the page validator."""
+        etag = self.get_journal()["ETag"]
+        JournalEntry.objects.create(user=self.user, content="Entry")
+        self.assertEqual(self.get_journal(if_none_match=etag).status_code, 200)
+
+    def test_theme_change_modifies_page(self):
+        """Test that changing the theme invalidates the page validator."""
+        etag = self.get_journal()["ETag"]
+        self.client.post(reverse("update_theme"), {"theme": "dark"})
+        self.assertEqual(self.get_journal(if_none_match=etag).status_code, 200)
+
+    def test_users_do_not_share_validators(self):
+        """Test that another user's ETag never matches."""
+        etag = self.get_journal()["ETag"]
+        User.objects.create_user(username="otheruser", password="otherpass123")
+        self.client.login(username="otheruser", password="otherpass123")
+        self.assertEqual(self.get_journal(if_none_match=etag).status_code, 200)
@@ -0,0 +1,109 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from journal.models import JournalEntry
+
+HTMX = {"HTTP_HX_REQUEST": "true"}
+
+
+class TestIncrementalEntries(TestCase):
+    """Test that adding or deleting an entry only sends what changed."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+        self.today = timezone.localdate().isoformat()
+
+    def create(self, content, **data):
+        return self.client.post(
+            reverse("create_entry"),
+            {"content": content, "list_date": self.today, **data},
+            **HTMX,
+        )
+
+    def delete(self, entry, **data):
+        return self.client.post(reverse("delete_entry", args=[entry.id]), data, **HTMX)
+
+    def day_changed(self, response):
+        return json.loads(response["HX-Trigger"])["journal:day-changed"]
+
+    def test_create_sends_only_new_entry(self):
+        """Test that a new entry is prepended out of band without the list."""
+        JournalEntry.objects.create(user=self.user, content="Earlier entry")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.create("Fresh entry", shown=1)
+
+        self.assertContains(response, 'hx-swap-oob="afterbegin:#entries-list-items"')
+        self.assertContains(response, "Fresh entry")
+        self.assertNotContains(response, "Earlier entry")
+        self.assertEqual(response["HX-Reswap"], "none")
+        self.assertEqual(
+            self.day_changed(response), {"date": self.today, "has_entries": True}
+        )
+        entry_selects = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("SELECT")
+            and 'FROM "journal_journalentry"' in query["sql"]
+        ]
+        self.assertEqual(entry_selects, [])
+
+    def test_create_falls_back_to_full_list(self):
+        """Test the full list when the page's list is empty or out of date."""
+        response = self.create("First entry", shown=0)
+        self.assertContains(response, 'id="entries-list-items"')
+        self.assertNotIn("HX-Reswap", response)
+
+        # Another tab added an entry the page doesn't show
+        JournalEntry.objects.create(user=self.user, content="From another tab")
+        response = self.create("Third entry", shown=1)
+        self.assertContains(response, "From another tab")
+        self.assertNotContains(response, "hx-swap-oob")
+
+        # The page was loaded on an earlier day
+        response = self.create("Fourth entry", shown=3, list_date="2000-01-01")
+        self.assertContains(response, "From another tab")
+
+    def test_create_without_htmx_returns_full_list(self):
+        """Test that plain requests keep getting the whole day."""
+        JournalEntry.objects.create(user=self.user, content="Earlier entry")
+        response = self.client.post(
+            reverse("create_entry"), {"content": "Fresh entry", "shown": 1}
+        )
+        self.assertContains(response, "Earlier entry")
+        self.assertContains(response, "Fresh entry")
+
+    def test_delete_removes_only_the_entry(self):
+        """Test that deleting answers with an empty swap for the entry's node."""
+        JournalEntry.objects.create(user=self.user, content="Kept entry")
+        entry = JournalEntry.objects.create(user=self.user, content="Doomed entry")
+
+        response = self.delete(entry, shown=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            self.day_changed(response), {"date": self.today, "has_entries": True}
+        )
+        self.assertFalse(JournalEntry.objects.filter(id=entry.id).exists())
+
+    def test_delete_last_entry_shows_empty_list(self):
+        """Test that emptying the day swaps in the empty-list placeholder."""
+        entry = JournalEntry.objects.create(user=self.user, content="Only entry")
+
+        response = self.delete(entry, shown=1)
+        self.assertContains(response, "The page is blank")
+        self.assertEqual(response["HX-Retarget"], "#entries-list")
+        self.assertEqual(response["HX-Reswap"], "innerHTML")
+        self.assertEqual(
+            self.day_changed(response), {"date": self.today, "has_entries": False}
+        )
@@ -0,0 +1,281 @@
+import asyncio
+import io
+import json
+from datetime import date, timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from journal import events
+from journal.models import JournalEntry, JournalEvent
+
+DAY = date(2025, 1, 1)
+
+
+def event(origin=""):
+    return {"date": DAY, "has_entries": True, "origin": origin}
+
+
+class TestBroker(TestCase):
+    """Test fan-out of events to connected pages."""
+
+    def setUp(self):
+        self.broker = events.Broker()
+
+    async def test_deliver_to_users_pages(self):
+        """Test that every page of the user gets the event, and only theirs."""
+        first = self.broker.subscribe(1)
+        second = self.broker.subscribe(1)
+        other = self.broker.subscribe(2)
+
+        self.broker.deliver(1, event())
+        await asyncio.sleep(0)
+        self.assertEqual(first.queue.qsize(), 1)
+        self.assertEqual(second.queue.qsize(), 1)
+        self.assertEqual(other.queue.qsize(), 0)
+        self.assertEqual(await first.get(), event())
+
+    async def test_skip_origin(self):
+        """Test that the page that made a change isn't told about it."""
+        origin = self.broker.subscribe(1, "page-a")
+        elsewhere = self.broker.subscribe(1, "page-b")
+
+        self.broker.deliver(1, event("page-a"))
+        await asyncio.sleep(0)
+        self.assertEqual(origin.queue.qsize(), 0)
+        self.assertEqual(elsewhere.queue.qsize(), 1)
+
+    async def test_slow_page_keeps_newest(self):
+        """Test that a page not reading its events only keeps the latest."""
+        subscription = self.broker.subscribe(1)
+        for offset in range(events.MAX_QUEUED_EVENTS + 5):
+            self.broker.deliver(1, {**event(), "date": DAY + timedelta(offset)})
+        await asyncio.sleep(0)
+
+        self.assertEqual(subscription.queue.qsize(), events.MAX_QUEUED_EVENTS)
+        self.assertEqual((await subscription.get())["date"], DAY + timedelta(5))
+
+    async def test_unsubscribe(self):
+        """Test that disconnected pages are forgotten."""
+        subscription = self.broker.subscribe(1)
+        self.assertTrue(self.broker.has_subscribers())
+        self.broker.unsubscribe(subscription)
+        self.assertFalse(self.broker.has_subscribers())
+
+
+class TestPublishing(TestCase):
+    """Test that entry writes publish day-changed events."""
+
+    def setUp(self):
+        self.client = Client(headers={"X-Journal-Page": "page-a"})
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+        self.published = []
+        backend = events.get_backend()
+        self.publish = backend.publish
+        backend.publish = lambda user_id, event: self.published.append((user_id, event))
+
+    def tearDown(self):
+        events.get_backend().publish = self.publish
+
+    def test_create_publishes(self):
+        """Test that a new entry publishes its day with the sending page."""
+        self.client.post(reverse("create_entry"), {"content": "Hello"})
+        self.assertEqual(
+            self.published,
+            [
+                (
+                    self.user.id,
+                    {
+                        "date": timezone.localdate(),
+                        "has_entries": True,
+                        "origin": "page-a",
+                    },
+                )
+            ],
+        )
+
+    def test_replay_does_not_publish(self):
+        """Test that a replayed submission changes nothing and says nothing."""
+        data = {"content": "Hello", "idempotency_key": "key-1"}
+        self.client.post(reverse("create_entry"), data)
+        self.client.post(reverse("create_entry"), data)
+        self.assertEqual(len(self.published), 1)
+
+    def test_delete_publishes(self):
+        """Test that deleting the last entry of a day reports it empty."""
+        entry = JournalEntry.objects.create(user=self.user, content="Bye")
+        self.client.post(reverse("delete_entry", args=[entry.id]))
+
+        self.assertEqual(len(self.published), 1)
+        user_id, published = self.published[0]
+        self.assertEqual(user_id, self.user.id)
+        self.assertFalse(published["has_entries"])
+
+
+@override_settings(EVENTS_BACKEND="local")
+class TestLocalBackend(TestCase):
+    """Test delivery within one process."""
+
+    def test_delivered_on_commit(self):
+        """Test that events reach pages only once the write commits."""
+        with mock.patch.object(events.broker, "deliver") as deliver:
+            with self.captureOnCommitCallbacks(execute=True):
+                events.day_changed(1, DAY, True)
+                deliver.assert_not_called()
+            deliver.assert_called_once_with(1, event())
+
+
+@override_settings(EVENTS_BACKEND="db", EVENTS_POLL_INTERVAL=0.01, EVENTS_RETENTION=60)
+class TestDatabaseBackend(TransactionTestCase):
+    """Test delivery between processes through the events table."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+
+    async def test_polled_events_delivered(self):
+        """Test that events written by any process reach connected pages."""
+        subscription = events.subscribe(self.user.id, "page-b")
+        try:
+            await asyncio.sleep(0.05)
+
+            await sync_to_async(events.day_changed)(self.user.id, DAY, False, "page-a")
+            received = await asyncio.wait_for(subscription.get(), timeout=5)
+            self.assertEqual(
+                received, {"date": DAY, "has_entries": False, "origin": "page-a"}
+            )
+        finally:
+            events.unsubscribe(subscription)
+
+    def test_rolled_back_events_not_written(self):
+        """Test that events commit or roll back with their write."""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            events.day_changed(self.user.id, DAY, True)
+            raise RuntimeError
+        self.assertFalse(JournalEvent.objects.exists())
+
+    async def test_late_commit_delivered(self):
+        """Test that an event committed after a newer one is still delivered."""
+        subscription = events.subscribe(self.user.id, "page-b")
+        try:
+            await asyncio.sleep(0.05)
+            for event_id in (100, 50):
+                await JournalEvent.objects.acreate(
+                    id=event_id, user=self.user, date=DAY, has_entries=True
+                )
+                await asyncio.wait_for(subscription.get(), timeout=5)
+
+            # Each event is delivered once, however many polls see it
+            await asyncio.sleep(0.05)
+            self.assertTrue(subscription.queue.empty())
+        finally:
+            events.unsubscribe(subscription)
+
+    def test_expired_events_deleted(self):
+        """Test that the purge command clears out events past their retention."""
+        JournalEvent.objects.create(
+            user=self.user,
+            date=DAY,
+            has_entries=True,
+            created_at=timezone.now() - timedelta(minutes=5),
+        )
+        events.day_changed(self.user.id, DAY, True)
+
+        stdout = io.StringIO()
+        call_command("clear_journal_events", stdout=stdout)
+        self.assertEqual(JournalEvent.objects.count(), 1)
+        self.assertIn("Deleted 1 expired events", stdout.getvalue())
+
+
+class TestEventsView(TestCase):
+    """Test the server-sent events endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+
+    async def test_wsgi_declines(self):
+        """Test that WSGI deployments tell EventSource not to reconnect."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("journal_events"))
+        self.assertEqual(response.status_code, 204)
+
+    @override_settings(SERVER_MODE="asgi", EVENTS_BACKEND="local")
+    async def test_stream(self):
+        """Test that published events are streamed to the page."""
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(
+            reverse("journal_events"), {"page": "page-b"}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        stream = aiter(response.streaming_content)
+        try:
+            self.assertTrue((await anext(stream)).startswith(b"retry:"))
+            events.broker.deliver(self.user.id, event("page-a"))
+            message = await asyncio.wait_for(anext(stream), timeout=5)
+        finally:
+            await stream.aclose()
+
+        self.assertTrue(message.startswith(b"event: day-changed\ndata: "))
+        self.assertEqual(
+            json.loads(message.split(b"data: ")[1]),
+            {"date": "2025-01-01", "has_entries": True},
+        )
+
+    async def test_login_required(self):
+        """Test that anonymous clients can't subscribe."""
+        response = await self.async_client.get(reverse("journal_events"))
+        self.assertEqual(response.status_code, 302)
+
+
+class TestLiveRefresh(TestCase):
+    """Test the pieces the journal page uses to apply live updates."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def test_page_subscribes_under_asgi(self):
+        """Test that only ASGI deployments open an event stream."""
+        response = self.client.get(reverse("journal"))
+        self.assertNotContains(response, "EventSource")
+
+        with self.settings(SERVER_MODE="asgi"):
+            response = self.client.get(reverse("journal"))
+        self.assertContains(response, "new EventSource")
+
+    def test_todays_list_target(self):
+        """Test that today's list can be fetched with its delete buttons."""
+        entry = JournalEntry.objects.create(user=self.user, content="Synced")
+        today = timezone.localdate().isoformat()
+
+        response = self.client.get(
+            reverse("get_entries"), {"date": today, "target": "entries-list"}
+        )
+        self.assertContains(response, 'id="entries-list-items"')
+        self.assertContains(response, reverse("delete_entry", args=[entry.id]))
+
+        past = self.client.get(reverse("get_entries"), {"date": today})
+        self.assertNotContains(past, 'id="entries-list-items"')
+        self.assertNotEqual(response["ETag"], past["ETag"])
+
+    def test_invalid_target(self):
+        """Test that unknown lists are rejected."""
+        response = self.client.get(
+            reverse("get_entries"), {"date": "2025-01-01", "target": "nope"}
+        )
+        self.assertEqual(response.status_code, 400)
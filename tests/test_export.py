@@ -0,0 +1,124 @@
+import io
+import json
+import os
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from journal import export
+from journal.models import JournalEntry
+from tests.helpers import create_entry
+
+
+class TestExport(TestCase):
+    """Test the streaming journal export."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def get_export(self, export_format):
+        response = self.client.get(reverse("export_journal"), {"format": export_format})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content)
+
+    def test_jsonl_export(self):
+        """Test that JSONL has one record per entry, oldest first."""
+        day = timezone.make_aware(datetime(2025, 1, 31, 9, 15))
+        first = create_entry(self.user, day, 'First "quoted" entry\nwith a newline')
+        second = create_entry(self.user, day + timedelta(hours=1), "Second entry ✍️")
+        other_user = User.objects.create_user(username="other", password="x")
+        create_entry(other_user, day, "Someone else's")
+
+        response, body = self.get_export("jsonl")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertIn("attachment;", response["Content-Disposition"])
+
+        records = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual([record["id"] for record in records], [first.id, second.id])
+        self.assertEqual(records[0]["content"], first.content)
+        self.assertEqual(records[1]["content"], "Second entry ✍️")
+        self.assertEqual(records[0]["timestamp"], day.isoformat())
+
+    def test_zip_export_has_markdown_per_day(self):
+        """Test that the ZIP holds one Markdown file per day with entries."""
+        day = timezone.make_aware(datetime(2025, 1, 31, 9, 15))
+        create_entry(self.user, day, "Morning")
+        create_entry(self.user, day + timedelta(hours=5), "Afternoon")
+        create_entry(self.user, day + timedelta(days=1), "Next day")
+
+        response, body = self.get_export("zip")
+        self.assertEqual(response["Content-Type"], "application/zip")
+
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(
+                archive.namelist(), ["2025/2025-01-31.md", "2025/2025-02-01.md"]
+            )
+            markdown = archive.read("2025/2025-01-31.md").decode()
+        self.assertEqual(
+            markdown,
+            "# January 31, 2025\n\n## 9:15 AM\n\nMorning\n\n## 2:15 PM\n\nAfternoon\n",
+        )
+
+    def test_streams_in_bounded_chunks(self):
+        """Test that large exports are streamed in pieces, not built up front."""
+        JournalEntry.objects.bulk_create(
+            JournalEntry(user=self.user, content=os.urandom(512).hex())
+            for _ in range(300)
+        )
+
+        for export_format in export.FORMATS:
+            chunks = list(export.stream_export(self.user.id, export_format))
+            self.assertGreater(len(chunks), 1)
+            self.assertLess(
+                max(len(chunk) for chunk in chunks[:-1]),
+                export.STREAM_BUFFER_SIZE * 2,
+            )
+
+    def test_empty_journal(self):
+        """Test that exporting an empty journal yields valid, empty output."""
+        _, body = self.get_export("jsonl")
+        self.assertEqual(body, b"")
+
+        _, body = self.get_export("zip")
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            self.assertEqual(archive.namelist(), [])
+
+    def test_invalid_format(self):
+        """Test that unknown formats are rejected."""
+        response = self.client.get(reverse("export_journal"), {"format": "pdf"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_login(self):
+        """Test that export requires authentication."""
+        self.client.logout()
+        response = self.client.get(reverse("export_journal"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_command(self):
+        """Test that the management command writes the same export to a file."""
+        create_entry(self.user, timezone.now(), "From the command line")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "journal.zip")
+            call_command(
+                "export_journal",
+                "testuser",
+                "--format=zip",
+                f"--output={path}",
+                stdout=io.StringIO(),
+            )
+            with zipfile.ZipFile(path) as archive:
+                (name,) = archive.namelist()
+                self.assertIn("From the command line", archive.read(name).decode())
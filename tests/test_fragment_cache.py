@@ -0,0 +1,123 @@
+import re
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from journal import fragment_cache
+from journal.models import JournalEntry
+
+
+class TestEntriesFragmentCache(TestCase):
+    """Test caching of the entries.html fragment served by get_entries."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+        self.today = timezone.localdate().strftime("%Y-%m-%d")
+
+    def get_entries(self):
+        return self.client.get(reverse("get_entries"), {"date": self.today})
+
+    def counters(self):
+        stats = fragment_cache.stats()
+        return stats["hits"], stats["misses"]
+
+    def test_repeat_request_hits(self):
+        """Test that an unchanged day is served from the cache."""
+        JournalEntry.objects.create(user=self.user, content="Cached entry")
+        self.get_entries()
+
+        hits, misses = self.counters()
+        response = self.get_entries()
+        self.assertContains(response, "Cached entry")
+        self.assertEqual(self.counters(), (hits + 1, misses))
+
+    def test_create_invalidates(self):
+        """Test that creating an entry refreshes the cached day."""
+        self.get_entries()
+        self.client.post(reverse("create_entry"), {"content": "Fresh entry"})
+
+        hits, misses = self.counters()
+        self.assertContains(self.get_entries(), "Fresh entry")
+        self.assertEqual(self.counters(), (hits, misses + 1))
+
+    def test_delete_invalidates(self):
+        """Test that deleting an entry refreshes the cached day."""
+        entry = JournalEntry.objects.create(user=self.user, content="Doomed entry")
+        self.assertContains(self.get_entries(), "Doomed entry")
+
+        self.client.post(reverse("delete_entry", args=[entry.id]))
+        self.assertNotContains(self.get_entries(), "Doomed entry")
+
+    def test_stale_version_misses(self):
+        """Test that a copy rendered for an older version is never served."""
+        JournalEntry.objects.create(user=self.user, content="First entry")
+        self.get_entries()
+
+        # Written behind the views' back, e.g. by another worker
+        JournalEntry.objects.create(user=self.user, content="Second entry")
+        self.assertContains(self.get_entries(), "Second entry")
+
+    def test_users_do_not_share_fragments(self):
+        """Test that cached fragments are keyed by user."""
+        JournalEntry.objects.create(user=self.user, content="My entry")
+        self.get_entries()
+
+        User.objects.create_user(username="otheruser", password="otherpass123")
+        self.client.login(username="otheruser", password="otherpass123")
+        self.assertNotContains(self.get_entries(), "My entry")
+
+    def test_stats_requires_staff(self):
+        """Test that the counters endpoint is staff only."""
+        response = self.client.get(reverse("fragment_cache_stats"))
+        self.assertEqual(response.status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse("fragment_cache_stats"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(response.json()), {"backend", "hits", "misses", "hit_ratio"}
+        )
+
+
+class TestFragmentCacheSessions(TestCase):
+    """Test that cached fragments work in every session of a user."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.entry = JournalEntry.objects.create(user=self.user, content="Shared")
+        self.today = timezone.localdate().strftime("%Y-%m-%d")
+
+    def session(self):
+        client = Client(enforce_csrf_checks=True)
+        client.login(username="testuser", password="testpass123")
+        page = client.get(reverse("journal")).content.decode()
+        token = re.search(r'"X-CSRFToken": "([^"]+)"', page).group(1)
+        return client, token
+
+    def test_cached_list_carries_no_csrf_token(self):
+        """Test that a device deletes from a list cached by another device."""
+        first, first_token = self.session()
+        second, second_token = self.session()
+        params = {"date": self.today, "target": "entries-list"}
+        first.get(reverse("get_entries"), params)
+
+        response = second.get(reverse("get_entries"), params)
+        self.assertContains(response, "Shared")
+        self.assertNotContains(response, first_token)
+        self.assertNotContains(response, "X-CSRFToken")
+
+        response = second.post(
+            reverse("delete_entry", args=[self.entry.id]),
+            headers={"HX-Request": "true", "X-CSRFToken": second_token},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(JournalEntry.objects.exists())
@@ -0,0 +1,151 @@
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from journal.models import IdempotencyKey, JournalEntry
+
+HTMX = {"HTTP_HX_REQUEST": "true"}
+
+
+class TestIdempotentSubmission(TestCase):
+    """Test that resubmitting an entry with the same key writes it once."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def submit(self, key, content="Only once", **extra):
+        data = {"content": content, **extra}
+        if key is not None:
+            data["idempotency_key"] = key
+        return self.client.post(reverse("create_entry"), data, **HTMX)
+
+    def test_repeated_key_replays_entry(self):
+        """Test that a repeated POST is answered without writing again."""
+        first = self.submit("key-1")
+        second = self.submit("key-1")
+
+        self.assertEqual(JournalEntry.objects.count(), 1)
+        self.assertNotIn("Idempotent-Replayed", first)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertContains(second, "Only once")
+
+    def test_repeated_key_other_content(self):
+        """Test that a key sent again with other content is refused."""
+        self.submit("key-1")
+        response = self.submit("key-1", content="Edited before the retry")
+
+        self.assertEqual(response.status_code, 422)
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(JournalEntry.objects.get().content, "Only once")
+
+    def test_key_saved_without_content_hash(self):
+        """Test that keys saved before content was hashed still replay."""
+        self.submit("key-1")
+        IdempotencyKey.objects.update(content_hash="")
+        response = self.submit("key-1", content="Anything")
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+
+    def test_header_key(self):
+        """Test that an Idempotency-Key header works like the form field."""
+        for _ in range(2):
+            self.client.post(
+                reverse("create_entry"),
+                {"content": "From an API client"},
+                HTTP_IDEMPOTENCY_KEY="header-key",
+            )
+        self.assertEqual(JournalEntry.objects.count(), 1)
+
+    def test_distinct_and_missing_keys_write(self):
+        """Test that new keys, and requests without one, always write."""
+        self.submit("key-1")
+        self.submit("key-2")
+        self.submit(None)
+        self.submit(None)
+        self.assertEqual(JournalEntry.objects.count(), 4)
+
+    def test_keys_are_per_user(self):
+        """Test that another user's key doesn't swallow a submission."""
+        self.submit("shared-key")
+        other = Client()
+        User.objects.create_user(username="other", password="testpass123")
+        other.login(username="other", password="testpass123")
+        other.post(
+            reverse("create_entry"),
+            {"content": "Mine", "idempotency_key": "shared-key"},
+            **HTMX,
+        )
+        self.assertEqual(JournalEntry.objects.count(), 2)
+
+    def test_expired_key_writes_again(self):
+        """Test that a key older than the TTL counts as a new submission."""
+        self.submit("old-key")
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        response = self.submit("old-key", content="Much later")
+        self.assertNotIn("Idempotent-Replayed", response)
+        self.assertEqual(JournalEntry.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.get().entry.content, "Much later")
+
+    def test_invalid_key(self):
+        """Test that oversized keys are rejected without writing."""
+        response = self.submit("x" * 65)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(JournalEntry.objects.count(), 0)
+
+    def test_replay_matches_the_page(self):
+        """Test that a replay adds the entry only if the page lacks it."""
+        JournalEntry.objects.create(user=self.user, content="Earlier entry")
+        list_date = timezone.localdate().isoformat()
+        self.submit("key-1", shown=1, list_date=list_date)
+
+        # The first response was lost: the page still shows one entry
+        response = self.submit("key-1", shown=1, list_date=list_date)
+        self.assertContains(response, "hx-swap-oob")
+
+        # Double click: the page already shows the new entry
+        response = self.submit("key-1", shown=2, list_date=list_date)
+        self.assertNotContains(response, "hx-swap-oob")
+        self.assertContains(response, "Earlier entry")
+
+    def test_clear_expired_keys(self):
+        """Test that the purge command only deletes expired keys."""
+        self.submit("old-key")
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.submit("new-key")
+
+        stdout = io.StringIO()
+        call_command("clear_idempotency_keys", stdout=stdout)
+        self.assertIn("Deleted 1 expired", stdout.getvalue())
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)), ["new-key"]
+        )
+
+
+class TestConcurrentSubmissions(TestCase):
+    """Test concurrent duplicate submissions with the load test command."""
+
+    def test_load_test(self):
+        """Test that racing duplicates write each submission exactly once."""
+        stdout = io.StringIO()
+        call_command(
+            "loadtest_submissions",
+            "--submissions=10",
+            "--duplicates=4",
+            "--json",
+            stdout=stdout,
+        )
+        result = json.loads(stdout.getvalue())
+        self.assertEqual(result["entries_written"], 10)
+        self.assertEqual(result["duplicates_written"], 0)
+        self.assertEqual(result["replayed"], 30)
+        self.assertEqual(result["errors"], 0)
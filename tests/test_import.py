@@ -0,0 +1,256 @@
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from journal import export, importer
+from journal.models import JournalDay, JournalEntry, UserProfile, hash_content
+from journal.search import search_entries
+
+
+def jsonl(*records):
+    lines = [json.dumps(record) for record in records]
+    return ("\n".join(lines) + "\n").encode()
+
+
+class TestImportEntries(TestCase):
+    """Test the bulk import pipeline."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.day = timezone.make_aware(datetime(2024, 3, 10, 8, 30))
+
+    def run_import(self, data, import_format="jsonl", **kwargs):
+        records = importer.read_records(io.BytesIO(data), import_format)
+        return importer.import_entries(self.user.id, records, **kwargs)
+
+    def test_keeps_original_timestamps(self):
+        """Test that imported entries keep the timestamps from the backup."""
+        result = self.run_import(
+            jsonl(
+                {"timestamp": self.day.isoformat(), "content": "Spring cleaning"},
+                {"timestamp": "2024-03-11T21:00:00+00:00", "content": "Late night"},
+            )
+        )
+
+        self.assertEqual(result["read"], 2)
+        self.assertEqual(result["imported"], 2)
+        self.assertGreater(result["rows_per_sec"], 0)
+        entry = JournalEntry.objects.get(content="Spring cleaning")
+        self.assertEqual(entry.timestamp, self.day)
+        self.assertEqual(entry.content_hash, hash_content("Spring cleaning"))
+
+    def test_updates_calendar_and_search(self):
+        """Test that the calendar rollup and search index cover imported entries."""
+        JournalDay.objects.create(user=self.user, date=date(2024, 3, 10), entry_count=1)
+        records = [
+            {"timestamp": (self.day + timedelta(minutes=i)).isoformat(), "content": c}
+            for i, c in enumerate(["Tulips", "Daffodils", "Crocuses"])
+        ]
+        records.append({"timestamp": "2024-03-12T09:00:00+00:00", "content": "Rain"})
+        version = UserProfile.objects.get(user=self.user).entries_version
+
+        self.run_import(jsonl(*records), batch_size=2)
+
+        self.assertEqual(
+            list(
+                JournalDay.objects.filter(user=self.user).values_list(
+                    "date", "entry_count"
+                )
+            ),
+            [(date(2024, 3, 10), 4), (date(2024, 3, 12), 1)],
+        )
+        entries, _ = search_entries(self.user.id, "daffodils")
+        self.assertEqual(len(entries), 1)
+        self.assertGreater(
+            UserProfile.objects.get(user=self.user).entries_version, version
+        )
+
+    def test_skips_duplicates(self):
+        """Test that content already written at the same second is skipped."""
+        data = jsonl(
+            {"timestamp": self.day.isoformat(), "content": "Same"},
+            {
+                "timestamp": self.day.replace(microsecond=5).isoformat(),
+                "content": "Same",
+            },
+            {
+                "timestamp": (self.day + timedelta(days=1)).isoformat(),
+                "content": "Same",
+            },
+        )
+
+        first = self.run_import(data)
+        self.assertEqual((first["imported"], first["duplicates"]), (2, 1))
+
+        second = self.run_import(data)
+        self.assertEqual((second["imported"], second["duplicates"]), (0, 3))
+        self.assertEqual(JournalEntry.objects.count(), 2)
+        self.assertEqual(JournalDay.objects.filter(user=self.user).count(), 2)
+
+    def test_batches_instead_of_saving_rows(self):
+        """Test that the query count depends on batches, not on rows."""
+        records = [
+            {
+                "timestamp": (self.day + timedelta(hours=i)).isoformat(),
+                "content": f"{i}",
+            }
+            for i in range(500)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            result = self.run_import(jsonl(*records), batch_size=250)
+        self.assertEqual(result["imported"], 500)
+        self.assertLess(len(queries), 40)
+
+    def test_csv_import(self):
+        """Test importing CSV with timestamp and content columns."""
+        data = (
+            "timestamp,content\n"
+            f'{self.day.isoformat()},"Line one\nline two, with a comma"\n'
+        ).encode()
+
+        self.run_import(data, "csv")
+        entry = JournalEntry.objects.get(user=self.user)
+        self.assertEqual(entry.content, "Line one\nline two, with a comma")
+        self.assertEqual(entry.timestamp, self.day)
+
+    def test_markdown_import(self):
+        """Test importing Markdown day files."""
+        data = (
+            b"# March 10, 2024\n\n## 8:30 AM\n\nMorning pages\n\n# Not a date\n\n"
+            b"## 9:45 PM\n\nEvening\n\n# 2024-03-11\n\nUndated thoughts\n"
+        )
+
+        self.run_import(data, "markdown")
+        entries = JournalEntry.objects.filter(user=self.user).order_by("timestamp")
+        self.assertEqual(
+            [(timezone.localtime(e.timestamp), e.content) for e in entries],
+            [
+                (self.day, "Morning pages\n\n# Not a date"),
+                (timezone.make_aware(datetime(2024, 3, 10, 21, 45)), "Evening"),
+                (timezone.make_aware(datetime(2024, 3, 11)), "Undated thoughts"),
+            ],
+        )
+
+    def test_zip_round_trip(self):
+        """Test that a Markdown ZIP export imports back into another journal."""
+        other_user = User.objects.create_user(username="other", password="x")
+        for i, content in enumerate(["First", "Second", "Third"]):
+            entry = JournalEntry.objects.create(user=other_user, content=content)
+            JournalEntry.objects.filter(pk=entry.pk).update(
+                timestamp=self.day + timedelta(days=i, minutes=i)
+            )
+        archive = b"".join(export.stream_export(other_user.id, "zip"))
+
+        result = self.run_import(archive, "zip")
+        self.assertEqual(result["imported"], 3)
+        self.assertEqual(
+            list(
+                JournalEntry.objects.filter(user=self.user)
+                .order_by("timestamp")
+                .values_list("timestamp", "content")
+            ),
+            list(
+                JournalEntry.objects.filter(user=other_user)
+                .order_by("timestamp")
+                .values_list("timestamp", "content")
+            ),
+        )
+
+    def test_invalid_input(self):
+        """Test that malformed records are reported with their line."""
+        data = jsonl({"timestamp": self.day.isoformat(), "content": "Fine"})
+        data += b'{"timestamp": "yesterday", "content": "Bad"}\n'
+
+        with self.assertRaisesMessage(importer.ImportFormatError, "Line 2"):
+            self.run_import(data)
+        with self.assertRaises(importer.ImportFormatError):
+            self.run_import(b"title,body\nx,y\n", "csv")
+        with self.assertRaises(importer.ImportFormatError):
+            self.run_import(b"not a zip", "zip")
+
+    def test_content_hash_follows_edits(self):
+        """Test that saving an entry keeps its content hash current."""
+        entry = JournalEntry.objects.create(user=self.user, content="Draft")
+        entry.content = "Final"
+        entry.save(update_fields=["content"])
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.content_hash, hash_content("Final"))
+
+
+class TestImportView(TestCase):
+    """Test the backup upload endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def test_upload(self):
+        """Test that uploading a backup imports it and reports the result."""
+        upload = SimpleUploadedFile(
+            "backup.jsonl",
+            jsonl({"timestamp": "2024-03-10T08:30:00+00:00", "content": "Uploaded"}),
+        )
+
+        response = self.client.post(reverse("import_journal"), {"file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["imported"], 1)
+        self.assertTrue(JournalEntry.objects.filter(content="Uploaded").exists())
+
+    def test_rejects_bad_uploads(self):
+        """Test missing files, unknown formats and unparseable content."""
+        response = self.client.post(reverse("import_journal"))
+        self.assertEqual(response.status_code, 400)
+
+        upload = SimpleUploadedFile("backup.pdf", b"%PDF")
+        response = self.client.post(reverse("import_journal"), {"file": upload})
+        self.assertEqual(response.status_code, 400)
+
+        upload = SimpleUploadedFile("backup.jsonl", b"{not json}\n")
+        response = self.client.post(reverse("import_journal"), {"file": upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Line 1", response.json()["error"])
+
+    def test_requires_login(self):
+        """Test that importing requires authentication."""
+        self.client.logout()
+        response = self.client.post(reverse("import_journal"))
+        self.assertEqual(response.status_code, 302)
+
+
+class TestImportCommand(TestCase):
+    """Test the import_journal management command."""
+
+    def test_import_command(self):
+        """Test that the command imports a file and reports throughput."""
+        user = User.objects.create_user(username="testuser", password="x")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "backup.jsonl")
+            with open(path, "wb") as backup:
+                backup.write(
+                    jsonl({"timestamp": "2024-03-10T08:30:00+00:00", "content": "Hi"})
+                )
+            stdout = io.StringIO()
+            call_command("import_journal", "testuser", path, stdout=stdout)
+
+        self.assertIn("Imported 1 of 1 entries", stdout.getvalue())
+        self.assertIn("rows/s", stdout.getvalue())
+        self.assertEqual(JournalEntry.objects.filter(user=user).count(), 1)
@@ -0,0 +1,79 @@
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from journal.models import JournalEntry
+from tests.helpers import create_entry
+
+
+class TestMemoryPicker(TestCase):
+    """Test the past entry ("memory") picker."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.now = timezone.now()
+        self.today = timezone.localdate(self.now)
+
+    def test_no_past_entries(self):
+        """Test that only today's entries yields no memory."""
+        create_entry(self.user, self.now, "Today")
+        memory = JournalEntry.objects.filter(user=self.user).pick_memory(self.today)
+        self.assertIsNone(memory)
+
+    def test_picks_past_entry_for_user(self):
+        """Test that the memory is a past entry belonging to the user."""
+        other_user = User.objects.create_user(username="other", password="pass12345")
+        create_entry(other_user, self.now - timedelta(days=3), "Other user's entry")
+        create_entry(self.user, self.now, "Today")
+        past = create_entry(self.user, self.now - timedelta(days=7), "Last week")
+
+        memory = JournalEntry.objects.filter(user=self.user).pick_memory(self.today)
+        self.assertEqual(memory, past)
+        self.assertEqual(memory.content, "Last week")
+
+    def test_random_pick_is_bounded(self):
+        """Test that picking costs the same queries regardless of history size."""
+        for days in range(1, 30):
+            create_entry(self.user, self.now - timedelta(days=days), f"Entry {days}")
+
+        with self.assertNumQueries(3):
+            memory = JournalEntry.objects.filter(user=self.user).pick_memory(self.today)
+        self.assertIsNotNone(memory)
+
+    def test_random_pick_covers_all_entries(self):
+        """Test that every past entry can be picked."""
+        expected = {
+            create_entry(self.user, self.now - timedelta(days=days), f"Entry {days}").pk
+            for days in range(1, 4)
+        }
+        seen = set()
+        for _ in range(200):
+            seen.add(JournalEntry.objects.filter(user=self.user).random_entry().pk)
+        self.assertEqual(seen, expected)
+
+    def test_on_this_day(self):
+        """Test that on-this-day mode only picks the same date in past years."""
+        tz = timezone.get_current_timezone()
+        anniversaries = {
+            create_entry(
+                self.user, datetime(2025, 6, 15, 9, tzinfo=tz), "A year ago"
+            ).pk,
+            create_entry(
+                self.user, datetime(2024, 6, 15, 21, tzinfo=tz), "Two years ago"
+            ).pk,
+        }
+        create_entry(self.user, datetime(2025, 6, 14, 23, tzinfo=tz), "Day before")
+        create_entry(self.user, datetime(2025, 6, 16, 0, tzinfo=tz), "Day after")
+        create_entry(self.user, datetime(2026, 6, 15, 8, tzinfo=tz), "Today")
+
+        entries = JournalEntry.objects.filter(user=self.user)
+        seen = {
+            entries.pick_memory(date(2026, 6, 15), mode="on_this_day").pk
+            for _ in range(100)
+        }
+        self.assertEqual(seen, anniversaries)
+        self.assertIsNone(entries.pick_memory(date(2026, 3, 1), mode="on_this_day"))
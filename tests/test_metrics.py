@@ -0,0 +1,125 @@
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from journal import metrics
+from journal.models import JournalEntry
+
+
+class TestRequestMetrics(TestCase):
+    """Test per-request timings, the request log and the metrics endpoint."""
+
+    def setUp(self):
+        metrics.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def test_server_timing_header(self):
+        """Test that responses report their query count and timings."""
+        JournalEntry.objects.create(user=self.user, content="Timed entry")
+        response = self.client.get(reverse("journal"))
+
+        parts = dict(
+            part.split(";", 1) for part in response["Server-Timing"].split(", ")
+        )
+        self.assertEqual(set(parts), {"db", "tpl", "total"})
+        queries = int(parts["db"].split('desc="')[1].split()[0])
+        self.assertGreater(queries, 0)
+
+    def test_query_count_matches(self):
+        """Test that the header counts every query the request ran."""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("get_entries"), {"date": "2025-01-01"})
+        self.assertIn(
+            f'desc="{len(captured.captured_queries)} queries"',
+            response["Server-Timing"],
+        )
+
+    def test_request_log(self):
+        """Test that each request logs one JSON line with its timings."""
+        with self.assertLogs("journal.requests", "INFO") as logs:
+            self.client.get(reverse("get_entries"), {"date": "2025-01-01"})
+        self.assertEqual(len(logs.records), 1)
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["view"], "get_entries")
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(
+            set(line),
+            {
+                "view",
+                "method",
+                "status",
+                "duration_ms",
+                "db_queries",
+                "db_ms",
+                "template_ms",
+            },
+        )
+
+    def test_histograms(self):
+        """Test that timings are aggregated per view."""
+        for _ in range(3):
+            self.client.get(reverse("get_entries"), {"date": "2025-01-01"})
+        self.client.get("/no-such-page/")
+
+        output = metrics.render_prometheus()
+        self.assertIn("# TYPE journal_request_duration_seconds histogram", output)
+        self.assertIn(
+            'journal_request_duration_seconds_count{view="get_entries"} 3', output
+        )
+        self.assertIn(
+            'journal_request_duration_seconds_bucket{view="get_entries",le="+Inf"} 3',
+            output,
+        )
+        self.assertIn('journal_request_db_queries_count{view="unresolved"} 1', output)
+        self.assertIn("journal_fragment_cache_misses_total", output)
+
+    def test_template_time(self):
+        """Test that rendering the journal page is timed."""
+        self.client.get(reverse("journal"))
+        with metrics._lock:
+            histogram = metrics._histograms[
+                "journal_request_template_seconds", "journal"
+            ]
+        self.assertGreater(histogram.sum, 0)
+
+    def test_metrics_requires_staff(self):
+        """Test that only staff can read the metrics in a browser."""
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 401)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_metrics_token(self):
+        """Test that scrapers authenticate with the bearer token."""
+        anonymous = Client()
+        response = anonymous.get(
+            reverse("metrics"), headers={"Authorization": "Bearer wrong"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+        response = anonymous.get(
+            reverse("metrics"), headers={"Authorization": "Bearer scrape-secret"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "journal_request_duration_seconds")
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        """Test that the middleware can be switched off."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse("get_entries"), {"date": "2025-01-01"})
+        self.assertNotIn("Server-Timing", response)
@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from journal.models import UserProfile
+from journal.preferences import SESSION_KEY
+
+
+def profile_queries(queries):
+    return [query["sql"] for query in queries if "journal_userprofile" in query["sql"]]
+
+
+class TestPreferences(TestCase):
+    """Test the session-cached user preferences."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def test_theme_loaded_once_per_session(self):
+        """Test that pages render the theme without querying the profile again."""
+        UserProfile.objects.filter(user=self.user).update(theme="dark")
+
+        response = self.client.get(reverse("login"))
+        self.assertContains(response, 'const serverTheme = "dark"')
+        self.assertEqual(self.client.session[SESSION_KEY], {"theme": "dark"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("login"))
+        self.assertContains(response, 'const serverTheme = "dark"')
+        self.assertEqual(profile_queries(queries), [])
+
+    def test_partials_skip_preferences(self):
+        """Test that fragments not using preferences don't load them."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("get_entries"), {"date": "2025-01-01"})
+        self.assertEqual(profile_queries(queries), [])
+        self.assertNotIn(SESSION_KEY, self.client.session)
+
+    def test_update_theme(self):
+        """Test that changing the theme is one update and refreshes the session."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("update_theme"), {"theme": "light"})
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(profile_queries(queries)), 1)
+        self.assertTrue(profile_queries(queries)[0].startswith("UPDATE"))
+
+        self.assertEqual(UserProfile.objects.get(user=self.user).theme, "light")
+        self.assertEqual(self.client.session[SESSION_KEY], {"theme": "light"})
+
+    def test_update_theme_creates_missing_profile(self):
+        """Test that users without a profile get one when picking a theme."""
+        UserProfile.objects.filter(user=self.user).delete()
+
+        self.client.post(reverse("update_theme"), {"theme": "dark"})
+        self.assertEqual(UserProfile.objects.get(user=self.user).theme, "dark")
+
+    def test_journal_page_refreshes_cached_theme(self):
+        """Test that a theme changed elsewhere shows on the next journal load."""
+        self.client.get(reverse("login"))
+        UserProfile.objects.filter(user=self.user).update(theme="dark")
+
+        response = self.client.get(reverse("journal"))
+        self.assertContains(response, 'const serverTheme = "dark"')
+
+    def test_anonymous_pages_have_no_server_theme(self):
+        """Test that anonymous pages fall back to the browser's theme."""
+        self.client.logout()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("login"))
+        self.assertContains(response, 'const serverTheme = ""')
+        self.assertEqual(profile_queries(queries), [])
+
+    def test_user_save_does_not_write_profile(self):
+        """Test that saving the user (e.g. last_login on login) skips the profile."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.login(username="testuser", password="testpass123")
+        self.assertEqual(profile_queries(queries), [])
@@ -0,0 +1,166 @@
+from datetime import timedelta
+from itertools import count
+
+import pytest
+from django.contrib.auth.models import User
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from journal import importer
+from journal.dates import day_bounds
+from journal.models import JournalEntry
+from tests.query_budgets import QueryBudgetMixin
+
+# Days the added entries are spread over, ending today
+DAYS = 10
+
+_numbers = count()
+
+
+def add_entries(users, rows):
+    """Write ``rows`` entries spread over the users and the last DAYS days."""
+    today = timezone.localdate()
+    for user_index, user in enumerate(users):
+        records = []
+        for row in range(user_index, rows, len(users)):
+            start, _ = day_bounds(today - timedelta(days=row % DAYS))
+            number = next(_numbers)
+            records.append(
+                importer.ImportedEntry(
+                    start + timedelta(seconds=number), f"Budget entry {number}"
+                )
+            )
+        importer.import_entries(user.id, records)
+
+
+class TestViewQueryBudgets(QueryBudgetMixin, TestCase):
+    """Test that the journal views' queries don't grow with the journal."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.force_login(self.user)
+        self.today = timezone.localdate()
+
+    def assertScales(self, name, *args, **params):
+        url = reverse(name, args=args)
+        self.query_budget.scales(
+            name,
+            lambda: self.client.get(url, params, headers={"HX-Request": "true"}),
+            add_rows=lambda rows: add_entries([self.user], rows),
+        )
+
+    def test_journal(self):
+        """Test the journal page."""
+        self.assertScales("journal")
+
+    def test_get_entries(self):
+        """Test a day's entries."""
+        self.assertScales("get_entries", date=self.today.isoformat())
+
+    def test_calendar_dates(self):
+        """Test the calendar's days with entries."""
+        self.assertScales("calendar_dates", month=self.today.strftime("%Y-%m"))
+
+    def test_search(self):
+        """Test search results."""
+        self.assertScales("search_entries", q="budget")
+
+    def test_timeline(self):
+        """Test the timeline's first page."""
+        self.assertScales("timeline_entries")
+
+    def test_export(self):
+        """Test a streamed export."""
+        url = reverse("export_journal")
+
+        def export():
+            response = self.client.get(url)
+            b"".join(response.streaming_content)
+            return response
+
+        self.query_budget.scales(
+            "export_journal",
+            export,
+            add_rows=lambda rows: add_entries([self.user], rows),
+        )
+
+    def test_over_budget_fails(self):
+        """Test that a request over its budget fails the test."""
+        with (
+            self.assertRaises(AssertionError),
+            self.query_budget.within("register"),
+        ):
+            User.objects.count()
+
+
+class TestAdminQueryBudgets(QueryBudgetMixin, TestCase):
+    """Test that admin changelists don't query per row."""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin = User.objects.create_superuser(
+            username="admin", password="adminpass123"
+        )
+        self.client.force_login(self.admin)
+        self.users = [
+            User.objects.create_user(username=f"writer{index}") for index in range(3)
+        ]
+
+    def test_journal_entry_changelist(self):
+        """Test the entries changelist, including the user column."""
+        url = reverse("admin:journal_journalentry_changelist")
+        self.query_budget.scales(
+            "admin:journal_journalentry_changelist",
+            lambda: self.client.get(url),
+            add_rows=lambda rows: add_entries(self.users, rows),
+        )
+
+    @override_settings(ADMIN_HIGH_VOLUME=True)
+    def test_high_volume_changelist(self):
+        """Test the high-volume changelist, searched and filtered to a user."""
+        url = reverse("admin:journal_journalentry_changelist")
+        for params in ({}, {"q": "budget"}, {"user__id__exact": self.users[0].id}):
+            with self.subTest(params=params):
+                self.query_budget.scales(
+                    "admin:journal_journalentry_changelist",
+                    lambda params=params: self.client.get(url, params),
+                    add_rows=lambda rows: add_entries(self.users, rows),
+                    row_counts=(10, 100),
+                )
+
+    def test_delete_selected_confirmation(self):
+        """Test the confirmation page listing every selected entry."""
+        url = reverse("admin:journal_journalentry_changelist")
+        selected = []
+
+        def add_rows(rows):
+            add_entries(self.users, rows)
+            selected[:] = JournalEntry.objects.values_list("pk", flat=True)
+
+        self.query_budget.scales(
+            "admin:journal_journalentry_changelist",
+            lambda: self.client.post(
+                url, {"action": "delete_selected", "_selected_action": selected}
+            ),
+            add_rows=add_rows,
+            # Django refuses posts of more than 1,000 fields
+            row_counts=(10, 500),
+        )
+
+
+@pytest.mark.django_db
+def test_query_budget_fixture(client, query_budget):
+    """Test the pytest fixture with a plain test function."""
+    user = User.objects.create_user(username="fixtureuser")
+    client.force_login(user)
+    url = reverse("calendar_dates")
+    month = timezone.localdate().strftime("%Y-%m")
+    query_budget.scales(
+        "calendar_dates",
+        lambda: client.get(url, {"month": month}),
+        add_rows=lambda rows: add_entries([user], rows),
+    )
@@ -0,0 +1,70 @@
+import time
+
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import resolve, reverse
+
+from journal.middleware import PRIMARY_PIN_COOKIE, ReadReplicaMiddleware
+from journal.models import JournalEntry
+
+
+@override_settings(DATABASE_READ_REPLICA="replica", REPLICA_STICKY_SECONDS=10)
+class TestReadReplicaRouting(SimpleTestCase):
+    """Test routing of reads between the primary and the read replica."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = ReadReplicaMiddleware(self.get_response)
+        self.read_aliases = []
+
+    def get_response(self, request):
+        # Stand-in for the handler: run process_view, then "the view"
+        self.middleware.process_view(request, None, (), {})
+        self.read_aliases.append(router.db_for_read(JournalEntry))
+        return HttpResponse()
+
+    def dispatch(self, request):
+        request.resolver_match = resolve(request.path)
+        return self.middleware(request)
+
+    def test_read_view_uses_replica(self):
+        """Test that GETs to read-heavy views read from the replica."""
+        self.dispatch(self.factory.get(reverse("journal")))
+        self.dispatch(self.factory.get(reverse("get_entries")))
+        self.assertEqual(self.read_aliases, ["replica", "replica"])
+
+    def test_other_views_use_primary(self):
+        """Test that views not listed for the replica read from the primary."""
+        self.dispatch(self.factory.get(reverse("calendar_dates")))
+        self.assertEqual(self.read_aliases, ["default"])
+
+    def test_write_uses_primary_and_pins(self):
+        """Test that a POST reads from the primary and pins the client."""
+        response = self.dispatch(self.factory.post(reverse("create_entry")))
+        self.assertEqual(self.read_aliases, ["default"])
+        self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+
+    def test_pinned_client_reads_own_writes(self):
+        """Test that a recently-writing client keeps reading from the primary."""
+        request = self.factory.get(reverse("journal"))
+        request.COOKIES[PRIMARY_PIN_COOKIE] = str(int(time.time()) + 10)
+        self.dispatch(request)
+
+        expired = self.factory.get(reverse("journal"))
+        expired.COOKIES[PRIMARY_PIN_COOKIE] = str(int(time.time()) - 1)
+        self.dispatch(expired)
+        self.assertEqual(self.read_aliases, ["default", "replica"])
+
+    def test_routing_reset_after_request(self):
+        """Test that replica routing doesn't leak past the request."""
+        self.dispatch(self.factory.get(reverse("journal")))
+        self.assertEqual(router.db_for_read(JournalEntry), "default")
+
+    @override_settings(DATABASE_READ_REPLICA=None)
+    def test_no_replica_configured(self):
+        """Test that everything uses the primary without a replica."""
+        response = self.dispatch(self.factory.post(reverse("create_entry")))
+        self.dispatch(self.factory.get(reverse("journal")))
+        self.assertEqual(self.read_aliases, ["default", "default"])
+        self.assertNotIn(PRIMARY_PIN_COOKIE, response.cookies)
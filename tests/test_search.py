@@ -0,0 +1,155 @@
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from journal.models import JournalEntry
+from journal.search import matches, search_entries
+
+
+class TestSearchEntries(TestCase):
+    """Test full-text search over journal entries."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.other_user = User.objects.create_user(
+            username="otheruser", password="testpass123"
+        )
+
+    def search(self, query, **kwargs):
+        entries, has_next = search_entries(self.user.id, query, **kwargs)
+        return [entry.id for entry in entries], has_next
+
+    def test_ranks_and_highlights(self):
+        """Test that better matches come first with the terms highlighted."""
+        once = JournalEntry.objects.create(
+            user=self.user, content="Walked to the lake, then home for dinner."
+        )
+        twice = JournalEntry.objects.create(
+            user=self.user, content="The lake was calm. Swam across the lake."
+        )
+        JournalEntry.objects.create(user=self.user, content="Quiet day at home.")
+
+        entries, has_next = search_entries(self.user.id, "lake")
+        self.assertEqual([entry.id for entry in entries], [twice.id, once.id])
+        self.assertFalse(has_next)
+        self.assertIn('<mark class="search-hit">lake</mark>', entries[0].snippet)
+
+    def test_matches_all_terms_with_stemming_and_prefix(self):
+        """Test that every term must match, by stem, the last one as a prefix."""
+        entry = JournalEntry.objects.create(
+            user=self.user, content="Running along the river before breakfast"
+        )
+        JournalEntry.objects.create(user=self.user, content="Running late again")
+
+        self.assertEqual(self.search("run river")[0], [entry.id])
+        self.assertEqual(self.search("river break")[0], [entry.id])
+
+    def test_only_searches_own_entries(self):
+        """Test that other users' entries are never returned."""
+        JournalEntry.objects.create(user=self.other_user, content="Secret garden")
+
+        self.assertEqual(self.search("garden")[0], [])
+        # The per-user token can't be searched for as content either
+        self.assertEqual(self.search(f"u{self.other_user.id}")[0], [])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test that edited and deleted entries are reflected in results."""
+        entry = JournalEntry.objects.create(user=self.user, content="Old words")
+        entry.content = "New words"
+        entry.save()
+
+        self.assertEqual(self.search("old")[0], [])
+        self.assertEqual(self.search("new")[0], [entry.id])
+
+        entry.delete()
+        self.assertEqual(self.search("new")[0], [])
+
+    def test_query_syntax_is_literal(self):
+        """Test that search operators typed by the user aren't interpreted."""
+        entry = JournalEntry.objects.create(user=self.user, content="cats OR dogs")
+
+        self.assertEqual(self.search('cats" OR (dogs*')[0], [entry.id])
+        self.assertEqual(self.search('"(*')[0], [])
+
+    def test_matches_every_users_entries(self):
+        """Test the Q object filtering other querysets through the index."""
+        mine = JournalEntry.objects.create(user=self.user, content="Lake swim")
+        theirs = JournalEntry.objects.create(user=self.other_user, content="Lakes")
+        JournalEntry.objects.create(user=self.user, content="Flake")
+
+        self.assertEqual(
+            set(JournalEntry.objects.filter(matches("lake"))), {mine, theirs}
+        )
+        self.assertFalse(JournalEntry.objects.filter(matches("?")).exists())
+
+    def test_snippet_escapes_content(self):
+        """Test that entry HTML is escaped in snippets."""
+        JournalEntry.objects.create(
+            user=self.user, content="<script>alert('hi')</script> sunshine"
+        )
+
+        entries, _ = search_entries(self.user.id, "sunshine")
+        self.assertNotIn("<script>", entries[0].snippet)
+        self.assertIn("&lt;script&gt;", entries[0].snippet)
+
+    def test_pagination(self):
+        """Test that pages don't overlap and report whether more follow."""
+        JournalEntry.objects.bulk_create(
+            JournalEntry(user=self.user, content=f"Garden note {i}") for i in range(5)
+        )
+
+        first, has_next = self.search("garden", page_size=3)
+        self.assertEqual(len(first), 3)
+        self.assertTrue(has_next)
+
+        second, has_next = self.search("garden", page=2, page_size=3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse(has_next)
+        self.assertFalse(set(first) & set(second))
+
+
+class TestSearchView(TestCase):
+    """Test the search endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def test_search_returns_results(self):
+        """Test that results link to their day."""
+        entry = JournalEntry.objects.create(user=self.user, content="Picnic day")
+
+        response = self.client.get(reverse("search_entries"), {"q": "picnic"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<mark class="search-hit">Picnic</mark>')
+        self.assertContains(response, entry.timestamp.strftime("%Y-%m-%d"))
+
+    def test_no_matches(self):
+        """Test the empty state for a query without matches."""
+        response = self.client.get(reverse("search_entries"), {"q": "nothing"})
+        self.assertContains(response, "No entries match")
+
+    def test_blank_query(self):
+        """Test that a blank query renders nothing."""
+        response = self.client.get(reverse("search_entries"), {"q": "  "})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "No entries match")
+
+    def test_invalid_page(self):
+        """Test that invalid page numbers are rejected."""
+        for page in ["abc", "0"]:
+            response = self.client.get(
+                reverse("search_entries"), {"q": "picnic", "page": page}
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_requires_login(self):
+        """Test that search requires authentication."""
+        self.client.logout()
+        response = self.client.get(reverse("search_entries"), {"q": "picnic"})
+        self.assertEqual(response.status_code, 302)
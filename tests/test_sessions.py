@@ -0,0 +1,146 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from journal import backends
+from journal.models import UserProfile
+
+CACHED_DB_CACHES = {
+    **settings.CACHES,
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test-sessions",
+    },
+}
+
+
+def table_queries(queries, table):
+    return [query["sql"] for query in queries if f'"{table}"' in query["sql"]]
+
+
+class TestCachedUsers(TestCase):
+    """Test the in-process user cache behind request.user."""
+
+    def setUp(self):
+        backends.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def get_entries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("get_entries"), {"date": "2025-01-01"})
+        self.assertEqual(response.status_code, 200)
+        return queries
+
+    def test_user_loaded_once(self):
+        """Test that later requests take request.user from the cache."""
+        self.get_entries()
+        self.assertEqual(table_queries(self.get_entries(), "auth_user"), [])
+
+    @override_settings(USER_CACHE_TTL=0)
+    def test_cache_disabled(self):
+        """Test that a zero TTL loads the user on every request."""
+        self.get_entries()
+        self.assertEqual(len(table_queries(self.get_entries(), "auth_user")), 1)
+
+    def test_password_change_logs_out(self):
+        """Test that changing the password drops the cached user at once."""
+        self.get_entries()
+        self.user.set_password("new-password-456")
+        self.user.save()
+
+        response = self.client.get(reverse("journal"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_change_in_other_worker_reloads_user(self):
+        """Test that a user changed by another process isn't served cached."""
+        self.get_entries()
+        # Another worker changes the password: the shared stamp moves on, but
+        # this process's copy is left in place
+        User.objects.filter(pk=self.user.pk).update(password="changed")
+        backends._new_stamp(self.user.pk)
+
+        response = self.client.get(reverse("journal"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_profile_change_reloads_user(self):
+        """Test that saving the profile drops the cached user."""
+        self.get_entries()
+        UserProfile.objects.get(user=self.user).save()
+        self.assertEqual(len(table_queries(self.get_entries(), "auth_user")), 1)
+
+    def test_sessions_before_cache_stay_logged_in(self):
+        """Test that sessions logged in through ModelBackend still work."""
+        self.client.force_login(
+            self.user, backend="django.contrib.auth.backends.ModelBackend"
+        )
+        response = self.client.get(reverse("journal"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self.client.session["_auth_user_backend"],
+            "journal.backends.CachedModelBackend",
+        )
+
+    def test_failed_login_checks_password_once(self):
+        """Test that a wrong password is only hashed by one backend."""
+        with mock.patch.object(
+            User, "check_password", autospec=True, return_value=False
+        ) as check_password:
+            self.assertIsNone(authenticate(username="testuser", password="wrong"))
+        self.assertEqual(check_password.call_count, 1)
+
+    def test_login_uses_cached_backend(self):
+        """Test that new logins are served from the user cache."""
+        session = self.client.session
+        self.assertEqual(
+            session["_auth_user_backend"], "journal.backends.CachedModelBackend"
+        )
+
+    def test_cached_users_are_copies(self):
+        """Test that changes to one request's user don't leak into the cache."""
+        backend = backends.CachedModelBackend()
+        backend.get_user(self.user.pk).first_name = "Changed"
+        self.assertEqual(backend.get_user(self.user.pk).first_name, "")
+
+
+class TestSessionBackends(TestCase):
+    """Test the configurable session engines."""
+
+    def setUp(self):
+        backends.clear()
+        self.client = Client()
+        User.objects.create_user(username="testuser", password="testpass123")
+
+    def session_queries(self):
+        self.client.login(username="testuser", password="testpass123")
+        url = reverse("get_entries")
+        self.client.get(url, {"date": "2025-01-01"})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {"date": "2025-01-01"})
+        return table_queries(queries, "django_session")
+
+    def test_db_sessions_read_every_request(self):
+        """Test that the default engine reads the session row per request."""
+        self.assertEqual(len(self.session_queries()), 1)
+
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.cached_db",
+        CACHES=CACHED_DB_CACHES,
+    )
+    def test_cached_db_sessions(self):
+        """Test that cached_db sessions are read from the cache."""
+        self.assertEqual(self.session_queries(), [])
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_signed_cookie_sessions(self):
+        """Test that signed-cookie sessions never touch the database."""
+        self.assertEqual(self.session_queries(), [])
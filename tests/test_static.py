@@ -0,0 +1,100 @@
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from journal.forms import TEXTAREA_CLASSES
+
+MANIFEST_STORAGES = {
+    **settings.STORAGES,
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    },
+}
+
+
+def css_selector(class_name):
+    return "." + re.sub(r"([:/.\[\]])", r"\\\1", class_name)
+
+
+class TestStaticAssets(TestCase):
+    """Test that pages use the self-hosted, prebuilt assets."""
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_pages_use_local_assets(self):
+        """Test that pages load the compiled CSS and HTMX from static files."""
+        response = self.client.get(reverse("login"))
+        self.assertContains(response, "/static/css/app.css")
+        self.assertContains(response, "/static/js/htmx.min.js")
+        self.assertNotContains(response, "cdn.tailwindcss.com")
+        self.assertNotContains(response, "unpkg.com")
+
+    def test_compiled_css_covers_form_classes(self):
+        """Test that classes only used in forms.py made it into app.css."""
+        css = (settings.BASE_DIR / "static" / "css" / "app.css").read_text()
+        for class_name in TEXTAREA_CLASSES.split():
+            self.assertIn(css_selector(class_name), css)
+
+
+class TestStaticServing(TestCase):
+    """Test production static serving with hashed, precompressed files."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.static_root.cleanup)
+        settings_override = override_settings(
+            STATIC_ROOT=cls.static_root.name, STORAGES=MANIFEST_STORAGES
+        )
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+    def setUp(self):
+        self.client = Client()
+
+    def asset_urls(self):
+        page = self.client.get(reverse("login")).content.decode()
+        css = re.search(r"/static/css/app\.[0-9a-f]{12}\.css", page)
+        js = re.search(r"/static/js/htmx\.min\.[0-9a-f]{12}\.js", page)
+        self.assertIsNotNone(css)
+        self.assertIsNotNone(js)
+        return css.group(), js.group()
+
+    def test_precompressed_variants(self):
+        """Test that hashed assets are served Brotli or gzip encoded."""
+        css_url, js_url = self.asset_urls()
+
+        for url in (css_url, js_url):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Encoding"], "br")
+            self.assertEqual(response["Vary"], "Accept-Encoding")
+            response.close()
+
+        response = self.client.get(css_url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        response.close()
+
+        response = self.client.get(css_url)
+        self.assertNotIn("Content-Encoding", response)
+        response.close()
+
+    def test_hashed_files_cached_forever(self):
+        """Test that hashed assets are immutable and unhashed ones aren't."""
+        css_url, _ = self.asset_urls()
+
+        response = self.client.get(css_url)
+        self.assertIn("immutable", response["Cache-Control"])
+        response.close()
+
+        response = self.client.get("/static/css/app.css")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("immutable", response["Cache-Control"])
+        response.close()
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from journal.models import JournalEntry
+from journal.views import TIMELINE_PAGE_SIZE
+from tests.helpers import create_entry
+
+
+class TestTimelineView(TestCase):
+    """Test the keyset-paginated timeline endpoint."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.login(username="testuser", password="testpass123")
+
+    def get_page(self, cursor=None):
+        params = {"cursor": cursor} if cursor else {}
+        response = self.client.get(reverse("timeline_entries"), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_pages_through_every_entry_once(self):
+        """Test that following cursors visits each earlier entry once, in order."""
+        yesterday = timezone.now() - timedelta(days=1)
+        # Pairs share a timestamp, so pages must break ties on id
+        expected = []
+        for i in range(TIMELINE_PAGE_SIZE + 5):
+            expected.append(
+                create_entry(self.user, yesterday - timedelta(hours=i // 2)).pk
+            )
+        expected.sort(
+            key=lambda pk: (JournalEntry.objects.get(pk=pk).timestamp, pk),
+            reverse=True,
+        )
+
+        seen = []
+        cursor = None
+        while True:
+            response = self.get_page(cursor)
+            seen.extend(entry.pk for entry in response.context["entries"])
+            cursor = response.context["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_excludes_today_and_other_users(self):
+        """Test that the timeline starts before today and shows only own entries."""
+        other_user = User.objects.create_user(username="other", password="x")
+        JournalEntry.objects.create(user=self.user, content="Today")
+        create_entry(other_user, timezone.now() - timedelta(days=2))
+        past = create_entry(self.user, timezone.now() - timedelta(days=2))
+
+        response = self.get_page()
+        self.assertEqual([entry.pk for entry in response.context["entries"]], [past.pk])
+        self.assertIsNone(response.context["next_cursor"])
+
+    def test_deep_pages_seek_without_offset(self):
+        """Test that later pages cost one query and never use OFFSET."""
+        yesterday = timezone.now() - timedelta(days=1)
+        for i in range(TIMELINE_PAGE_SIZE * 2 + 1):
+            create_entry(self.user, yesterday - timedelta(minutes=i))
+        cursor = self.get_page().context["next_cursor"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_page(cursor)
+        self.assertEqual(len(response.context["entries"]), TIMELINE_PAGE_SIZE)
+
+        entry_queries = [
+            query["sql"] for query in queries if "journal_journalentry" in query["sql"]
+        ]
+        self.assertEqual(len(entry_queries), 1)
+        self.assertNotIn("OFFSET", entry_queries[0])
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite query plan")
+    def test_cursor_seeks_user_timestamp_index(self):
+        """Test that a cursor page is a range seek on the (user, timestamp) index."""
+        entries = JournalEntry.objects.filter(user=self.user)
+        plan = entries.before(timezone.now(), 1)[:TIMELINE_PAGE_SIZE].explain()
+        self.assertIn("(user_id=? AND timestamp<?)", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_renders_lazy_loader(self):
+        """Test that a page ends with a revealed-triggered loader for the next."""
+        yesterday = timezone.now() - timedelta(days=1)
+        for i in range(TIMELINE_PAGE_SIZE + 1):
+            create_entry(self.user, yesterday - timedelta(minutes=i))
+
+        response = self.get_page()
+        self.assertContains(response, 'hx-trigger="revealed"')
+        self.assertContains(response, f"?cursor={response.context['next_cursor']}")
+
+    def test_empty_timeline(self):
+        """Test the empty state when there are no earlier entries."""
+        response = self.get_page()
+        self.assertContains(response, "Your earlier reflections will appear here")
+        self.assertNotContains(response, 'hx-trigger="revealed"')
+
+    def test_invalid_cursor(self):
+        """Test that malformed cursors are rejected."""
+        for cursor in ["garbage", "20250101T000000.000000_x", "2025_1_2"]:
+            response = self.client.get(reverse("timeline_entries"), {"cursor": cursor})
+            self.assertEqual(response.status_code, 400)
+
+    def test_requires_login(self):
+        """Test that the timeline requires authentication."""
+        self.client.logout()
+        response = self.client.get(reverse("timeline_entries"))
+        self.assertEqual(response.status_code, 302)
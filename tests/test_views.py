@@ -1,9 +1,13 @@
+from unittest import skipUnless
+
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.utils import timezone
 
 from journal.models import JournalEntry
+from tests.helpers import create_entry
 
 
 class TestAuthenticationViews(TestCase):
@@ -200,3 +204,28 @@ class TestJournalModel(TestCase):
         """Test string representation of entry."""
         entry = JournalEntry.objects.create(user=self.user, content="Test content")
         self.assertIn("testuser", str(entry))
+
+    def test_on_date_is_half_open(self):
+        """Test that day lookups include midnight and exclude the next day."""
+        tz = timezone.get_current_timezone()
+        day = timezone.datetime(2025, 3, 10).date()
+        stamps = {
+            "Before": timezone.datetime(2025, 3, 9, 23, 59, 59, tzinfo=tz),
+            "Midnight": timezone.datetime(2025, 3, 10, 0, 0, tzinfo=tz),
+            "Late": timezone.datetime(2025, 3, 10, 23, 59, 59, tzinfo=tz),
+            "Next day": timezone.datetime(2025, 3, 11, 0, 0, tzinfo=tz),
+        }
+        for content, stamp in stamps.items():
+            create_entry(self.user, stamp, content)
+
+        entries = JournalEntry.objects.filter(user=self.user).on_date(day)
+        self.assertEqual(
+            sorted(entries.values_list("content", flat=True)), ["Late", "Midnight"]
+        )
+
+    @skipUnless(connection.vendor == "sqlite", "SQLite query plan")
+    def test_on_date_uses_user_timestamp_index(self):
+        """Test that day lookups are answered by the (user, timestamp) index."""
+        today = timezone.localdate()
+        plan = JournalEntry.objects.filter(user=self.user).on_date(today).explain()
+        self.assertIn("USING INDEX journal_jou_user_id_e6652d_idx", plan)
@@ -0,0 +1,185 @@
+import io
+import threading
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from journal import write_batching
+from journal.models import JournalEntry
+from journal.write_batching import WriteBatcher
+
+HTMX = {"HTTP_HX_REQUEST": "true"}
+
+
+class RecordingBatcher(WriteBatcher):
+    """Batcher remembering the size of each batch it flushed."""
+
+    def __init__(self, write):
+        super().__init__(write)
+        self.batches = []
+
+    def flush(self, batch):
+        self.batches.append(len(batch))
+        super().flush(batch)
+
+
+class TestWriteBatcher(TransactionTestCase):
+    """Test committing writes from many threads in shared transactions."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser")
+
+    def write(self, content):
+        if content == "fail":
+            raise ValueError(content)
+        entry = JournalEntry.objects.create(user=self.user, content=content)
+        return entry, connection.in_atomic_block
+
+    def submit_concurrently(self, batcher, contents):
+        """Submit each of ``contents`` from its own thread at the same time."""
+        barrier = threading.Barrier(len(contents))
+        results = {}
+
+        def submit(content):
+            barrier.wait()
+            try:
+                results[content] = batcher.submit(content)
+            except ValueError as error:
+                results[content] = error
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=submit, args=(c,)) for c in contents]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @override_settings(ENTRY_BATCH_INTERVAL_MS=200, ENTRY_BATCH_SIZE=50)
+    def test_groups_concurrent_writes(self):
+        """Test that concurrent writes share transactions and all commit."""
+        batcher = RecordingBatcher(self.write)
+        contents = [f"Entry {number}" for number in range(8)]
+
+        results = self.submit_concurrently(batcher, contents)
+
+        self.assertEqual(sum(batcher.batches), 8)
+        self.assertLess(len(batcher.batches), 8)
+        for content in contents:
+            entry, in_transaction = results[content]
+            self.assertTrue(in_transaction)
+            self.assertEqual(entry.content, content)
+        self.assertEqual(JournalEntry.objects.count(), 8)
+
+    @override_settings(ENTRY_BATCH_INTERVAL_MS=200, ENTRY_BATCH_SIZE=3)
+    def test_batch_size(self):
+        """Test that no batch holds more than ENTRY_BATCH_SIZE writes."""
+        batcher = RecordingBatcher(self.write)
+
+        self.submit_concurrently(batcher, [f"Entry {number}" for number in range(7)])
+
+        self.assertEqual(sum(batcher.batches), 7)
+        self.assertLessEqual(max(batcher.batches), 3)
+
+    @override_settings(ENTRY_BATCH_INTERVAL_MS=200)
+    def test_failed_write_only_undoes_itself(self):
+        """Test that one write raising leaves the rest of its batch committed."""
+        batcher = RecordingBatcher(self.write)
+
+        results = self.submit_concurrently(batcher, ["First", "fail", "Last"])
+
+        self.assertIsInstance(results["fail"], ValueError)
+        self.assertEqual(
+            set(JournalEntry.objects.values_list("content", flat=True)),
+            {"First", "Last"},
+        )
+
+    @override_settings(ENTRY_BATCH_INTERVAL_MS=0)
+    def test_connection_error_fails_batch(self):
+        """Test that an error before the transaction still answers requests."""
+        batcher = WriteBatcher(self.write)
+        with (
+            mock.patch.object(
+                write_batching, "close_old_connections", side_effect=DatabaseError
+            ),
+            self.assertRaises(DatabaseError),
+        ):
+            batcher.submit("Lost connection")
+        # The writer thread carries on with the next batch
+        entry, _ = batcher.submit("Next")
+        self.assertEqual(entry.content, "Next")
+
+    @override_settings(ENTRY_BATCH_INTERVAL_MS=0)
+    def test_submit_times_out(self):
+        """Test that a request stops waiting for a batch that doesn't finish."""
+        release = threading.Event()
+        batcher = WriteBatcher(lambda content: release.wait())
+        with (
+            mock.patch.object(write_batching, "wait_timeout", return_value=0.05),
+            self.assertRaises(TimeoutError),
+        ):
+            batcher.submit("Stuck")
+
+        # Let the stuck batch commit before the test's tables are flushed
+        release.set()
+        self.assertTrue(batcher.submit("Done"))
+
+    @override_settings(ENTRY_BATCH_INTERVAL_MS=0)
+    async def test_async_submit(self):
+        """Test that coroutines wait for their batch without a thread."""
+        batcher = WriteBatcher(self.write)
+        entry, _ = await batcher.asubmit("From a coroutine")
+        self.assertEqual(entry.content, "From a coroutine")
+        self.assertTrue(await JournalEntry.objects.filter(pk=entry.pk).aexists())
+
+
+@override_settings(ENTRY_WRITE_BATCHING=True, ENTRY_BATCH_INTERVAL_MS=0)
+class TestBatchedEntryCreation(TransactionTestCase):
+    """Test creating entries through the write batcher."""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.client.force_login(self.user)
+
+    def submit(self, **data):
+        return self.client.post(
+            reverse("create_entry"), {"content": "Batched entry", **data}, **HTMX
+        )
+
+    def test_sees_own_write(self):
+        """Test that the response shows the entry it just committed."""
+        response = self.submit()
+        self.assertContains(response, "Batched entry")
+        self.assertEqual(JournalEntry.objects.get().content, "Batched entry")
+
+    def test_idempotency_key(self):
+        """Test that a repeated key is still answered with the first entry."""
+        self.submit(idempotency_key="key-1")
+        replayed = self.submit(idempotency_key="key-1")
+        self.assertEqual(replayed["Idempotent-Replayed"], "true")
+        self.assertEqual(JournalEntry.objects.count(), 1)
+
+
+class TestBenchmarkWrites(TransactionTestCase):
+    """Test the write throughput benchmark."""
+
+    def test_profiles(self):
+        """Test that every profile commits all of its writes."""
+        stdout = io.StringIO()
+        call_command(
+            "benchmark_writes",
+            "--writers=2",
+            "--writes=5",
+            "--batch-interval=1",
+            stdout=stdout,
+        )
+        for profile in ("baseline", "tuned", "batched"):
+            self.assertIn(profile, stdout.getvalue())